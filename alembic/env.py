@@ -7,6 +7,7 @@ from alembic import context
 from app.models.base import Base
 from app.models.user import User
 from app.models.contact import Contact
+from app.models.outbox import OutboxEvent
 
 
 target_metadata = Base.metadata
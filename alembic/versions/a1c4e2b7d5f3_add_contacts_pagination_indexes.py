@@ -0,0 +1,32 @@
+"""add contacts pagination indexes
+
+Revision ID: a1c4e2b7d5f3
+Revises: f9be4b182cc3
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c4e2b7d5f3'
+down_revision: Union[str, Sequence[str], None] = 'f9be4b182cc3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_contacts_owner_id_id', 'contacts', ['owner_id', 'id'], unique=False)
+    op.create_index(
+        'ix_contacts_owner_id_last_name_id', 'contacts', ['owner_id', 'last_name', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_owner_id_last_name_id', table_name='contacts')
+    op.drop_index('ix_contacts_owner_id_id', table_name='contacts')
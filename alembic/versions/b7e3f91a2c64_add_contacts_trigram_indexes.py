@@ -0,0 +1,45 @@
+"""add contacts trigram indexes
+
+Revision ID: b7e3f91a2c64
+Revises: a1c4e2b7d5f3
+Create Date: 2026-10-18 11:04:27.552913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f91a2c64'
+down_revision: Union[str, Sequence[str], None] = 'a1c4e2b7d5f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Поля, за якими працює нечіткий пошук контактів
+SEARCH_COLUMNS = ('first_name', 'last_name', 'email')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm — триграмні оператори; btree_gin — щоб owner_id міг бути
+    # першою колонкою GIN-індексу і пошук обмежувався контактами власника
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f'ix_contacts_owner_id_{column}_trgm',
+            'contacts',
+            ['owner_id', column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f'ix_contacts_owner_id_{column}_trgm', table_name='contacts')
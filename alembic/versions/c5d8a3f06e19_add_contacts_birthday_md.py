@@ -0,0 +1,41 @@
+"""add contacts birthday_md
+
+Revision ID: c5d8a3f06e19
+Revises: b7e3f91a2c64
+Create Date: 2026-10-18 11:47:09.804132
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d8a3f06e19'
+down_revision: Union[str, Sequence[str], None] = 'b7e3f91a2c64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'contacts',
+        sa.Column(
+            'birthday_md',
+            sa.SmallInteger(),
+            sa.Computed(
+                "(EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday))::smallint",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index('ix_contacts_owner_id_birthday_md', 'contacts', ['owner_id', 'birthday_md'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_owner_id_birthday_md', table_name='contacts')
+    op.drop_column('contacts', 'birthday_md')
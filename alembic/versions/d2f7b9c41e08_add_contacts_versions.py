@@ -0,0 +1,30 @@
+"""add contacts versions
+
+Revision ID: d2f7b9c41e08
+Revises: c5d8a3f06e19
+Create Date: 2026-10-18 14:02:51.417630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7b9c41e08'
+down_revision: Union[str, Sequence[str], None] = 'c5d8a3f06e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('contacts_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('contacts', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contacts', 'version')
+    op.drop_column('users', 'contacts_version')
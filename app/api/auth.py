@@ -1,49 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+import os
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from redis.exceptions import RedisError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.email import send_verification_email
 from app.services.auth import create_access_token, verify_token, get_current_user
 from app.database import get_session
+from app.services.limiter import limiter
 
 from app.schemas.user import UserCreate, UserOut, PasswordResetRequest, PasswordReset
-from app.services.password_reset import (
-    create_reset_token,
-    send_password_reset_email,
-    verify_reset_token,
-    delete_reset_token
+from app.services.outbox import add_outbox_event, outbox_relay
+from app.services.password_reset import consume_reset_token, create_reset_token, restore_reset_token
+from app.crud.user import (
+    create_user,
+    get_user_by_email,
+    hash_password_async,
+    update_user_password_hash,
+    verify_password_async,
 )
-from app.crud.user import create_user, get_user_by_email, verify_password, update_user_password
 
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @router.post("/signup", response_model=UserOut, status_code=201)
-async def signup(user_data: UserCreate, session: AsyncSession = Depends(get_session)):
+@limiter.limit("5/minute")
+async def signup(
+    request: Request,
+    user_data: UserCreate,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_session),
+):
     """
     Реєструє нового користувача та надсилає лист із підтвердженням email.
     """
-    existing = await get_user_by_email(session, str(user_data.email))
-    if existing:
-        raise HTTPException(status_code=409, detail="User already exists")
-
-    user = await create_user(session, user_data)
-
     # Для тестів автоматично верифікуємо
-    import os
-    if os.getenv("TESTING"):
-        user.is_verified = True
-        await session.commit()
+    user = await create_user(session, user_data, is_verified=bool(os.getenv("TESTING")))
+    if user is None:
+        raise HTTPException(status_code=409, detail="User already exists")
 
+    # Лист фіксується в outbox тим самим commit(), що й користувач
     token = create_access_token({"sub": user.email})
-    await send_verification_email(user.email, token)
+    add_outbox_event(session, "email.verification", {"email": user.email, "token": token})
+    await session.commit()
+
+    background_tasks.add_task(outbox_relay.dispatch, session)
     return user
 
 
 @router.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_session)):
+@limiter.limit("10/minute")
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    session: AsyncSession = Depends(get_session),
+):
     """
     Авторизація користувача та видача JWT токена.
     """
@@ -51,7 +64,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Async
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not verify_password(form_data.password, user.password):
+    if not await verify_password_async(form_data.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # Для тестів - автоматично верифікуємо користувача
@@ -82,54 +95,69 @@ async def verify_email(token: str, session: AsyncSession = Depends(get_session))
 
 
 @router.post("/request-reset")
+@limiter.limit("3/minute")
 async def request_password_reset(
-    request: PasswordResetRequest,
+    request: Request,
+    data: PasswordResetRequest,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session)
 ):
     """
     Запитує скидання пароля для користувача.
     """
     # Перевіряємо чи існує користувач
-    user = await get_user_by_email(session, str(request.email))
+    user = await get_user_by_email(session, str(data.email))
     if not user:
         # Не розкриваємо чи існує користувач (безпека)
         return {"message": "If user exists, password reset email has been sent"}
 
     # Генеруємо токен
-    reset_token = await create_reset_token(str(request.email))
+    reset_token = await create_reset_token(str(data.email))
 
-    # Надсилаємо email
-    await send_password_reset_email(str(request.email), reset_token)
+    # Лист надсилає ретранслятор outbox
+    add_outbox_event(session, "email.password_reset", {"email": str(data.email), "token": reset_token})
+    await session.commit()
+    background_tasks.add_task(outbox_relay.dispatch, session)
 
     return {"message": "Password reset email has been sent"}
 
 
 @router.post("/reset-password")
+@limiter.limit("5/minute")
 async def reset_password(
-    request: PasswordReset,
+    request: Request,
+    data: PasswordReset,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session)
 ):
     """
     Скидає пароль користувача за допомогою токена.
     """
-    # Перевіряємо токен
-    email = await verify_reset_token(request.token)
+    # Хешуємо до споживання токена: переповнений пул bcrypt (503) не спалює токен
+    hashed_password = await hash_password_async(data.new_password)
+
+    # Токен одноразовий: споживаємо його безпосередньо перед зміною пароля, а не у фоні
+    try:
+        email = await consume_reset_token(data.token)
+    except RedisError:
+        raise HTTPException(status_code=503, detail="Password reset is temporarily unavailable")
     if not email:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
 
-    # Знаходимо користувача
-    user = await get_user_by_email(session, email)
+    try:
+        user = await update_user_password_hash(session, email, hashed_password)
+        if user:
+            # Очищення кешу користувача фіксується в outbox тим самим commit(), що й новий пароль
+            add_outbox_event(session, "cache.invalidate_user", {"email": email})
+            await session.commit()
+    except Exception:
+        # Пароль не змінено — повертаємо токен, щоб користувач міг повторити спробу
+        await session.rollback()
+        await restore_reset_token(data.token, email)
+        raise
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Оновлюємо пароль
-    await update_user_password(session, user, request.new_password)
-
-    # Видаляємо токен після використання
-    await delete_reset_token(request.token)
-
-    # Очищаємо кеш користувача (якщо був кешований)
-    from app.services.cache import delete_cached_user
-    await delete_cached_user(email)
+    background_tasks.add_task(outbox_relay.dispatch, session)
 
     return {"message": "Password has been successfully reset"}
\ No newline at end of file
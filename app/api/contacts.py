@@ -1,24 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from typing import Any, Literal
+
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.contact import (
     create_contact,
+    create_contacts_bulk,
     get_contact_by_id,
+    get_contact_version,
     get_contacts,
+    get_contacts_version,
+    stream_contacts,
     update_contact,
     delete_contact,
     search_contacts,
     get_upcoming_birthdays,
 )
 from app.database import get_session
-from app.schemas.contact import ContactCreate, ContactUpdate, ContactOut
+from app.schemas.contact import (
+    ContactCreate,
+    ContactUpdate,
+    ContactOut,
+    ContactBulkItemResult,
+    ContactBulkResult,
+)
 from app.services.auth import get_current_user
+from app.services.cache import cache_response, get_cached_response
+from app.services.read_routing import get_read_session, mark_user_write
+from app.services.limiter import limiter
+from app.services.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.services.export import csv_chunks, ndjson_chunks
+from app.services.serialization import contacts_response
+from app.services.query_budget import query_budget
+from app.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+)
 from app.models.user import User
 
 router = APIRouter(prefix="/contacts", tags=["Contacts"])
 
+# Максимальна кількість контактів в одному пакетному запиті
+MAX_BULK_ITEMS = 5000
+
+# Помилка у звіті для рядка, який пройшов валідацію, але його відхилила БД
+DB_REJECTED_ERROR = {"type": "database_error", "loc": [], "msg": "Row was rejected by the database"}
+
 
 @router.post("/", response_model=ContactOut)
+@query_budget(1)
 async def create_contact_api(
     data: ContactCreate,
     session: AsyncSession = Depends(get_session),
@@ -35,57 +70,287 @@ async def create_contact_api(
     Returns:
         ContactOut: Створений контакт.
     """
-    return await create_contact(session, data, user_id=current_user.id)
+    contact = await create_contact(session, data, user_id=current_user.id)
+    await mark_user_write(current_user.id)
+    return contact
+
+
+@router.post("/bulk", response_model=ContactBulkResult)
+@limiter.limit("10/minute")
+async def create_contacts_bulk_api(
+    request: Request,
+    items: list[dict[str, Any]] = Body(..., max_length=MAX_BULK_ITEMS),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Пакетно створює контакти для поточного користувача.
+
+    Кожен елемент валідується окремо: невалідні елементи не зупиняють
+    створення решти і потрапляють у звіт з описом помилок. Так само у звіт
+    потрапляють рядки, які пройшли валідацію, але їх відхилила БД.
+
+    Args:
+        request: Поточний HTTP-запит (для rate limiting).
+        items: Список даних контактів (до ``MAX_BULK_ITEMS``).
+        session: Асинхронна сесія бази даних.
+        current_user: Авторизований користувач.
+
+    Returns:
+        ContactBulkResult: Звіт із результатом для кожного елемента.
+    """
+    results: list[ContactBulkItemResult] = []
+    valid: list[tuple[int, ContactCreate]] = []
+
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, ContactCreate.model_validate(item)))
+        except ValidationError as e:
+            errors = e.errors(include_url=False, include_context=False, include_input=False)
+            results.append(ContactBulkItemResult(index=index, errors=errors))
+
+    ids = await create_contacts_bulk(
+        session, [data for _, data in valid], user_id=current_user.id
+    )
+    created = sum(contact_id is not None for contact_id in ids)
+    if created:
+        await mark_user_write(current_user.id)
+    results.extend(
+        ContactBulkItemResult(index=index, id=contact_id)
+        if contact_id is not None
+        else ContactBulkItemResult(index=index, errors=[DB_REJECTED_ERROR])
+        for (index, _), contact_id in zip(valid, ids)
+    )
+    results.sort(key=lambda r: r.index)
+
+    return ContactBulkResult(created=created, failed=len(items) - created, results=results)
 
 
 @router.get("/", response_model=list[ContactOut])
+@query_budget(2)
 async def list_contacts_api(
-    session: AsyncSession = Depends(get_session),
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    sort: Literal["id", "last_name"] = "id",
+    if_none_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Повертає сторінку контактів користувача (курсорна пагінація).
+
+    Курсор наступної сторінки повертається у заголовках ``X-Next-Cursor``
+    та ``Link`` (rel="next"); на останній сторінці їх немає. ETag
+    відповідає версії списку контактів, тож при збігу ``If-None-Match``
+    повертається ``304`` без запиту до контактів. Якщо увімкнено кеш
+    відповідей, сторінка може бути віддана з Redis без звернення до БД.
+
+    Args:
+        request: Поточний HTTP-запит (для побудови посилання на наступну сторінку).
+        limit: Максимальна кількість контактів на сторінці.
+        cursor: Курсор, отриманий з попередньої сторінки.
+        sort: Поле сортування.
+        if_none_match: ETag, який уже є в клієнта.
+        session: Асинхронна сесія бази даних.
+        current_user: Авторизований користувач.
+
+    Returns:
+        list[ContactOut]: Сторінка контактів або ``304 Not Modified``.
+
+    Raises:
+        HTTPException: Якщо курсор недійсний.
+    """
+    after = decode_cursor(cursor, sort) if cursor else None
+
+    cache_key, cached = await get_cached_response(
+        current_user.id,
+        "list",
+        {"limit": limit, "cursor": cursor, "sort": sort, "base_url": str(request.base_url)},
+    )
+    if cached is not None:
+        cached_etag = cached.headers.get("etag")
+        if cached_etag and etag_matches(if_none_match, cached_etag):
+            return not_modified(cached_etag)
+        return cached
+
+    version = await get_contacts_version(session, current_user.id)
+    etag = make_etag("contacts", current_user.id, version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    # Беремо на один запис більше, щоб дізнатися, чи є наступна сторінка
+    contacts = await get_contacts(
+        session, user_id=current_user.id, limit=limit + 1, after=after, sort=sort
+    )
+    headers = etag_headers(etag)
+    if len(contacts) > limit:
+        contacts = contacts[:limit]
+        last = contacts[-1]
+        next_cursor = encode_cursor(sort, getattr(last, sort), last.id)
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    response = contacts_response(contacts, headers=headers)
+    await cache_response(cache_key, response)
+    return response
+
+
+@router.get("/export")
+async def export_contacts_api(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Потоково експортує всі контакти користувача у форматі NDJSON або CSV.
+
+    Args:
+        format: Формат експорту (``ndjson`` або ``csv``).
+        session: Асинхронна сесія бази даних.
+        current_user: Авторизований користувач.
+
+    Returns:
+        StreamingResponse: Потокова відповідь з контактами.
+    """
+    batches = stream_contacts(session, user_id=current_user.id)
+
+    if format == "csv":
+        body, media_type = csv_chunks(batches), "text/csv"
+    else:
+        body, media_type = ndjson_chunks(batches), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format}"'},
+    )
+
+
+@router.get("/search", response_model=list[ContactOut])
+@query_budget(1)
+async def search_contacts_api(
+    first_name: str | None = None,
+    last_name: str | None = None,
+    email: str | None = None,
+    q: str | None = Query(None, min_length=1),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_read_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Пошук контактів за ім’ям, прізвищем або email.
+
+    Параметр ``q`` виконує нечіткий пошук одразу за трьома полями,
+    стійкий до опечаток; результати впорядковані за схожістю.
+    Якщо увімкнено кеш відповідей, результат може бути віддано з Redis.
+
+    Args:
+        first_name: Фільтр за ім’ям.
+        last_name: Фільтр за прізвищем.
+        email: Фільтр за email.
+        q: Рядок нечіткого пошуку за всіма полями.
+        limit: Максимальна кількість результатів.
+        session: Асинхронна сесія бази даних.
+        current_user: Авторизований користувач.
+
+    Returns:
+        list[ContactOut]: Список знайдених контактів.
+    """
+    params = {"first_name": first_name, "last_name": last_name, "email": email, "q": q, "limit": limit}
+    cache_key, cached = await get_cached_response(current_user.id, "search", params)
+    if cached is not None:
+        return cached
+
+    contacts = await search_contacts(session, user_id=current_user.id, **params)
+    response = contacts_response(contacts)
+    await cache_response(cache_key, response)
+    return response
+
+
+@router.get("/birthdays", response_model=list[ContactOut])
+@query_budget(1)
+async def birthdays_api(
+    days: int = Query(7, ge=0, le=366),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Повертає список усіх контактів користувача.
+    Повертає список контактів, у яких день народження незабаром.
+
+    Якщо увімкнено кеш відповідей, результат може бути віддано з Redis.
 
     Args:
+        days: Кількість днів наперед (за замовчуванням 7).
         session: Асинхронна сесія бази даних.
         current_user: Авторизований користувач.
 
     Returns:
-        list[ContactOut]: Список контактів.
+        list[ContactOut]: Список контактів із близькими днями народження.
     """
-    return await get_contacts(session, user_id=current_user.id)
+    today = date.today()
+    # Результат залежить від дати, тож вона входить до ключа кешу
+    cache_key, cached = await get_cached_response(
+        current_user.id, "birthdays", {"days": days, "today": today}
+    )
+    if cached is not None:
+        return cached
+
+    contacts = await get_upcoming_birthdays(session, user_id=current_user.id, days=days, today=today)
+    response = contacts_response(contacts)
+    await cache_response(cache_key, response)
+    return response
 
 
 @router.get("/{contact_id}", response_model=ContactOut)
+@query_budget(2)
 async def get_contact_api(
     contact_id: int,
-    session: AsyncSession = Depends(get_session),
+    response: Response,
+    if_none_match: str | None = Header(None),
+    session: AsyncSession = Depends(get_read_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Повертає контакт за його ID.
 
+    Якщо ``If-None-Match`` збігається з версією контакту, повертається
+    ``304`` після перевірки лише версії, без завантаження контакту.
+
     Args:
         contact_id: Ідентифікатор контакту.
+        response: HTTP-відповідь для заголовка ETag.
+        if_none_match: ETag, який уже є в клієнта.
         session: Асинхронна сесія бази даних.
         current_user: Авторизований користувач.
 
     Returns:
-        ContactOut: Контакт, якщо він існує.
+        ContactOut: Контакт, якщо він існує, або ``304 Not Modified``.
 
     Raises:
         HTTPException: Якщо контакт не знайдено.
     """
+    if if_none_match:
+        version = await get_contact_version(session, contact_id, user_id=current_user.id)
+        etag = make_etag("contact", contact_id, version)
+        if version is not None and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
     contact = await get_contact_by_id(session, contact_id, user_id=current_user.id)
     if not contact:
         raise HTTPException(status_code=404, detail="Contact not found")
+
+    response.headers.update(etag_headers(make_etag("contact", contact.id, contact.version)))
     return contact
 
 
 @router.put("/{contact_id}", response_model=ContactOut)
+@query_budget(1)
 async def update_contact_api(
     contact_id: int,
     data: ContactUpdate,
+    response: Response,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
@@ -95,6 +360,7 @@ async def update_contact_api(
     Args:
         contact_id: Ідентифікатор контакту.
         data: Нові дані контакту.
+        response: HTTP-відповідь для заголовка ETag.
         session: Асинхронна сесія бази даних.
         current_user: Авторизований користувач.
 
@@ -104,14 +370,17 @@ async def update_contact_api(
     Raises:
         HTTPException: Якщо контакт не знайдено.
     """
-    contact = await get_contact_by_id(session, contact_id, user_id=current_user.id)
-    if not contact:
+    contact = await update_contact(session, contact_id, current_user.id, data)
+    if contact is None:
         raise HTTPException(status_code=404, detail="Contact not found")
 
-    return await update_contact(session, contact, data)
+    await mark_user_write(current_user.id)
+    response.headers.update(etag_headers(make_etag("contact", contact.id, contact.version)))
+    return contact
 
 
 @router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(1)
 async def delete_contact_api(
     contact_id: int,
     session: AsyncSession = Depends(get_session),
@@ -128,57 +397,8 @@ async def delete_contact_api(
     Raises:
         HTTPException: Якщо контакт не знайдено.
     """
-    contact = await get_contact_by_id(session, contact_id, user_id=current_user.id)
-    if not contact:
+    if not await delete_contact(session, contact_id, current_user.id):
         raise HTTPException(status_code=404, detail="Contact not found")
 
-    await delete_contact(session, contact)
+    await mark_user_write(current_user.id)
     return None
-
-
-@router.get("/search", response_model=list[ContactOut])
-async def search_contacts_api(
-    first_name: str | None = None,
-    last_name: str | None = None,
-    email: str | None = None,
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Пошук контактів за ім’ям, прізвищем або email.
-
-    Args:
-        first_name: Фільтр за ім’ям.
-        last_name: Фільтр за прізвищем.
-        email: Фільтр за email.
-        session: Асинхронна сесія бази даних.
-        current_user: Авторизований користувач.
-
-    Returns:
-        list[ContactOut]: Список знайдених контактів.
-    """
-    return await search_contacts(
-        session,
-        user_id=current_user.id,
-        first_name=first_name,
-        last_name=last_name,
-        email=email,
-    )
-
-
-@router.get("/birthdays", response_model=list[ContactOut])
-async def birthdays_api(
-    session: AsyncSession = Depends(get_session),
-    current_user: User = Depends(get_current_user),
-):
-    """
-    Повертає список контактів, у яких день народження незабаром.
-
-    Args:
-        session: Асинхронна сесія бази даних.
-        current_user: Авторизований користувач.
-
-    Returns:
-        list[ContactOut]: Список контактів із близькими днями народження.
-    """
-    return await get_upcoming_birthdays(session, user_id=current_user.id)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.database import engine, replica_engine
+from app.services.auth import token_cache, token_cache_stats
+from app.services.avatar import avatar_executor
+from app.services.cache import cache_stats, get_cache_stats, get_response_cache_stats, response_cache_stats
+from app.services.db_pool import get_pool_stats
+from app.services.email import mail_outbox
+from app.services.hashing import password_hasher
+from app.services.metrics import REGISTRY
+from app.services.outbox import outbox_relay
+
+router = APIRouter(tags=["Metrics"])
+
+# Накопичувальні лічильники пулів потоків та пулу з'єднань
+EXECUTOR_COUNTERS = ("completed", "rejected", "latency_seconds_total")
+DB_POOL_COUNTERS = (
+    "checkouts",
+    "checkout_wait_seconds_total",
+    "connections_opened",
+    "connections_closed",
+    "connections_invalidated",
+)
+
+# Стан кешів, пулу БД, пулів потоків та черги листів: лічильники — як counter,
+# поточні розміри й глибини черг — як gauge
+REGISTRY.register_collector("user_cache", get_cache_stats, counters=cache_stats)
+REGISTRY.register_collector(
+    "contacts_response_cache", get_response_cache_stats, counters=response_cache_stats,
+)
+REGISTRY.register_collector(
+    "jwt_cache", lambda: {**token_cache_stats, "size": len(token_cache)}, counters=token_cache_stats,
+)
+REGISTRY.register_collector("password_hash_pool", password_hasher.stats, counters=EXECUTOR_COUNTERS)
+REGISTRY.register_collector("avatar_pool", avatar_executor.stats, counters=EXECUTOR_COUNTERS)
+REGISTRY.register_collector(
+    "mail_outbox", mail_outbox.stats,
+    counters=("sent", "failed", "rejected", "retries", "batches", "connections"),
+)
+REGISTRY.register_collector("outbox_relay", outbox_relay.stats, counters=("dispatched", "failed", "batches"))
+REGISTRY.register_collector("db_pool", lambda: get_pool_stats(engine), counters=DB_POOL_COUNTERS)
+if replica_engine is not None:
+    REGISTRY.register_collector(
+        "db_replica_pool", lambda: get_pool_stats(replica_engine), counters=DB_POOL_COUNTERS,
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Повертає метрики застосунку у текстовому форматі Prometheus.
+    """
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
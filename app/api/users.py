@@ -1,43 +1,93 @@
 from typing import Sequence
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_session
 from app.services.auth import get_current_user
+from app.services.limiter import limiter
 from app.models.user import User
-from app.services.avatar import upload_avatar as upload_avatar_service
-from app.schemas.user import UserOut, UserRoleUpdate
+from app.services.avatar import (
+    create_avatar_job,
+    get_avatar_job,
+    process_avatar_async,
+    read_upload,
+    stage_avatar_upload,
+    upload_avatar as upload_avatar_service,
+)
+from app.schemas.user import AvatarJobOut, UserOut, UserRoleUpdate
 from app.services.permissions import require_admin
-from app.crud.user import get_user_by_id, get_all_users, update_user_role
+from app.crud.user import get_all_users, update_user_role
 from app.services.cache import delete_cached_user
+from app.services.outbox import add_outbox_event, outbox_relay
+from app.services.read_routing import get_read_session, mark_user_write
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.post("/avatar")
+@limiter.limit("10/minute")
 async def upload_avatar(
+        request: Request,
+        background_tasks: BackgroundTasks,
         file: UploadFile = File(...),
+        background: bool = Query(False, description="Обробити у фоні та повернути job_id"),
         session: AsyncSession = Depends(get_session),
         current_user: User = Depends(get_current_user),
 ):
     """
-    Завантажує новий аватар користувача до Cloudinary та оновлює його профіль.
+    Завантажує новий аватар користувача до сховища та оновлює його профіль.
+
+    З ``background=true`` повертає ``202`` з задачею, стан якої доступний
+    через ``GET /users/avatar/jobs/{job_id}``.
     """
+    source, digest = await read_upload(file)
+
+    if background:
+        job = await create_avatar_job(current_user.id)
+        path = await stage_avatar_upload(source, digest)
+        add_outbox_event(session, "avatar.process", {"job": job, "path": path, "digest": digest})
+        await session.commit()
+        background_tasks.add_task(outbox_relay.dispatch, session)
+        return JSONResponse(
+            AvatarJobOut(**job).model_dump(), status_code=status.HTTP_202_ACCEPTED,
+        )
+
     try:
-        avatar_url = await upload_avatar_service(file)
+        avatar_url = await process_avatar_async(source, digest)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload error: {e}")
 
     db_user = await session.merge(current_user)
     db_user.avatar_url = avatar_url
+    # Кеш користувача очищується подією outbox з тим самим commit(), що й новий URL
+    add_outbox_event(session, "cache.invalidate_user", {"email": db_user.email})
     await session.commit()
     await session.refresh(db_user)
+    await mark_user_write(current_user.id)
+    background_tasks.add_task(outbox_relay.dispatch, session)
 
     return {"avatar_url": avatar_url}
 
 
+@router.get("/avatar/jobs/{job_id}", response_model=AvatarJobOut)
+async def get_avatar_job_status(job_id: str, current_user: User = Depends(get_current_user)):
+    """
+    Повертає стан фонової задачі обробки аватара.
+    """
+    job = await get_avatar_job(job_id)
+    if job is None or job["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Avatar job not found")
+    return job
+
+
 @router.get("/me", response_model=UserOut)
-async def get_current_user_profile(current_user: User = Depends(get_current_user)):
+@limiter.limit("5/minute")
+async def get_current_user_profile(request: Request, current_user: User = Depends(get_current_user)):
     """
     Отримує профіль поточного користувача.
     """
@@ -48,7 +98,7 @@ async def get_current_user_profile(current_user: User = Depends(get_current_user
 async def get_all_users_admin(
         skip: int = 0,
         limit: int = 100,
-        session: AsyncSession = Depends(get_session),
+        session: AsyncSession = Depends(get_read_session),
         admin_user: User = Depends(require_admin)
 ):
     """
@@ -68,15 +118,14 @@ async def update_user_role_admin(
     """
     Оновлює роль користувача (тільки для админів).
     """
-    user = await get_user_by_id(session, user_id)
-    if not user:
+    updated_user = await update_user_role(session, user_id, role_data.role)
+    if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
-
-    # Оновлюємо роль
-    updated_user = await update_user_role(session, user, role_data.role)
+    await session.commit()
 
     # Очищуємо кеш користувача
-    await delete_cached_user(user.email)
+    await delete_cached_user(updated_user.email)
+    await mark_user_write(admin_user.id)
 
     return {"message": f"User role updated to {role_data.role}", "user": updated_user}
 
@@ -91,6 +140,10 @@ async def upload_default_avatar_admin(
     """
     try:
         avatar_url = await upload_avatar_service(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload error: {e}")
 
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 from pydantic import Field
 import os
@@ -16,6 +18,20 @@ class Settings(BaseSettings):
     postgres_db: str = Field(alias="POSTGRES_DB")
     database_url: str = Field(alias="DATABASE_URL")
 
+    # Пул з'єднань з основною БД
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+
+    # Репліка для читання (необов'язкова)
+    database_replica_url: str | None = Field(alias="DATABASE_REPLICA_URL", default=None)
+    replica_max_lag_seconds: float = 5
+    replica_lag_check_interval: float = 2
+    read_your_writes_seconds: int = 10
+
     # Test database
     postgres_test_user: str = Field(alias="POSTGRES_TEST_USER")
     postgres_test_password: str = Field(alias="POSTGRES_TEST_PASSWORD")
@@ -25,6 +41,7 @@ class Settings(BaseSettings):
     secret_key: str = Field(alias="SECRET_KEY")
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
+    jwt_cache_max_size: int = 10_000
 
     # SMTP
     smtp_host: str = Field(alias="SMTP_HOST", default="localhost")
@@ -33,8 +50,62 @@ class Settings(BaseSettings):
     smtp_password: str = Field(alias="SMTP_PASSWORD", default="")
     mail_from: str = Field(alias="MAIL_FROM", default="noreply@contacts.local")
 
+    # Черга листів: доставка через SMTP (вимкнено — лише вивід посилань у консоль)
+    mail_delivery_enabled: bool = False
+    smtp_batch_size: int = 20
+    smtp_max_queue: int = 1000
+    smtp_max_retries: int = 3
+    smtp_retry_backoff: float = 0.5
+    smtp_idle_timeout: float = 30.0
+
     app_url: str = Field(alias="APP_URL")
 
+    # Ендпоінт /metrics у форматі Prometheus (вимкнено за замовчуванням)
+    metrics_enabled: bool = False
+
+    # Rate limiting: сховище лічильників (за замовчуванням REDIS_URL)
+    rate_limit_enabled: bool = True
+    rate_limit_storage_uri: str | None = None
+
+    # Кеш відповідей ендпоінтів читання контактів у Redis (вимкнено за замовчуванням)
+    contacts_response_cache_enabled: bool = False
+    contacts_response_cache_ttl: int = 60
+    contacts_response_cache_max_bytes: int = 256 * 1024
+
+    # Контроль кількості SQL-запитів на запит (off / warn / strict) та поріг N+1
+    query_budget_mode: Literal["off", "warn", "strict"] = "off"
+    query_repeat_threshold: int = 3
+
+    # Ретранслятор outbox: розмір пачки, повтори, оренда пачки (с) та період опитування таблиці
+    outbox_relay_enabled: bool = True
+    outbox_batch_size: int = 100
+    outbox_max_attempts: int = 5
+    outbox_retry_backoff: float = 1.0
+    outbox_lease_seconds: float = 300.0
+    outbox_poll_interval: float = 1.0
+
+    # Пул потоків для bcrypt-хешування паролів
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
+
+    # Аватари: розміри варіантів (px), якість WebP, ліміт пікселів зображення,
+    # пул потоків та TTL стану фонових задач
+    avatar_sizes: list[int] = [256, 128, 64]
+    avatar_quality: int = 80
+    avatar_max_pixels: int = 4096 * 4096
+    avatar_workers: int = 2
+    avatar_max_queue: int = 16
+    avatar_job_ttl: int = 3600
+
+    # Сховище аватарів (cloudinary / local), максимальний розмір файлу та TTL
+    # індексу «хеш вмісту → URL» у Redis (секунди)
+    avatar_storage: Literal["cloudinary", "local"] = "cloudinary"
+    avatar_storage_path: str = "media/avatars"
+    avatar_storage_url: str = "/media/avatars"
+    avatar_max_bytes: int = 5 * 1024 * 1024
+    avatar_url_index_ttl: int = 30 * 24 * 3600
+    avatar_staging_path: str = "media/staging"
+
     # Cloudinary
     cloudinary_name: str = Field(alias="CLOUDINARY_CLOUD_NAME")
     cloudinary_api_key: str = Field(alias="CLOUDINARY_API_KEY")
@@ -48,5 +119,9 @@ class Settings(BaseSettings):
 
     redis_url: str = "redis://localhost:6379"
 
+    # Локальний (L1) кеш користувачів перед Redis
+    user_cache_l1_max_size: int = 10_000
+    user_cache_l1_ttl: int = 60
+
 
 settings = Settings()
@@ -1,16 +1,129 @@
-from sqlalchemy import select
+import calendar
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Sequence
+
+from sqlalchemy import CTE, Row, delete, func, insert, or_, select, tuple_, update
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.contact import Contact
+from app.models.user import User
 from app.schemas.contact import ContactCreate, ContactUpdate
+from app.services.cache import bump_contacts_generation
+
+# Колонки відповіді ContactOut (без owner_id та birthday_md).
+# Функції тільки для читання вибирають їх через Core ``select(*колонки)``
+# і повертають легкі рядки ``Row`` з доступом за атрибутами, оминаючи
+# identity map сесії; ORM-сутності залишаються для шляхів запису.
+CONTACT_OUT_COLUMNS = (
+    Contact.id,
+    Contact.first_name,
+    Contact.last_name,
+    Contact.email,
+    Contact.phone,
+    Contact.birthday,
+    Contact.additional_info,
+)
 
 
-async def get_contacts(session: AsyncSession, user_id: int):
+async def get_contacts(
+    session: AsyncSession,
+    user_id: int,
+    limit: int | None = None,
+    after: tuple[Any, int] | None = None,
+    sort: str = "id",
+) -> Sequence[Row]:
     """
-    Повертає всі контакти користувача.
+    Повертає контакти користувача (рядки ``CONTACT_OUT_COLUMNS``), впорядковані за (sort, id).
+
+    Якщо передано ``after`` (значення ключа сортування та ID останнього
+    запису попередньої сторінки), вибірка продовжується одразу після нього
+    (keyset-пагінація по індексу ``(owner_id, sort, id)``).
     """
-    stmt = select(Contact).where(Contact.owner_id == user_id)
+    stmt = select(*CONTACT_OUT_COLUMNS).where(Contact.owner_id == user_id)
+
+    if sort == "id":
+        if after is not None:
+            stmt = stmt.where(Contact.id > after[1])
+        stmt = stmt.order_by(Contact.id)
+    else:
+        sort_column = getattr(Contact, sort)
+        if after is not None:
+            stmt = stmt.where(tuple_(sort_column, Contact.id) > tuple_(*after))
+        stmt = stmt.order_by(sort_column, Contact.id)
+
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
     result = await session.execute(stmt)
-    return result.scalars().all()
+    return result.all()
+
+
+async def stream_contacts(
+    session: AsyncSession,
+    user_id: int,
+    batch_size: int = 1000,
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Потоково повертає всі контакти користувача пачками по ``batch_size``.
+
+    Використовує серверний курсор (``stream`` + ``yield_per``),
+    тому в пам'яті одночасно знаходиться не більше однієї пачки.
+    """
+    stmt = (
+        select(*CONTACT_OUT_COLUMNS)
+        .where(Contact.owner_id == user_id)
+        .order_by(Contact.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await session.stream(stmt)
+    async for batch in result.partitions():
+        yield batch
+
+
+async def get_contacts_version(session: AsyncSession, user_id: int) -> int:
+    """
+    Повертає версію списку контактів користувача (пошук по первинному ключу users).
+    """
+    result = await session.execute(select(User.contacts_version).where(User.id == user_id))
+    return result.scalar_one_or_none() or 0
+
+
+async def get_contact_version(session: AsyncSession, contact_id: int, user_id: int) -> int | None:
+    """
+    Повертає версію контакту без завантаження самого контакту.
+    """
+    stmt = select(Contact.version).where(Contact.id == contact_id, Contact.owner_id == user_id)
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def _bump_contacts_version(session: AsyncSession, user_id: int) -> None:
+    """
+    Збільшує версію списку контактів власника в поточній транзакції.
+    """
+    await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(contacts_version=User.contacts_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _bump_contacts_version_cte(user_id: int, *where) -> CTE:
+    """
+    Те саме збільшення версії як data-modifying CTE для запиту запису контакту.
+
+    Додаткові умови ``where`` дозволяють збільшувати версію лише тоді, коли
+    контакт існує: CTE та основний запит бачать один знімок, тож ``EXISTS``
+    перевіряє контакт до його зміни чи видалення.
+    """
+    return (
+        update(User)
+        .where(User.id == user_id, *where)
+        .values(contacts_version=User.contacts_version + 1)
+        .returning(User.id)
+        .cte("bump_contacts_version")
+    )
 
 
 async def get_contact_by_id(session: AsyncSession, contact_id: int, user_id: int):
@@ -25,38 +138,137 @@ async def get_contact_by_id(session: AsyncSession, contact_id: int, user_id: int
     return result.scalar_one_or_none()
 
 
-async def create_contact(session: AsyncSession, data: ContactCreate, user_id: int):
+async def create_contact(session: AsyncSession, data: ContactCreate, user_id: int) -> Row:
     """
     Створює новий контакт для вказаного користувача.
+
+    ``INSERT ... RETURNING`` разом зі збільшенням версії списку контактів
+    (CTE з :func:`_bump_contacts_version_cte`) — один запит і ``commit()``,
+    без ``refresh()``.
+
+    Returns:
+        Row: Рядок ``CONTACT_OUT_COLUMNS`` та ``version`` створеного контакту.
     """
-    contact = Contact(
-        **data.model_dump(),
-        owner_id=user_id,
+    # version явно: з CTE SQLAlchemy не підставляє Python-default колонки
+    stmt = (
+        insert(Contact)
+        .values(**data.model_dump(), owner_id=user_id, version=1)
+        .returning(*CONTACT_OUT_COLUMNS, Contact.version)
+        .add_cte(_bump_contacts_version_cte(user_id))
     )
-    session.add(contact)
+    contact = (await session.execute(stmt)).one()
     await session.commit()
-    await session.refresh(contact)
+    await bump_contacts_generation(user_id)
     return contact
 
 
-async def update_contact(session: AsyncSession, contact: Contact, data: ContactUpdate):
+async def _insert_chunk(session: AsyncSession, stmt, rows: list[dict]) -> list[int] | None:
     """
-    Оновлює існуючий контакт частковими даними.
+    Вставляє рядки в точці збереження; None, якщо БД їх відхилила.
     """
-    for field, value in data.model_dump(exclude_unset=True).items():
-        setattr(contact, field, value)
+    try:
+        async with session.begin_nested():
+            result = await session.execute(stmt, rows)
+            return list(result.scalars().all())
+    except DBAPIError:
+        return None
 
+
+async def create_contacts_bulk(
+    session: AsyncSession,
+    items: Sequence[ContactCreate],
+    user_id: int,
+    chunk_size: int = 1000,
+) -> list[int | None]:
+    """
+    Створює багато контактів одним комітом через багаторядкові INSERT ... RETURNING.
+
+    Рядки вставляються пачками по ``chunk_size``, кожна — у власній точці
+    збереження. Якщо БД відхиляє пачку, її рядки вставляються окремо, тож
+    помилка одного рядка не скасовує решту запиту.
+
+    Returns:
+        list[int | None]: ID створених контактів у тому ж порядку, що й
+        ``items``; None для рядків, які БД відхилила.
+    """
+    if not items:
+        return []
+
+    stmt = insert(Contact).returning(Contact.id, sort_by_parameter_order=True)
+    ids: list[int | None] = []
+
+    for start in range(0, len(items), chunk_size):
+        rows = [
+            {**item.model_dump(), "owner_id": user_id}
+            for item in items[start:start + chunk_size]
+        ]
+        chunk_ids = await _insert_chunk(session, stmt, rows)
+        if chunk_ids is None:
+            chunk_ids = []
+            for row in rows:
+                row_ids = await _insert_chunk(session, stmt, [row])
+                chunk_ids.append(row_ids[0] if row_ids else None)
+        ids.extend(chunk_ids)
+
+    if not any(contact_id is not None for contact_id in ids):
+        await session.rollback()
+        return ids
+
+    await _bump_contacts_version(session, user_id)
+    await session.commit()
+    await bump_contacts_generation(user_id)
+    return ids
+
+
+async def update_contact(
+    session: AsyncSession, contact_id: int, user_id: int, data: ContactUpdate
+) -> Row | None:
+    """
+    Оновлює контакт користувача частковими даними одним ``UPDATE ... RETURNING``.
+
+    Версія списку контактів збільшується в тому ж запиті лише тоді, коли
+    контакт існує і належить користувачу.
+
+    Returns:
+        Row | None: Рядок ``CONTACT_OUT_COLUMNS`` та ``version`` або None,
+        якщо контакт не знайдено.
+    """
+    owned = (Contact.id == contact_id, Contact.owner_id == user_id)
+    stmt = (
+        update(Contact)
+        .where(*owned)
+        .values(**data.model_dump(exclude_unset=True), version=Contact.version + 1)
+        .returning(*CONTACT_OUT_COLUMNS, Contact.version)
+        .add_cte(_bump_contacts_version_cte(user_id, select(Contact.id).where(*owned).exists()))
+        .execution_options(synchronize_session=False)
+    )
+    contact = (await session.execute(stmt)).one_or_none()
     await session.commit()
-    await session.refresh(contact)
+    if contact is not None:
+        await bump_contacts_generation(user_id)
     return contact
 
 
-async def delete_contact(session: AsyncSession, contact: Contact):
+async def delete_contact(session: AsyncSession, contact_id: int, user_id: int) -> bool:
     """
-    Видаляє контакт користувача.
+    Видаляє контакт користувача одним ``DELETE ... RETURNING``.
+
+    Returns:
+        bool: False, якщо контакт не знайдено.
     """
-    await session.delete(contact)
+    owned = (Contact.id == contact_id, Contact.owner_id == user_id)
+    stmt = (
+        delete(Contact)
+        .where(*owned)
+        .returning(Contact.id)
+        .add_cte(_bump_contacts_version_cte(user_id, select(Contact.id).where(*owned).exists()))
+        .execution_options(synchronize_session=False)
+    )
+    deleted = (await session.execute(stmt)).scalar_one_or_none() is not None
     await session.commit()
+    if deleted:
+        await bump_contacts_generation(user_id)
+    return deleted
 
 
 async def search_contacts(
@@ -64,12 +276,19 @@ async def search_contacts(
     user_id: int,
     first_name=None,
     last_name=None,
-    email=None
-):
+    email=None,
+    q: str | None = None,
+    limit: int | None = None,
+) -> Sequence[Row]:
     """
     Пошук контактів користувача за частковими полями.
+
+    Параметр ``q`` шукає одночасно за ім'ям, прізвищем та email з
+    урахуванням опечаток (оператор ``%`` з pg_trgm) і впорядковує
+    результати за ``similarity()``. Усі предикати обслуговуються
+    GIN-індексами ``gin_trgm_ops`` на ``(owner_id, поле)``.
     """
-    stmt = select(Contact).where(Contact.owner_id == user_id)
+    stmt = select(*CONTACT_OUT_COLUMNS).where(Contact.owner_id == user_id)
 
     if first_name:
         stmt = stmt.where(Contact.first_name.ilike(f"%{first_name}%"))
@@ -78,30 +297,78 @@ async def search_contacts(
     if email:
         stmt = stmt.where(Contact.email.ilike(f"%{email}%"))
 
+    if q:
+        fields = (Contact.first_name, Contact.last_name, Contact.email)
+        stmt = stmt.where(
+            or_(*(field.op("%")(q) for field in fields), *(field.ilike(f"%{q}%") for field in fields))
+        )
+        rank = func.greatest(*(func.similarity(field, q) for field in fields))
+        stmt = stmt.order_by(rank.desc(), Contact.id)
+    else:
+        stmt = stmt.order_by(Contact.id)
+
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
     result = await session.execute(stmt)
-    return result.scalars().all()
+    return result.all()
 
 
-async def get_upcoming_birthdays(session: AsyncSession, user_id: int):
+def birthday_window(today: date, days: int) -> tuple[int, int] | None:
     """
-    Повертає контакти, у яких день народження буде протягом наступних 7 днів.
+    Обчислює діапазон ключів ``birthday_md`` для вікна [today, today + days].
+
+    Якщо вікно переходить через Новий рік, початок діапазону більший за
+    кінець. Народжені 29 лютого у невисокосні роки святкують 28 лютого,
+    тому вікно, що закінчується 28 лютого невисокосного року, включає 229.
+
+    Returns:
+        tuple[int, int] | None: (початок, кінець) або None, якщо вікно
+        охоплює цілий рік.
     """
-    from datetime import date, timedelta
+    if days >= 365:
+        return None
 
-    today = date.today()
-    end = today + timedelta(days=7)
+    end = today + timedelta(days=days)
+    start_md = today.month * 100 + today.day
+    end_md = end.month * 100 + end.day
 
-    stmt = select(Contact).where(
+    if (end.month, end.day) == (2, 28) and not calendar.isleap(end.year):
+        end_md = 229
+
+    return start_md, end_md
+
+
+async def get_upcoming_birthdays(
+    session: AsyncSession,
+    user_id: int,
+    days: int = 7,
+    today: date | None = None,
+) -> Sequence[Row]:
+    """
+    Повертає контакти, у яких день народження буде протягом наступних ``days`` днів.
+
+    Фільтрація виконується одним запитом по індексу ``(owner_id, birthday_md)``;
+    результати впорядковані від найближчого дня народження.
+    """
+    today = today or date.today()
+    start_md = today.month * 100 + today.day
+
+    stmt = select(*CONTACT_OUT_COLUMNS).where(
         Contact.owner_id == user_id,
-        Contact.birthday.is_not(None)
+        Contact.birthday_md.is_not(None),
     )
-    result = await session.execute(stmt)
-    contacts = result.scalars().all()
 
-    upcoming = []
-    for c in contacts:
-        b = c.birthday
-        if b and today <= b.replace(year=today.year) <= end:
-            upcoming.append(c)
+    window = birthday_window(today, days)
+    if window:
+        start_md, end_md = window
+        if start_md <= end_md:
+            stmt = stmt.where(Contact.birthday_md.between(start_md, end_md))
+        else:
+            stmt = stmt.where(or_(Contact.birthday_md >= start_md, Contact.birthday_md <= end_md))
 
-    return upcoming
+    # Спочатку дні народження до кінця року, потім — після переходу через Новий рік
+    stmt = stmt.order_by(Contact.birthday_md < start_md, Contact.birthday_md, Contact.id)
+
+    result = await session.execute(stmt)
+    return result.all()
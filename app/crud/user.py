@@ -1,9 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from passlib.context import CryptContext
 
 from app.models.user import User
 from app.schemas.user import UserCreate
+from app.services.hashing import password_hasher
 from typing import Sequence
 
 
@@ -24,6 +26,20 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Перевіряє пароль у пулі bcrypt, не блокуючи event loop.
+    """
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Хешує пароль у пулі bcrypt, не блокуючи event loop.
+    """
+    return await password_hasher.run(hash_password, password)
+
+
 async def get_user_by_email(session: AsyncSession, email: str) -> User | None:
     """
     Повертає користувача за email або None, якщо його не існує.
@@ -33,24 +49,45 @@ async def get_user_by_email(session: AsyncSession, email: str) -> User | None:
     return result.scalar_one_or_none()
 
 
-async def create_user(session: AsyncSession, user_data: UserCreate) -> User:
-    """
-    Створює нового користувача з хешованим паролем та повертає його.
+async def create_user(session: AsyncSession, user_data: UserCreate, is_verified: bool = False) -> User | None:
     """
-    hashed_pwd = hash_password(user_data.password)
+    Створює нового користувача з хешованим паролем запитом
+    ``INSERT ... ON CONFLICT (email) DO NOTHING RETURNING``.
 
-    new_user = User(
-        email=str(user_data.email),
-        username=user_data.username,
-        password=hashed_pwd,
-        is_verified=False,
-    )
+    Спершу індексований ``SELECT`` за email: для зайнятого email bcrypt не
+    запускається, тож повторні реєстрації не займають пул хешування.
+    ``ON CONFLICT`` лишається на випадок гонки між перевіркою та вставкою —
+    паралельні реєстрації з тим самим email не призводять до ``IntegrityError``.
+    ``commit()`` робить викликач.
+
+    Args:
+        session: Асинхронна сесія БД.
+        user_data: Дані реєстрації.
+        is_verified: Чи вважати email підтвердженим одразу.
 
-    session.add(new_user)
-    await session.commit()
-    await session.refresh(new_user)
+    Returns:
+        User | None: Створений користувач або None, якщо email уже зайнятий.
+    """
+    email = str(user_data.email)
+    existing = await session.execute(select(User.id).where(User.email == email))
+    if existing.scalar_one_or_none() is not None:
+        return None
 
-    return new_user
+    hashed_pwd = await hash_password_async(user_data.password)
+
+    stmt = (
+        pg_insert(User)
+        .values(
+            email=email,
+            username=user_data.username,
+            password=hashed_pwd,
+            is_verified=is_verified,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
 
 
 async def authenticate_user(session: AsyncSession, email: str, password: str) -> User | None:
@@ -63,28 +100,54 @@ async def authenticate_user(session: AsyncSession, email: str, password: str) ->
     if not user:
         return None
 
-    if not verify_password(password, user.password):
+    if not await verify_password_async(password, user.password):
         return None
 
     return user
 
 
-async def update_user_password(session: AsyncSession, user: User, new_password: str) -> User:
+async def update_user_password(session: AsyncSession, email: str, new_password: str) -> User | None:
     """
-    Оновлює пароль користувача.
+    Оновлює пароль користувача одним ``UPDATE ... RETURNING``.
+
+    ``commit()`` робить викликач — разом із подіями outbox.
 
     Args:
         session: Асинхронна сесія БД.
-        user: Користувач для оновлення пароля.
+        email: Email користувача.
         new_password: Новий пароль.
 
     Returns:
-        User: Оновлений користувач.
+        User | None: Оновлений користувач або None, якщо його не існує.
     """
-    user.password = hash_password(new_password)
-    await session.commit()
-    await session.refresh(user)
-    return user
+    hashed_pwd = await hash_password_async(new_password)
+    return await update_user_password_hash(session, email, hashed_pwd)
+
+
+async def update_user_password_hash(session: AsyncSession, email: str, hashed_password: str) -> User | None:
+    """
+    Записує вже обчислений bcrypt-хеш пароля одним ``UPDATE ... RETURNING``.
+
+    Дозволяє викликачу хешувати пароль до незворотних кроків (як-от
+    споживання токена скидання). ``commit()`` робить викликач.
+
+    Args:
+        session: Асинхронна сесія БД.
+        email: Email користувача.
+        hashed_password: bcrypt-хеш нового пароля.
+
+    Returns:
+        User | None: Оновлений користувач або None, якщо його не існує.
+    """
+    stmt = (
+        update(User)
+        .where(User.email == email)
+        .values(password=hashed_password)
+        .returning(User)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
 
 
 async def get_all_users(session: AsyncSession, skip: int = 0, limit: int = 100) -> Sequence[User]:  # ← исправь тип
@@ -104,22 +167,29 @@ async def get_all_users(session: AsyncSession, skip: int = 0, limit: int = 100)
     return result.scalars().all()
 
 
-async def update_user_role(session: AsyncSession, user: User, new_role: str) -> User:
+async def update_user_role(session: AsyncSession, user_id: int, new_role: str) -> User | None:
     """
-    Оновлює роль користувача (тільки для админів).
+    Оновлює роль користувача (тільки для админів) одним ``UPDATE ... RETURNING``.
+
+    ``commit()`` робить викликач.
 
     Args:
         session: Асинхронна сесія БД.
-        user: Користувач для оновлення.
+        user_id: ID користувача.
         new_role: Нова роль користувача.
 
     Returns:
-        User: Оновлений користувач.
-    """
-    user.role = new_role
-    await session.commit()
-    await session.refresh(user)
-    return user
+        User | None: Оновлений користувач або None, якщо його не існує.
+    """
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(role=new_role)
+        .returning(User)
+        .execution_options(populate_existing=True)
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
 
 
 async def get_user_by_id(session: AsyncSession, user_id: int) -> User | None:
@@ -135,4 +205,25 @@ async def get_user_by_id(session: AsyncSession, user_id: int) -> User | None:
     """
     stmt = select(User).filter(User.id == user_id)
     result = await session.execute(stmt)
-    return result.scalar_one_or_none()
\ No newline at end of file
+    return result.scalar_one_or_none()
+
+async def update_user_avatar(session: AsyncSession, user_id: int, avatar_url: str) -> str | None:
+    """
+    Оновлює URL аватара користувача без ``commit()`` — транзакцію фіксує викликач.
+
+    Args:
+        session: Асинхронна сесія БД.
+        user_id: ID користувача.
+        avatar_url: Новий URL аватара.
+
+    Returns:
+        str | None: Email користувача (ключ його кешу) або None, якщо його не існує.
+    """
+    result = await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(avatar_url=avatar_url)
+        .returning(User.email)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
@@ -1,14 +1,51 @@
 from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 
 from app.config import settings
+from app.services.db_pool import InstrumentedAsyncQueuePool, instrument_pool
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    """
+    Створює асинхронний двигун з налаштуваннями пулу з ``Settings``.
+
+    Args:
+        url: URL підключення до бази даних.
+
+    Returns:
+        AsyncEngine: Двигун з інструментованим пулом з'єднань.
+    """
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={"prepared_statement_cache_size": settings.db_statement_cache_size},
+    )
+
 
 # Асинхронний двигун для підключення до бази даних
-engine = create_async_engine(settings.database_url, echo=False)
+engine = _create_engine(settings.database_url)
+
+# Метрики пулу з'єднань (див. app.services.db_pool.get_pool_stats)
+pool_metrics = instrument_pool(engine)
 
 # Фабрика для створення асинхронних сесій
 async_session = async_sessionmaker(engine, expire_on_commit=False)
 
+# Необов'язкова репліка для запитів тільки на читання
+replica_engine: AsyncEngine | None = None
+async_replica_session: async_sessionmaker | None = None
+
+if settings.database_replica_url:
+    replica_engine = _create_engine(settings.database_replica_url)
+    replica_pool_metrics = instrument_pool(replica_engine)
+    async_replica_session = async_sessionmaker(replica_engine, expire_on_commit=False)
+
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -1,21 +1,65 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
+from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
-from app.services.limiter import limiter
+from app.config import settings
+from app.database import async_session
+from app.services.avatar import AvatarUploadLimitMiddleware
+from app.services.limiter import limiter, rate_limit_exceeded_handler
+from app.services.metrics import MetricsMiddleware, install_sql_hooks
+from app.services.query_budget import QueryLogMiddleware
+from app.services.cache import start_invalidation_listener, stop_invalidation_listener
+from app.services.email import mail_outbox
+from app.services.outbox import outbox_relay
 from app.api.auth import router as auth_router
 from app.api.contacts import router as contacts_router
 from app.api.users import router as users_router
 
 
-app = FastAPI(title="Contacts API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Запускає та зупиняє фонові завдання застосунку.
+    """
+    start_invalidation_listener()
+    if settings.mail_delivery_enabled:
+        mail_outbox.start()
+    if settings.outbox_relay_enabled:
+        outbox_relay.start(async_session)
+    yield
+    await outbox_relay.stop()
+    await mail_outbox.stop()
+    await stop_invalidation_listener()
+
+
+app = FastAPI(title="Contacts API", lifespan=lifespan)
 
 app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(AvatarUploadLimitMiddleware)
 
 app.include_router(auth_router)
 app.include_router(contacts_router, prefix="/contacts")
 app.include_router(users_router)
 
+if settings.avatar_storage == "local":
+    # Локальне сховище аватарів роздається самим застосунком
+    app.mount(settings.avatar_storage_url, StaticFiles(directory=settings.avatar_storage_path), name="avatars")
+
+if settings.metrics_enabled:
+    from app.api.metrics import router as metrics_router
+
+    install_sql_hooks()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
+if settings.query_budget_mode != "off":
+    app.add_middleware(QueryLogMiddleware)
+
 
 app.add_middleware(
     CORSMiddleware,
@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Computed, Integer, SmallInteger, String, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
+# Поля нечіткого пошуку контактів (оператор ``%`` з pg_trgm)
+TRIGRAM_SEARCH_COLUMNS = ("first_name", "last_name", "email")
+
 
 class Contact(Base):
     """
@@ -17,7 +20,39 @@ class Contact(Base):
     birthday = Column(Date, nullable=True)
     additional_info = Column(String(255), nullable=True)
 
+    # Ключ «місяць * 100 + день» дня народження (наприклад, 1231 для 31 грудня),
+    # обчислюється БД; дозволяє шукати найближчі дні народження по індексу
+    birthday_md = Column(
+        SmallInteger,
+        Computed(
+            "(EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday))::smallint",
+            persisted=True,
+        ),
+    )
+
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
+    # Версія контакту: збільшується при кожному оновленні (для ETag)
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+
     # Зв’язок з користувачем
     owner = relationship("User", back_populates="contacts")
+
+    __table_args__ = (
+        # Індекси для keyset-пагінації списку контактів власника
+        Index("ix_contacts_owner_id_id", "owner_id", "id"),
+        Index("ix_contacts_owner_id_last_name_id", "owner_id", "last_name", "id"),
+        Index("ix_contacts_owner_id_birthday_md", "owner_id", "birthday_md"),
+        # Триграмні GIN-індекси для пошуку в межах контактів власника
+        # (потрібні розширення pg_trgm та btree_gin, див. міграцію b7e3f91a2c64)
+        *(
+            Index(
+                f"ix_contacts_owner_id_{column}_trgm",
+                "owner_id",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+            for column in TRIGRAM_SEARCH_COLUMNS
+        ),
+    )
@@ -0,0 +1,26 @@
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Index, Integer, String, func
+from app.models.base import Base
+
+
+class OutboxEvent(Base):
+    """
+    Подія побічного ефекту (лист, інвалідація кешу, обробка аватара).
+
+    Записується в тій самій транзакції, що й зміна даних, і виконується
+    ретранслятором (:mod:`app.services.outbox`); після успіху видаляється.
+    """
+    __tablename__ = "outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    last_error = Column(String(255), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Не раніше цього часу подія може бути виконана (затримка між повторами)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_outbox_available_at", "available_at"),
+    )
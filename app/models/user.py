@@ -17,5 +17,8 @@ class User(Base):
     avatar_url = Column(String, nullable=True)
     role = Column(String(50), default="user", nullable=False)
 
+    # Версія списку контактів: збільшується при кожній зміні контактів (для ETag)
+    contacts_version = Column(Integer, default=0, server_default="0", nullable=False)
+
     # Зв'язок з контактами
     contacts = relationship("Contact", back_populates="owner")
\ No newline at end of file
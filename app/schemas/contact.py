@@ -1,17 +1,21 @@
-from pydantic import BaseModel, EmailStr
+from typing import Any
+
+from pydantic import BaseModel, EmailStr, Field
 from datetime import date
 
 
 class ContactBase(BaseModel):
     """
     Базова схема контакту з основними полями.
+
+    Обмеження довжини відповідають колонкам таблиці ``contacts``.
     """
-    first_name: str
-    last_name: str
-    email: EmailStr
-    phone: str
+    first_name: str = Field(max_length=100)
+    last_name: str = Field(max_length=100)
+    email: EmailStr = Field(max_length=255)
+    phone: str = Field(max_length=50)
     birthday: date | None = None
-    additional_info: str | None = None
+    additional_info: str | None = Field(None, max_length=255)
 
 
 class ContactCreate(ContactBase):
@@ -25,12 +29,12 @@ class ContactUpdate(BaseModel):
     """
     Схема для часткового оновлення контакту.
     """
-    first_name: str | None = None
-    last_name: str | None = None
-    email: EmailStr | None = None
-    phone: str | None = None
+    first_name: str | None = Field(None, max_length=100)
+    last_name: str | None = Field(None, max_length=100)
+    email: EmailStr | None = Field(None, max_length=255)
+    phone: str | None = Field(None, max_length=50)
     birthday: date | None = None
-    additional_info: str | None = None
+    additional_info: str | None = Field(None, max_length=255)
 
 
 class ContactOut(ContactBase):
@@ -41,3 +45,21 @@ class ContactOut(ContactBase):
 
     class Config:
         from_attributes = True
+
+
+class ContactBulkItemResult(BaseModel):
+    """
+    Результат створення одного контакту в пакетному запиті.
+    """
+    index: int
+    id: int | None = None
+    errors: list[dict[str, Any]] | None = None
+
+
+class ContactBulkResult(BaseModel):
+    """
+    Звіт пакетного створення контактів.
+    """
+    created: int
+    failed: int
+    results: list[ContactBulkItemResult]
@@ -73,4 +73,11 @@ class PasswordReset(BaseModel):
 
 class UserRoleUpdate(BaseModel):
     """Схема для оновлення ролі користувача."""
-    role: str = Field(pattern="^(user|admin)$", description="Role must be 'user' or 'admin'")
\ No newline at end of file
+    role: str = Field(pattern="^(user|admin)$", description="Role must be 'user' or 'admin'")
+
+class AvatarJobOut(BaseModel):
+    """Стан фонової задачі обробки аватара."""
+    id: str
+    status: str = Field(description="pending, processing, done або failed")
+    avatar_url: str | None = None
+    error: str | None = None
@@ -1,3 +1,5 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -11,7 +13,7 @@ from app.database import get_session
 from app.models.user import User
 from app.schemas.user import TokenData
 from app.config import settings
-from app.services.cache import get_cached_user, cache_user  # ← ДОБАВИЛИ
+from app.services.cache import get_cached_user, cache_user, user_cache_epoch, LocalTTLCache  # ← ДОБАВИЛИ
 
 # Секрет і алгоритм JWT
 SECRET_KEY = settings.secret_key
@@ -21,6 +23,13 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60
 # OAuth2 схема (точка отримання токена буде /auth/login)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Кеш розкодованих токенів: ключ — SHA-256 токена, запис живе до його exp
+token_cache = LocalTTLCache(
+    max_size=settings.jwt_cache_max_size,
+    ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+token_cache_stats = {"hits": 0, "misses": 0}
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -40,6 +49,42 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def decode_token(token: str) -> TokenData:
+    """
+    Розкодовує JWT токен, використовуючи кеш вже перевірених токенів.
+
+    Args:
+        token: JWT токен для перевірки.
+
+    Returns:
+        TokenData: Об'єкт з email користувача, витягнутим з токена.
+
+    Raises:
+        JWTError: Якщо підпис недійсний або токен протермінований.
+        ValueError: Якщо в токені немає email.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    cached = token_cache.get(key)
+    if cached is not None:
+        token_cache_stats["hits"] += 1
+        return cached
+
+    token_cache_stats["misses"] += 1
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    email: str = payload.get("sub")
+
+    if email is None:
+        raise ValueError("Invalid token payload")
+
+    token_data = TokenData(email=email)
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp is not None else None
+    if ttl is None or ttl > 0:
+        token_cache.set(key, token_data, ttl=ttl)
+
+    return token_data
+
+
 async def verify_token(token: str) -> TokenData:
     """
     Перевіряє валідність JWT токена.
@@ -54,13 +99,7 @@ async def verify_token(token: str) -> TokenData:
         HTTPException: Якщо токен недійсний або протермінований.
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-
-        if email is None:
-            raise ValueError("Invalid token payload")
-
-        return TokenData(email=email)
+        return decode_token(token)
 
     except JWTError:
         raise HTTPException(
@@ -104,7 +143,9 @@ async def get_current_user(
         )
         return user
 
-    # Якщо немає в кеші - йдемо в БД
+    # Якщо немає в кеші - йдемо в БД; епоха фіксується до читання, щоб не
+    # закешувати дані, інвалідовані, поки запит ішов до БД
+    epoch = user_cache_epoch(token_data.email)
     user = await get_user_by_email(session, token_data.email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -119,6 +160,6 @@ async def get_current_user(
         "avatar_url": user.avatar_url,
         "role": user.role
     }
-    await cache_user(user.email, user_dict, expire_time=3600)
+    await cache_user(user.email, user_dict, expire_time=3600, epoch=epoch)
 
     return user
\ No newline at end of file
@@ -1,19 +1,286 @@
-import cloudinary
-import cloudinary.uploader
+"""
+Модуль обробки та завантаження аватарів.
+
+Файл читається з запиту частинами (``CHUNK_SIZE``) у тимчасовий файл, що
+переходить на диск понад ``SPOOL_MAX_SIZE``, з одночасним підрахунком
+SHA-256 та перевіркою ліміту ``avatar_max_bytes`` — пам'ять на одне
+завантаження не залежить від розміру файлу. Хеш вмісту є ключем у
+сховищі (:mod:`app.services.storage`), а індекс «хеш → URL» у Redis
+спільний для всіх воркерів і переживає перезапуск, тож повторне
+завантаження того самого зображення не обробляється і не відправляється
+вдруге.
+
+Зображення зменшується до фіксованого набору розмірів і перекодовується у
+WebP локально (Pillow), а робота зі сховищем виконується в окремому пулі
+потоків — синхронні клієнти не блокують event loop. Зображення понад
+``avatar_max_pixels`` пікселів (у тому числі «бомби декомпресії» з
+невеликого файлу) та файли, які не вдалося декодувати, відхиляються як
+``ValueError`` (``400`` в обробнику).
+
+Роботу можна передати фоновій задачі: файл зберігається в
+``avatar_staging_path``, а задачу виконує ретранслятор outbox
+(:mod:`app.services.outbox`). Її стан зберігається в пам'яті воркера та в
+Redis і доступний за ``job_id``.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Awaitable, BinaryIO, Callable
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
 from app.config import settings
+from app.services.cache import LocalTTLCache, redis_client
+from app.services.hashing import BoundedExecutor
+from app.services.storage import AvatarStorage, create_storage
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
 
-# Налаштування Cloudinary при старті застосунку
-cloudinary.config(
-    cloud_name=settings.cloudinary_name,
-    api_key=settings.cloudinary_api_key,
-    api_secret=settings.cloudinary_api_secret,
-    secure=True
+# Pillow відмовляє відкривати зображення, більші за ліміт удвічі; решту
+# перевищень ловить перевірка розміру в render_variants
+Image.MAX_IMAGE_PIXELS = settings.avatar_max_pixels
+
+# Розмір частини при читанні завантаження та поріг переходу буфера на диск
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 1024 * 1024
+
+# Запас на заголовки multipart понад розмір самого файлу
+MULTIPART_OVERHEAD = 16 * 1024
+
+# Ендпоінти, що приймають файл аватара
+AVATAR_UPLOAD_PATHS = frozenset({"/users/avatar", "/users/admin/avatar"})
+
+# Пул для перекодування та роботи зі сховищем
+avatar_executor = BoundedExecutor(
+    workers=settings.avatar_workers,
+    max_queue=settings.avatar_max_queue,
+    name="avatar",
 )
 
+# Стан фонових задач, прийнятих цим воркером
+avatar_jobs = LocalTTLCache(max_size=10_000, ttl=settings.avatar_job_ttl)
+
+# Поточне сховище; у тестах замінюється через set_storage
+_storage: AvatarStorage = create_storage()
+
+
+def set_storage(storage: AvatarStorage) -> AvatarStorage:
+    """
+    Замінює сховище аватарів (наприклад, локальним у тестах).
+
+    Args:
+        storage: Нове сховище.
+
+    Returns:
+        AvatarStorage: Попереднє сховище.
+    """
+    global _storage
+    previous, _storage = _storage, storage
+    return previous
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File is larger than {settings.avatar_max_bytes} bytes",
+    )
+
+
+class AvatarUploadLimitMiddleware:
+    """
+    ASGI-middleware, що обриває завантаження аватара понад ліміт.
+
+    Запит з більшим ``Content-Length`` отримує ``413`` ще до читання тіла;
+    без заголовка (chunked) тіло рахується під час читання, і розбір
+    multipart переривається, щойно ліміт перевищено.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in AVATAR_UPLOAD_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        max_body = settings.avatar_max_bytes + MULTIPART_OVERHEAD
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_body:
+            error = _too_large()
+            await JSONResponse({"detail": error.detail}, status_code=error.status_code)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            if received > max_body:
+                raise _too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def read_upload(file) -> tuple[BinaryIO, str]:
+    """
+    Копіює завантаження у тимчасовий файл частинами, рахуючи SHA-256.
+
+    Args:
+        file: Файл, отриманий від користувача (UploadFile).
+
+    Returns:
+        tuple[BinaryIO, str]: Тимчасовий файл на початку та hex-хеш вмісту.
+        Закрити файл має викликач.
+
+    Raises:
+        HTTPException: 413, якщо файл більший за ``avatar_max_bytes``.
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := await file.read(CHUNK_SIZE):
+        size += len(chunk)
+        if size > settings.avatar_max_bytes:
+            buffer.close()
+            raise _too_large()
+        digest.update(chunk)
+        buffer.write(chunk)
+    buffer.seek(0)
+    return buffer, digest.hexdigest()
+
+
+def variant_names() -> list[str]:
+    """
+    Повертає назви варіантів аватара, від найбільшого.
+
+    Returns:
+        list[str]: Розміри з ``avatar_sizes``.
+    """
+    return [str(size) for size in sorted(settings.avatar_sizes, reverse=True)]
+
+
+def render_variants(source: BinaryIO) -> dict[str, BinaryIO]:
+    """
+    Обрізає зображення до квадрата та кодує його у WebP для кожного розміру.
+
+    Args:
+        source: Завантажений файл.
+
+    Returns:
+        dict[str, BinaryIO]: Варіанти за назвами з :func:`variant_names`.
+
+    Raises:
+        ValueError: Якщо файл не є зображенням, не декодується або має
+            більше за ``avatar_max_pixels`` пікселів.
+    """
+    names = variant_names()
+    largest = int(names[0])
+    try:
+        with Image.open(source) as original:
+            # Розмір відомий із заголовка — перевіряємо до декодування пікселів
+            width, height = original.size
+            if width * height > settings.avatar_max_pixels:
+                raise ValueError("Image is too large")
+            image = ImageOps.exif_transpose(original).convert("RGB")
+    except Image.DecompressionBombError as e:
+        raise ValueError("Image is too large") from e
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError("Unsupported image format") from e
+
+    # Обрізаємо один раз до найбільшого розміру, менші варіанти — з нього
+    image = ImageOps.fit(image, (largest, largest), Image.LANCZOS)
+    variants = {}
+    for name in names:
+        buffer = io.BytesIO()
+        size = int(name)
+        image.resize((size, size), Image.LANCZOS).save(buffer, format="WEBP", quality=settings.avatar_quality)
+        buffer.seek(0)
+        variants[name] = buffer
+    return variants
+
+
+def process_avatar(source: BinaryIO, digest: str) -> dict[str, str]:
+    """
+    Готує варіанти аватара та зберігає їх (синхронно, виконується в пулі).
+
+    Якщо основний варіант з цим хешем уже є у сховищі, обробка пропускається.
+
+    Args:
+        source: Завантажений файл.
+        digest: SHA-256 вмісту файлу.
+
+    Returns:
+        dict[str, str]: URL варіантів за назвою, від найбільшого.
+    """
+    names = variant_names()
+    existing = _storage.url_for(f"{digest}_{names[0]}")
+    if existing is not None:
+        return {names[0]: existing}
+
+    # Основний варіант зберігається останнім: його наявність означає, що є всі
+    variants = render_variants(source)
+    urls = {name: _storage.save(f"{digest}_{name}", variants[name]) for name in reversed(names)}
+    return {name: urls[name] for name in names}
+
+
+async def process_avatar_async(source: BinaryIO, digest: str) -> str:
+    """
+    Обробляє аватар у пулі потоків та закриває файл.
+
+    Хеш, уже збережений будь-яким воркером, повертає URL з індексу в Redis
+    без перекодування та звернень до сховища.
+
+    Args:
+        source: Файл з :func:`read_upload`.
+        digest: SHA-256 вмісту файлу.
+
+    Returns:
+        str: URL найбільшого варіанта.
+    """
+    try:
+        avatar_url = await _indexed_avatar_url(digest)
+        if avatar_url is None:
+            urls = await avatar_executor.run(process_avatar, source, digest)
+            avatar_url = next(iter(urls.values()))
+            await _index_avatar_url(digest, avatar_url)
+    finally:
+        source.close()
+    return avatar_url
+
+
+def _avatar_url_key(digest: str) -> str:
+    return f"avatar:url:{digest}"
+
+
+async def _indexed_avatar_url(digest: str) -> str | None:
+    # Без Redis індекс недоступний — обробка йде через сховище
+    try:
+        return await redis_client.get(_avatar_url_key(digest))
+    except Exception:
+        return None
+
+
+async def _index_avatar_url(digest: str, avatar_url: str) -> None:
+    try:
+        await redis_client.set(_avatar_url_key(digest), avatar_url, ex=settings.avatar_url_index_ttl)
+    except Exception:
+        pass
+
 
 async def upload_avatar(file):
     """
-    Завантажує файл аватара в Cloudinary.
+    Завантажує файл аватара до сховища.
 
     Args:
         file: Файл, отриманий від користувача (UploadFile).
@@ -21,10 +288,96 @@ async def upload_avatar(file):
     Returns:
         str: URL завантаженого аватара.
     """
-    result = cloudinary.uploader.upload(
-        file.file,
-        folder="avatars",
-        public_id=None,
-        overwrite=True,
-    )
-    return result["secure_url"]
+    return await process_avatar_async(*await read_upload(file))
+
+
+async def _save_job(job: dict) -> None:
+    avatar_jobs.set(job["id"], job)
+    try:
+        await redis_client.setex(f"avatar:job:{job['id']}", settings.avatar_job_ttl, json.dumps(job))
+    except Exception:
+        pass
+
+
+async def create_avatar_job(user_id: int) -> dict:
+    """
+    Реєструє нову фонову задачу обробки аватара.
+
+    Args:
+        user_id: ID власника задачі.
+
+    Returns:
+        dict: Задача у стані ``pending``.
+    """
+    job = {"id": uuid.uuid4().hex, "user_id": user_id, "status": "pending", "avatar_url": None, "error": None}
+    await _save_job(job)
+    return job
+
+
+async def get_avatar_job(job_id: str) -> dict | None:
+    """
+    Повертає стан фонової задачі: з пам'яті воркера, інакше з Redis.
+
+    Args:
+        job_id: ID задачі.
+
+    Returns:
+        dict | None: Задача або None, якщо її немає чи TTL минув.
+    """
+    job = avatar_jobs.get(job_id)
+    if job is not None:
+        return job
+    try:
+        cached = await redis_client.get(f"avatar:job:{job_id}")
+    except Exception:
+        return None
+    return json.loads(cached) if cached else None
+
+
+async def stage_avatar_upload(source: BinaryIO, digest: str) -> str:
+    """
+    Зберігає завантаження в теку ``avatar_staging_path`` для фонової обробки.
+
+    Args:
+        source: Файл з :func:`read_upload` (буде закрито).
+        digest: SHA-256 вмісту файлу.
+
+    Returns:
+        str: Шлях до збереженого файлу.
+    """
+    path = Path(settings.avatar_staging_path) / f"{digest}-{uuid.uuid4().hex}"
+
+    def copy() -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with source, path.open("wb") as target:
+            shutil.copyfileobj(source, target)
+
+    await avatar_executor.run(copy)
+    return str(path)
+
+
+async def run_avatar_job(
+        job: dict, source: BinaryIO, digest: str, on_done: Callable[[str], Awaitable[None]],
+) -> None:
+    """
+    Виконує фонову задачу та оновлює її стан.
+
+    Помилка обробки файлу завершує задачу зі станом ``failed``; помилка
+    ``on_done`` передається викликачу, щоб задачу можна було повторити.
+
+    Args:
+        job: Задача з :func:`create_avatar_job`.
+        source: Завантажений файл (буде закрито).
+        digest: SHA-256 вмісту файлу.
+        on_done: Викликається з URL аватара після успішного збереження.
+    """
+    await _save_job({**job, "status": "processing"})
+    try:
+        avatar_url = await process_avatar_async(source, digest)
+    except Exception as e:
+        logger.exception("Avatar job %s failed", job["id"])
+        await _save_job({**job, "status": "failed", "error": str(e)})
+        return
+
+    await on_done(avatar_url)
+    await _save_job({**job, "status": "done", "avatar_url": avatar_url})
@@ -1,14 +1,155 @@
+import asyncio
+import contextlib
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
 import redis.asyncio as redis
 import json
+from fastapi import Response
 from app.config import settings
+from app.services.metrics import cache_requests_total, cache_duration
+
+logger = logging.getLogger(__name__)
 
 # Підключення до Redis
 redis_client = redis.from_url(settings.redis_url, decode_responses=True)
 
+# Канал, через який воркери повідомляють один одного про інвалідацію користувача
+USER_INVALIDATION_CHANNEL = "cache:user:invalidate"
+
+
+class LocalTTLCache:
+    """
+    Обмежений in-process кеш з TTL та витісненням найдавніше використаних (LRU).
+
+    Не потокобезпечний: розрахований на використання з одного event loop.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        """Повертає значення або None, якщо ключа немає чи його TTL минув."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        """Зберігає значення, витісняючи найдавніші записи понад ``max_size``."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Видаляє ключ, якщо він є."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Очищає кеш повністю."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class InvalidationEpochs:
+    """
+    Лічильники інвалідацій за ключем з обмеженою кількістю ключів.
+
+    Викликач запам'ятовує епоху ключа перед читанням з Redis чи БД і
+    записує результат у L1, лише якщо епоха не змінилася: інвалідація,
+    що відбулася під час читання, не перекривається застарілими даними.
+    Витіснений ключ піднімає «нижню межу», тож його епоха теж змінюється.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._epochs: OrderedDict[str, int] = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+
+    def current(self, key: str) -> int:
+        """Поточна епоха ключа."""
+        return self._epochs.get(key, self._floor)
+
+    def bump(self, key: str) -> None:
+        """Позначає інвалідацію ключа."""
+        self._counter += 1
+        self._epochs[key] = self._counter
+        self._epochs.move_to_end(key)
+        while len(self._epochs) > self.max_size:
+            _, epoch = self._epochs.popitem(last=False)
+            self._floor = max(self._floor, epoch)
+
+    def bump_all(self) -> None:
+        """Позначає інвалідацію всіх ключів (наприклад, після втрати повідомлень)."""
+        self._counter += 1
+        self._floor = self._counter
+        self._epochs.clear()
+
+
+# Локальний (L1) рівень кешу користувачів перед Redis (L2)
+user_l1_cache = LocalTTLCache(
+    max_size=settings.user_cache_l1_max_size,
+    ttl=settings.user_cache_l1_ttl,
+)
+
+# Епохи інвалідації користувачів для безпечного заповнення L1
+user_cache_epochs = InvalidationEpochs(max_size=settings.user_cache_l1_max_size)
+
+# Лічильники влучань/промахів по рівнях кешу
+cache_stats = {
+    "l1_hits": 0,
+    "l1_misses": 0,
+    "l2_hits": 0,
+    "l2_misses": 0,
+}
+
+# L1 використовується лише поки активна підписка на інвалідацію,
+# інакше воркер міг би віддавати застарілі дані після зміни ролі чи пароля
+_invalidation_live = False
+_invalidation_task: asyncio.Task | None = None
+
+
+def _observe(operation: str, result: str, started: float) -> None:
+    """Записує результат і тривалість операції з Redis у метрики."""
+    cache_requests_total.inc(operation, result)
+    cache_duration.observe(time.perf_counter() - started, operation)
+
+
+def get_cache_stats() -> dict:
+    """
+    Повертає лічильники влучань/промахів кешу користувачів по рівнях.
+
+    Returns:
+        dict: Лічильники, розмір L1 та стан підписки на інвалідацію.
+    """
+    return {
+        **cache_stats,
+        "l1_size": len(user_l1_cache),
+        "l1_enabled": _invalidation_live,
+    }
+
 
 async def get_cached_user(email: str) -> dict | None:
     """
-    Отримує користувача з кешу Redis за email.
+    Отримує користувача з кешу за email: спочатку з L1, потім з Redis.
 
     Args:
         email: Email користувача
@@ -16,42 +157,281 @@ async def get_cached_user(email: str) -> dict | None:
     Returns:
         dict | None: Дані користувача або None
     """
+    if _invalidation_live:
+        user_data = user_l1_cache.get(email)
+        if user_data is not None:
+            cache_stats["l1_hits"] += 1
+            return user_data
+        cache_stats["l1_misses"] += 1
+
+    epoch = user_cache_epochs.current(email)
+    started = time.perf_counter()
     try:
         user_data = await redis_client.get(f"user:{email}")
         if user_data:
-            return json.loads(user_data)
+            cache_stats["l2_hits"] += 1
+            _observe("get", "hit", started)
+            user_dict = json.loads(user_data)
+            # Інвалідація під час GET: прочитане значення могло вже застаріти
+            if _invalidation_live and user_cache_epochs.current(email) == epoch:
+                user_l1_cache.set(email, user_dict)
+            return user_dict
+        cache_stats["l2_misses"] += 1
+        _observe("get", "miss", started)
         return None
     except Exception:
+        _observe("get", "error", started)
         return None
 
 
-async def cache_user(email: str, user_data: dict, expire_time: int = 3600):
+def user_cache_epoch(email: str) -> int:
+    """
+    Повертає епоху інвалідації користувача для :func:`cache_user`.
+
+    Args:
+        email: Email користувача
+
+    Returns:
+        int: Епоха, яку слід прочитати до завантаження користувача з БД.
     """
-    Кешує користувача в Redis за email.
+    return user_cache_epochs.current(email)
+
+
+async def cache_user(email: str, user_data: dict, expire_time: int = 3600, epoch: int | None = None):
+    """
+    Кешує користувача в L1 та Redis за email.
 
     Args:
         email: Email користувача
         user_data: Дані користувача для кешування
         expire_time: Час життя кешу в секундах (за замовчуванням 1 година)
+        epoch: Епоха з :func:`user_cache_epoch`, прочитана до завантаження даних;
+            якщо користувача відтоді інвалідовано, дані не кешуються
     """
+    if epoch is not None and user_cache_epochs.current(email) != epoch:
+        return
+
+    if _invalidation_live:
+        user_l1_cache.set(email, user_data, ttl=min(expire_time, user_l1_cache.ttl))
+
+    started = time.perf_counter()
     try:
         await redis_client.setex(
             f"user:{email}",
             expire_time,
             json.dumps(user_data)
         )
+        _observe("set", "ok", started)
     except Exception:
-        pass  # Якщо Redis недоступний, просто ігноруємо
+        _observe("set", "error", started)  # Якщо Redis недоступний, просто ігноруємо
 
 
 async def delete_cached_user(email: str):
     """
-    Видаляє користувача з кешу.
+    Видаляє користувача з кешу на всіх воркерах.
+
+    Локальний L1 очищується одразу, інші воркери отримують
+    повідомлення через Redis pub/sub.
 
     Args:
         email: Email користувача
     """
+    user_cache_epochs.bump(email)
+    user_l1_cache.delete(email)
+    started = time.perf_counter()
     try:
         await redis_client.delete(f"user:{email}")
+        await redis_client.publish(USER_INVALIDATION_CHANNEL, email)
+        _observe("delete", "ok", started)
     except Exception:
-        pass
\ No newline at end of file
+        _observe("delete", "error", started)
+
+
+# Лічильники кешу відповідей для ендпоінтів читання контактів
+response_cache_stats = {
+    "hits": 0,
+    "misses": 0,
+    "stored": 0,
+    "too_large": 0,
+    "errors": 0,
+}
+
+
+def get_response_cache_stats() -> dict:
+    """
+    Повертає лічильники кешу відповідей та частку влучань.
+
+    Returns:
+        dict: Лічильники та ``hit_ratio`` (0, якщо звернень ще не було).
+    """
+    lookups = response_cache_stats["hits"] + response_cache_stats["misses"]
+    return {
+        **response_cache_stats,
+        "hit_ratio": response_cache_stats["hits"] / lookups if lookups else 0.0,
+    }
+
+
+def _contacts_generation_key(owner_id: int) -> str:
+    return f"contacts:gen:{owner_id}"
+
+
+async def get_cached_response(
+    owner_id: int, endpoint: str, params: dict[str, Any]
+) -> tuple[str | None, Response | None]:
+    """
+    Шукає збережену відповідь ендпоінта читання контактів.
+
+    Ключ містить поточне покоління контактів власника, тож після
+    :func:`bump_contacts_generation` старі записи просто перестають
+    читатися і зникають за TTL.
+
+    Args:
+        owner_id: ID власника контактів.
+        endpoint: Назва ендпоінта (``list``, ``search``, ``birthdays``).
+        params: Параметри запиту, від яких залежить відповідь.
+
+    Returns:
+        tuple[str | None, Response | None]: Ключ для :func:`cache_response`
+        (None, якщо кеш вимкнено чи Redis недоступний) та збережена відповідь.
+    """
+    if not settings.contacts_response_cache_enabled:
+        return None, None
+
+    started = time.perf_counter()
+    try:
+        generation = await redis_client.get(_contacts_generation_key(owner_id)) or "0"
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        key = f"contacts:resp:{owner_id}:{generation}:{endpoint}:{digest}"
+
+        cached = await redis_client.get(key)
+    except Exception:
+        response_cache_stats["errors"] += 1
+        _observe("response_get", "error", started)
+        return None, None
+
+    if cached is None:
+        response_cache_stats["misses"] += 1
+        _observe("response_get", "miss", started)
+        return key, None
+
+    response_cache_stats["hits"] += 1
+    _observe("response_get", "hit", started)
+    entry = json.loads(cached)
+    return key, Response(
+        content=entry["body"], headers=entry["headers"], media_type="application/json"
+    )
+
+
+async def cache_response(key: str | None, response: Response) -> None:
+    """
+    Зберігає успішну відповідь під ключем з :func:`get_cached_response`.
+
+    Відповіді, більші за ``CONTACTS_RESPONSE_CACHE_MAX_BYTES``, не кешуються.
+
+    Args:
+        key: Ключ кешу або None (тоді нічого не робиться).
+        response: Відповідь ендпоінта.
+    """
+    if key is None or response.status_code != 200:
+        return
+
+    if len(response.body) > settings.contacts_response_cache_max_bytes:
+        response_cache_stats["too_large"] += 1
+        return
+
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name not in ("content-length", "content-type")
+    }
+    entry = json.dumps({"headers": headers, "body": response.body.decode()})
+
+    started = time.perf_counter()
+    try:
+        await redis_client.setex(key, settings.contacts_response_cache_ttl, entry)
+        response_cache_stats["stored"] += 1
+        _observe("response_set", "ok", started)
+    except Exception:
+        response_cache_stats["errors"] += 1
+        _observe("response_set", "error", started)
+
+
+async def bump_contacts_generation(owner_id: int) -> None:
+    """
+    Інвалідує всі кешовані відповіді контактів власника за O(1).
+
+    Викликається після коміту зміни контактів. Якщо Redis недоступний,
+    застарілі відповіді живуть не довше ``CONTACTS_RESPONSE_CACHE_TTL``.
+
+    Args:
+        owner_id: ID власника контактів.
+    """
+    if not settings.contacts_response_cache_enabled:
+        return
+
+    started = time.perf_counter()
+    try:
+        await redis_client.incr(_contacts_generation_key(owner_id))
+        _observe("generation_bump", "ok", started)
+    except Exception:
+        response_cache_stats["errors"] += 1
+        _observe("generation_bump", "error", started)
+
+
+async def listen_for_user_invalidations(reconnect_delay: float = 1.0):
+    """
+    Слухає канал інвалідації та видаляє користувачів з локального L1.
+
+    Після кожного (пере)підключення L1 очищується, бо повідомлення,
+    надіслані під час розриву, могли бути втрачені. Поки підписки немає,
+    L1 вимкнено, а причина розриву логується.
+
+    Args:
+        reconnect_delay: Пауза перед повторним підключенням до Redis.
+    """
+    global _invalidation_live
+
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(USER_INVALIDATION_CHANNEL)
+            user_cache_epochs.bump_all()
+            user_l1_cache.clear()
+            _invalidation_live = True
+
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    user_cache_epochs.bump(message["data"])
+                    user_l1_cache.delete(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(
+                "User invalidation listener failed, L1 cache disabled; retrying in %.1fs", reconnect_delay,
+            )
+        finally:
+            _invalidation_live = False
+            user_l1_cache.clear()
+            with contextlib.suppress(Exception):
+                await pubsub.aclose()
+
+        await asyncio.sleep(reconnect_delay)
+
+
+def start_invalidation_listener():
+    """Запускає фонове завдання підписки на інвалідацію кешу користувачів."""
+    global _invalidation_task
+    if _invalidation_task is None or _invalidation_task.done():
+        _invalidation_task = asyncio.create_task(listen_for_user_invalidations())
+
+
+async def stop_invalidation_listener():
+    """Зупиняє фонове завдання підписки на інвалідацію."""
+    global _invalidation_task
+    if _invalidation_task is not None:
+        _invalidation_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await _invalidation_task
+        _invalidation_task = None
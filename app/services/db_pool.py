@@ -0,0 +1,130 @@
+"""
+Модуль інструментування пулу з'єднань SQLAlchemy.
+
+Лічильники збираються через події пулу (``connect``, ``checkout``,
+``checkin``, ``close``, ``invalidate``); час очікування з'єднання
+вимірює підклас пулу, бо жодна подія не фіксує момент запиту.
+"""
+
+import time
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    """
+    Накопичувальні метрики одного пулу з'єднань.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.connections_invalidated = 0
+        self.connection_age_at_checkout_max = 0.0
+        self._records: weakref.WeakSet = weakref.WeakSet()
+
+    def observe_checkout_wait(self, seconds: float) -> None:
+        """Фіксує, скільки запит чекав на з'єднання з пулу."""
+        self.checkouts += 1
+        self.checkout_wait_seconds_total += seconds
+        self.checkout_wait_seconds_max = max(self.checkout_wait_seconds_max, seconds)
+
+    def oldest_connection_age(self) -> float:
+        """Вік найстарішого відкритого з'єднання в секундах."""
+        now = time.monotonic()
+        ages = [now - r.info["created_at"] for r in list(self._records) if "created_at" in r.info]
+        return max(ages, default=0.0)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    ``AsyncAdaptedQueuePool``, що вимірює час очікування з'єднання.
+    """
+
+    metrics: PoolMetrics | None = None
+
+    def connect(self):
+        started = time.perf_counter()
+        connection = super().connect()
+        if self.metrics is not None:
+            self.metrics.observe_checkout_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # dispose() створює новий пул — метрики мають пережити його
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def instrument_pool(engine: AsyncEngine) -> PoolMetrics:
+    """
+    Підключає збір метрик до пулу двигуна.
+
+    Args:
+        engine: Асинхронний двигун, створений з ``InstrumentedAsyncQueuePool``.
+
+    Returns:
+        PoolMetrics: Об'єкт, у який накопичуються метрики пулу.
+    """
+    pool = engine.sync_engine.pool
+    metrics = PoolMetrics()
+    pool.metrics = metrics
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, record):
+        record.info["created_at"] = time.monotonic()
+        metrics._records.add(record)
+        metrics.connections_opened += 1
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, record, proxy):
+        created_at = record.info.get("created_at")
+        if created_at is not None:
+            age = time.monotonic() - created_at
+            metrics.connection_age_at_checkout_max = max(metrics.connection_age_at_checkout_max, age)
+
+    @event.listens_for(pool, "close")
+    def on_close(dbapi_connection, record):
+        record.info.pop("created_at", None)
+        metrics.connections_closed += 1
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, record, exception):
+        metrics.connections_invalidated += 1
+
+    return metrics
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict:
+    """
+    Повертає поточний стан та накопичені метрики пулу двигуна.
+
+    Args:
+        engine: Інструментований асинхронний двигун.
+
+    Returns:
+        dict: Розмір пулу, зайняті з'єднання, overflow, очікування та вік з'єднань.
+    """
+    pool = engine.sync_engine.pool
+    metrics: PoolMetrics = pool.metrics
+
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": metrics.checkouts,
+        "checkout_wait_seconds_total": metrics.checkout_wait_seconds_total,
+        "checkout_wait_seconds_max": metrics.checkout_wait_seconds_max,
+        "connections_opened": metrics.connections_opened,
+        "connections_closed": metrics.connections_closed,
+        "connections_invalidated": metrics.connections_invalidated,
+        "connection_age_seconds_max": metrics.oldest_connection_age(),
+        "connection_age_at_checkout_seconds_max": metrics.connection_age_at_checkout_max,
+    }
@@ -1,18 +1,293 @@
+"""
+Модуль надсилання листів через чергу (outbox) у пам'яті воркера.
+
+Лист ставиться в чергу без очікування; фоновий воркер розбирає чергу
+пачками до ``smtp_batch_size`` листів через одне SMTP-з'єднання, яке
+тримається відкритим між пачками і закривається після ``smtp_idle_timeout``
+секунд простою. Невдале надсилання повторюється з експоненційною затримкою
+до ``smtp_max_retries`` разів. Переповнена черга не відкидає лист мовчки:
+:meth:`MailOutbox.enqueue` піднімає :class:`MailQueueFull`, щоб викликач
+міг повторити спробу.
+
+Листи застосунку надсилаються через :meth:`MailOutbox.send`, який чекає,
+доки SMTP-сервер прийме лист, і піднімає помилку інакше — ретранслятор
+outbox видаляє подію лише після фактичного надсилання.
+
+Доставка вмикається ``mail_delivery_enabled``; посилання в будь-якому разі
+виводиться в консоль (зручно для розробки без поштового сервера).
+"""
+
+import asyncio
+import logging
+from email.message import EmailMessage
+
+import aiosmtplib
+
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+class MailQueueFull(RuntimeError):
+    """Лист не прийнято: черга переповнена або воркер не запущено."""
+
+
+class MailOutbox:
+    """
+    Черга листів з фоновим воркером та повторним використанням SMTP-з'єднання.
+    """
+
+    def __init__(
+            self,
+            hostname: str,
+            port: int,
+            username: str = "",
+            password: str = "",
+            batch_size: int = 20,
+            max_queue: int = 1000,
+            max_retries: int = 3,
+            retry_backoff: float = 0.5,
+            idle_timeout: float = 30.0,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.batch_size = batch_size
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.idle_timeout = idle_timeout
+        # Лист та, для send(), future з результатом надсилання
+        self._queue: asyncio.Queue[tuple[EmailMessage, asyncio.Future | None]] | None = None
+        self._worker: asyncio.Task | None = None
+        self._smtp: aiosmtplib.SMTP | None = None
+        self._stats = {"sent": 0, "failed": 0, "rejected": 0, "retries": 0, "batches": 0, "connections": 0}
+
+    def start(self) -> None:
+        """Запускає фоновий воркер у поточному event loop."""
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Зупиняє воркер, давши йому до ``timeout`` секунд дослати чергу.
+
+        Args:
+            timeout: Скільки чекати на спорожнення черги.
+        """
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Mail outbox stopped with %d unsent messages", self._queue.qsize())
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        # Ті, хто чекає на недосланий лист, дізнаються, що його не надіслано
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if future is not None and not future.done():
+                future.set_exception(MailQueueFull("Mail outbox stopped"))
+        self._queue = None
+        await self._disconnect()
+
+    def enqueue(self, message: EmailMessage) -> None:
+        """
+        Ставить лист у чергу без очікування.
+
+        Args:
+            message: Лист для надсилання.
+
+        Raises:
+            MailQueueFull: Якщо воркер не запущено або черга переповнена.
+        """
+        self._put(message, None)
+
+    async def send(self, message: EmailMessage) -> None:
+        """
+        Ставить лист у чергу та чекає, доки воркер його надішле.
+
+        Args:
+            message: Лист для надсилання.
+
+        Raises:
+            MailQueueFull: Якщо воркер не запущено, черга переповнена або
+                воркер зупинився раніше, ніж надіслав лист.
+            aiosmtplib.SMTPException | OSError: Якщо лист не надіслано після
+                ``max_retries`` повторів.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._put(message, future)
+        await future
+
+    def _put(self, message: EmailMessage, future: asyncio.Future | None) -> None:
+        if self._queue is None:
+            self._stats["rejected"] += 1
+            raise MailQueueFull("Mail outbox is not running")
+        try:
+            self._queue.put_nowait((message, future))
+        except asyncio.QueueFull:
+            self._stats["rejected"] += 1
+            logger.warning("Mail outbox is full, message to %s rejected", message["To"])
+            raise MailQueueFull("Mail outbox is full") from None
+
+    def stats(self) -> dict:
+        """
+        Повертає метрики черги.
+
+        Returns:
+            dict: Глибина черги та лічильники надсилань.
+        """
+        return {
+            **self._stats,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "connected": self._smtp is not None and self._smtp.is_connected,
+        }
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        if self._smtp is None or not self._smtp.is_connected:
+            self._smtp = aiosmtplib.SMTP(hostname=self.hostname, port=self.port)
+            await self._smtp.connect()
+            if self.username:
+                await self._smtp.login(self.username, self.password)
+            self._stats["connections"] += 1
+        return self._smtp
+
+    async def _disconnect(self) -> None:
+        if self._smtp is not None:
+            try:
+                await self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+            self._smtp = None
+
+    async def _send(self, message: EmailMessage) -> Exception | None:
+        # Повертає помилку останньої спроби або None, якщо лист надіслано
+        for attempt in range(self.max_retries + 1):
+            try:
+                smtp = await self._connect()
+                await smtp.send_message(message)
+                self._stats["sent"] += 1
+                return None
+            except (aiosmtplib.SMTPException, OSError) as e:
+                # Після збою з'єднання може бути в невизначеному стані — відкриваємо нове
+                await self._disconnect()
+                if attempt == self.max_retries:
+                    self._stats["failed"] += 1
+                    logger.error("Mail to %s failed after %d attempts: %s", message["To"], attempt + 1, e)
+                    return e
+                self._stats["retries"] += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                message = await asyncio.wait_for(self._queue.get(), self.idle_timeout)
+            except asyncio.TimeoutError:
+                await self._disconnect()
+                continue
+
+            batch = [message]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            self._stats["batches"] += 1
+            for message, future in batch:
+                try:
+                    error = await self._send(message)
+                except Exception as e:
+                    error = e
+                    self._stats["failed"] += 1
+                    logger.exception("Unexpected error while sending mail to %s", message["To"])
+                finally:
+                    self._queue.task_done()
+                if future is not None and not future.done():
+                    if error is None:
+                        future.set_result(None)
+                    else:
+                        future.set_exception(error)
+
+
+# Черга листів застосунку; воркер запускається в lifespan
+mail_outbox = MailOutbox(
+    hostname=settings.smtp_host,
+    port=settings.smtp_port,
+    username=settings.smtp_user,
+    password=settings.smtp_password,
+    batch_size=settings.smtp_batch_size,
+    max_queue=settings.smtp_max_queue,
+    max_retries=settings.smtp_max_retries,
+    retry_backoff=settings.smtp_retry_backoff,
+    idle_timeout=settings.smtp_idle_timeout,
+)
+
+
+def build_message(to: str, subject: str, body: str) -> EmailMessage:
+    """
+    Створює текстовий лист від ``settings.mail_from``.
+
+    Args:
+        to: Email отримувача.
+        subject: Тема листа.
+        body: Текст листа.
+
+    Returns:
+        EmailMessage: Готовий до надсилання лист.
+    """
+    message = EmailMessage()
+    message["From"] = settings.mail_from
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(body)
+    return message
+
+
+async def _deliver(message: EmailMessage) -> None:
+    # Помилка передається викликачу (ретранслятору outbox), щоб лист можна було повторити
+    if settings.mail_delivery_enabled:
+        await mail_outbox.send(message)
+
 
 async def send_verification_email(email: str, token: str) -> None:
     """
-    Надсилає фейковий лист із посиланням для верифікації.
+    Надсилає лист із посиланням для верифікації та чекає на результат.
 
     Args:
         email: Email отримувача.
         token: Токен, який включається у посилання для підтвердження.
 
+    Raises:
+        MailQueueFull: Якщо лист не прийнято до черги.
+        aiosmtplib.SMTPException | OSError: Якщо лист не надіслано.
+
     Notes:
-        У навчальних цілях лист фактично не надсилається.
-        Посилання виводиться у лог замість реального SMTP-відправлення.
+        Посилання також виводиться в консоль, тож без поштового сервера
+        (``mail_delivery_enabled=False``) ним можна скористатися з логу.
     """
     verify_url = f"{settings.app_url}/auth/verify?token={token}"
     print(f"[DEBUG] Verification link: {verify_url}")
+    await _deliver(build_message(email, "Confirm your email", f"Confirm your email: {verify_url}"))
+
 
+async def send_password_reset_email(email: str, token: str) -> None:
+    """
+    Надсилає лист із посиланням для скидання пароля та чекає на результат.
+
+    Args:
+        email: Email отримувача.
+        token: Токен скидання пароля.
+
+    Raises:
+        MailQueueFull: Якщо лист не прийнято до черги.
+        aiosmtplib.SMTPException | OSError: Якщо лист не надіслано.
+    """
+    reset_url = f"{settings.app_url}/auth/reset-password?token={token}"
+    print(f"[DEBUG] Password reset link: {reset_url}")
+    await _deliver(build_message(email, "Password reset", f"Reset your password: {reset_url}"))
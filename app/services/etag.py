@@ -0,0 +1,53 @@
+"""
+Модуль умовних GET-запитів (ETag / If-None-Match).
+
+ETag будуються з версій, що зберігаються в БД: ``users.contacts_version``
+для списку контактів та ``contacts.version`` для окремого контакту.
+Версії збільшуються в тій самій транзакції, що й зміна контактів, тому
+збіг ETag гарантує, що дані не змінились, і відповідь ``304`` можна
+віддати без запиту до самих контактів.
+"""
+
+from fastapi import Response, status
+
+# Відповідь можна зберігати лише в приватному кеші клієнта і щоразу перевіряти
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """
+    Будує слабкий ETag з частин (наприклад, ``"contacts", user_id, version``).
+
+    Returns:
+        str: ETag у форматі ``W/"частина-частина"``.
+    """
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Перевіряє заголовок ``If-None-Match`` (слабке порівняння, RFC 9110).
+
+    Args:
+        if_none_match: Значення заголовка або None.
+        etag: Поточний ETag ресурсу.
+
+    Returns:
+        bool: True, якщо клієнт уже має актуальну версію.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    """Заголовки для відповіді з ETag."""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """Відповідь ``304 Not Modified`` з поточним ETag."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
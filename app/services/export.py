@@ -0,0 +1,53 @@
+"""
+Модуль форматування потокового експорту контактів (NDJSON / CSV).
+
+Функції приймають асинхронний ітератор пачок контактів і повертають
+асинхронний генератор текстових фрагментів для ``StreamingResponse``.
+Один фрагмент відповідає одній пачці, тому пам'ять обмежена її розміром.
+"""
+
+import csv
+import io
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import Row
+from app.services.serialization import CONTACT_OUT_FIELDS, contact_rows, dumps
+
+# Порядок колонок у CSV збігається з полями схеми відповіді
+CSV_FIELDS = list(CONTACT_OUT_FIELDS)
+
+
+async def ndjson_chunks(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    """
+    Серіалізує пачки контактів у NDJSON (один JSON-об'єкт на рядок).
+
+    Args:
+        batches: Асинхронний ітератор пачок контактів.
+
+    Yields:
+        str: Рядки NDJSON для однієї пачки.
+    """
+    async for batch in batches:
+        yield b"".join(dumps(row) + b"\n" for row in contact_rows(batch)).decode()
+
+
+async def csv_chunks(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    """
+    Серіалізує пачки контактів у CSV із заголовком.
+
+    Args:
+        batches: Асинхронний ітератор пачок контактів.
+
+    Yields:
+        str: Заголовок, а потім CSV-рядки для кожної пачки.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(contact_rows(batch))
+        yield buffer.getvalue()
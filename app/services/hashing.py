@@ -0,0 +1,83 @@
+"""
+Модуль виконує CPU-важке хешування паролів (bcrypt) поза event loop.
+
+Хешування запускається в окремому пулі потоків обмеженого розміру
+(bcrypt звільняє GIL, тож потоки працюють паралельно). Кількість
+очікуючих задач теж обмежена: якщо черга переповнена, запит одразу
+отримує 503, а не блокує обробку всіх інших запитів воркера.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """
+    Пул потоків з обмеженням на кількість задач у роботі та в черзі.
+    """
+
+    def __init__(self, workers: int, max_queue: int, name: str):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latency_seconds = 0.0
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """
+        Виконує ``fn(*args)`` у пулі та повертає результат.
+
+        Raises:
+            HTTPException: 503, якщо всі потоки зайняті, а черга заповнена.
+        """
+        if self._pending >= self.workers + self.max_queue:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry later",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+            self._completed += 1
+            self._latency_seconds += time.perf_counter() - started
+
+    def stats(self) -> dict:
+        """
+        Повертає метрики пулу.
+
+        Returns:
+            dict: Розмір пулу, глибина черги та лічильники задач.
+        """
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self._pending, self.workers),
+            "queued": max(self._pending - self.workers, 0),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "latency_seconds_total": self._latency_seconds,
+        }
+
+
+# Пул для bcrypt-хешування та перевірки паролів
+password_hasher = BoundedExecutor(
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+    name="bcrypt",
+)
@@ -1,11 +1,82 @@
 """
 Модуль налаштовує rate limiting для застосунку.
 
-Використовується SlowAPI з ключем, що базується на IP-адресі клієнта.
+Використовується SlowAPI зі сховищем лічильників у Redis, спільним для всіх
+воркерів. Стратегія ``moving-window`` у Redis виконується одним Lua-скриптом,
+тобто кожна перевірка — це один атомарний round trip. Якщо Redis
+недоступний, лімітер тимчасово рахує запити в пам'яті воркера.
+
+Ключ — користувач з JWT (поле ``sub``), якщо запит містить дійсний токен,
+інакше IP-адреса клієнта. Ліміти оголошуються на кожному роуті через
+``@limiter.limit("N/period")``.
 """
 
+import time
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
 from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 
-# Лімітер запитів за IP користувача
-limiter = Limiter(key_func=get_remote_address)
+from app.config import settings
+from app.services.auth import decode_token
+
+
+def rate_limit_key(request: Request) -> str:
+    """
+    Визначає, чий ліміт витрачає запит.
+
+    Args:
+        request: Поточний HTTP-запит.
+
+    Returns:
+        str: ``user:<sub>`` для запитів з дійсним JWT, інакше ``ip:<адреса>``.
+    """
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{decode_token(token).email}"
+        except Exception:
+            pass
+    return f"ip:{get_remote_address(request)}"
+
+
+# Лімітер запитів за користувачем або IP
+limiter = Limiter(
+    key_func=rate_limit_key,
+    storage_uri=settings.rate_limit_storage_uri or settings.redis_url,
+    strategy="moving-window",
+    in_memory_fallback_enabled=True,
+    key_prefix="ratelimit",
+    enabled=settings.rate_limit_enabled,
+)
+
+
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse:
+    """
+    Повертає ``429 Too Many Requests`` із заголовком ``Retry-After``.
+
+    Args:
+        request: Запит, що перевищив ліміт.
+        exc: Виняток SlowAPI з описом ліміту.
+
+    Returns:
+        JSONResponse: Відповідь 429.
+    """
+    retry_after = 1
+    view_rate_limit = getattr(request.state, "view_rate_limit", None)
+    if view_rate_limit:
+        limit, args = view_rate_limit
+        try:
+            reset_at, _ = limiter.limiter.get_window_stats(limit, *args)
+            retry_after = max(1, int(reset_at - time.time()))
+        except Exception:
+            pass
+
+    return JSONResponse(
+        {"detail": f"Rate limit exceeded: {exc.detail}"},
+        status_code=429,
+        headers={"Retry-After": str(retry_after)},
+    )
@@ -0,0 +1,272 @@
+"""
+Модуль збору метрик застосунку у форматі Prometheus (text exposition 0.0.4).
+
+Містить мінімальні лічильники та гістограми без зовнішніх залежностей,
+ASGI-middleware для HTTP-метрик і хуки SQLAlchemy, що рахують запити
+до БД у межах поточного HTTP-запиту (через ``contextvars``).
+"""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Межі бакетів гістограм тривалості (секунди)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Межі бакетів для кількості SQL-запитів на HTTP-запит
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Монотонний лічильник з мітками.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Збільшує лічильник для заданих значень міток."""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Поточне значення лічильника."""
+        return self._values.get(labels, 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Гістограма з фіксованими бакетами та мітками.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # мітки -> [лічильники по бакетах (+Inf останній), сума, кількість]
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Додає спостереження для заданих значень міток."""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        """Кількість спостережень для заданих значень міток."""
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                label_str = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Реєстр метрик та колбеків, що повертають поточні значення.
+    """
+
+    def __init__(self):
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[tuple[str, Callable[[], dict], frozenset[str]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(
+        self,
+        prefix: str,
+        collect: Callable[[], dict],
+        counters: Iterable[str] = (),
+    ) -> None:
+        """
+        Реєструє колбек, числові значення якого експортуються
+        з іменами ``{prefix}_{ключ}``.
+
+        Args:
+            prefix: Префікс імен метрик.
+            collect: Колбек, що повертає словник поточних значень.
+            counters: Ключі монотонних лічильників — вони експортуються
+                як ``counter``, решта як ``gauge``.
+        """
+        self._collectors.append((prefix, collect, frozenset(counters)))
+
+    def render(self) -> str:
+        """Повертає всі метрики у текстовому форматі Prometheus."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for prefix, collect, counters in self._collectors:
+            for key, value in collect().items():
+                if isinstance(value, bool):
+                    value = int(value)
+                elif not isinstance(value, (int, float)):
+                    continue
+                kind = "counter" if key in counters else "gauge"
+                lines.append(f"# TYPE {prefix}_{key} {kind}")
+                lines.append(f"{prefix}_{key} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_requests_total = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"),
+))
+http_request_duration = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", ("method", "route"),
+))
+http_request_db_queries = REGISTRY.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", ("route",),
+    buckets=QUERY_COUNT_BUCKETS,
+))
+http_request_db_duration = REGISTRY.register(Histogram(
+    "http_request_db_duration_seconds", "Time spent in SQL per HTTP request.", ("route",),
+))
+db_query_duration = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "SQL statement latency.",
+))
+cache_requests_total = REGISTRY.register(Counter(
+    "redis_cache_requests_total", "Redis cache operations by result.", ("operation", "result"),
+))
+cache_duration = REGISTRY.register(Histogram(
+    "redis_cache_duration_seconds", "Redis cache operation latency.", ("operation",),
+))
+
+
+@dataclass
+class RequestDbStats:
+    """
+    Лічильники SQL-запитів поточного HTTP-запиту.
+    """
+    queries: int = 0
+    seconds: float = 0.0
+
+
+# Статистика БД поточного HTTP-запиту (None поза запитом)
+request_db_stats: ContextVar[RequestDbStats | None] = ContextVar("request_db_stats", default=None)
+
+
+def _timing_holder(conn, context) -> dict:
+    # Час старту живе на контексті виконання, тож запит, що впав у драйвері
+    # й не дійшов до after_cursor_execute, не лишає відміток на з'єднанні.
+    # Без контексту (службові запити діалекту) — одне значення в conn.info,
+    # яке наступний запит просто перезапише.
+    return vars(context) if context is not None else conn.info
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _timing_holder(conn, context)["query_started_at"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = _timing_holder(conn, context).pop("query_started_at", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    db_query_duration.observe(elapsed)
+
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+def install_sql_hooks() -> None:
+    """
+    Підключає хуки ``before/after_cursor_execute`` до всіх двигунів SQLAlchemy.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware, що записує тривалість, статус та кількість
+    SQL-запитів кожного HTTP-запиту з міткою шаблону маршруту.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDbStats()
+        token = request_db_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_db_stats.reset(token)
+            elapsed = time.perf_counter() - started
+            # Шаблон маршруту замість шляху, щоб ID не роздували кількість серій
+            route = scope.get("route")
+            route_label = getattr(route, "path", "unmatched")
+            method = scope["method"]
+
+            http_requests_total.inc(method, route_label, str(status_code))
+            http_request_duration.observe(elapsed, method, route_label)
+            http_request_db_queries.observe(stats.queries, route_label)
+            http_request_db_duration.observe(stats.seconds, route_label)
@@ -0,0 +1,283 @@
+"""
+Модуль транзакційного outbox для побічних ефектів.
+
+Замість того щоб надсилати лист чи інвалідувати кеш після ``commit()``
+(і втратити цю роботу, якщо процес впаде між кроками), обробник додає
+подію до таблиці ``outbox`` через :func:`add_outbox_event` — вона
+фіксується тим самим ``commit()``, що й зміна даних.
+
+Події виконує :class:`OutboxRelay` пачками. Пачка спершу орендується
+коротким ``UPDATE`` з ``FOR UPDATE SKIP LOCKED`` (``available_at``
+зсувається на ``outbox_lease_seconds``, лічильник спроб збільшується) і
+транзакція одразу фіксується, тож кілька ретрансляторів (по одному на
+воркер) працюють паралельно, не беручи ту саму подію, а листи, Redis та
+обробка аватарів виконуються без відкритої транзакції та блокувань рядків.
+Обробники, що не використовують сесію (листи, Redis), запускаються
+паралельно — пакетний відправник листів отримує всю пачку одразу, а
+повтор одного листа не затримує решту; обробники із сесією виконуються
+послідовно, кожен зі своїм ``commit()``.
+Потім другою короткою транзакцією успішні події видаляються одним
+``DELETE``, а невдалі відкладаються з експоненційною затримкою; після
+``outbox_max_attempts`` спроб подія залишається в таблиці. Якщо процес
+упав посеред пачки, її події знову стануть доступні, коли мине оренда.
+Ефекти виконуються щонайменше один раз, тому обробники мають бути
+ідемпотентними.
+
+Після відповіді обробник запускає :meth:`OutboxRelay.dispatch` як фонову
+задачу, щоб не чекати наступного опитування.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.crud.user import update_user_avatar
+from app.models.outbox import OutboxEvent
+from app.services.avatar import run_avatar_job
+from app.services.cache import delete_cached_user
+from app.services.email import send_password_reset_email, send_verification_email
+from app.services.password_reset import delete_reset_token
+from app.services.read_routing import mark_user_write
+
+logger = logging.getLogger(__name__)
+
+OutboxHandler = Callable[[AsyncSession, dict], Awaitable[None]]
+
+
+def add_outbox_event(session: AsyncSession, kind: str, payload: dict) -> None:
+    """
+    Додає подію до поточної транзакції (без ``commit()``).
+
+    Args:
+        session: Сесія, в якій виконується зміна даних.
+        kind: Тип події (ключ :data:`OUTBOX_HANDLERS`).
+        payload: JSON-серіалізовані параметри обробника.
+    """
+    if kind not in OUTBOX_HANDLERS:
+        raise ValueError(f"Unknown outbox event kind: {kind}")
+    session.add(OutboxEvent(kind=kind, payload=payload))
+
+
+async def _send_verification_email(session: AsyncSession, payload: dict) -> None:
+    await send_verification_email(payload["email"], payload["token"])
+
+
+async def _send_password_reset_email(session: AsyncSession, payload: dict) -> None:
+    await send_password_reset_email(payload["email"], payload["token"])
+
+
+async def _invalidate_user(session: AsyncSession, payload: dict) -> None:
+    await delete_cached_user(payload["email"])
+
+
+async def _delete_reset_token(session: AsyncSession, payload: dict) -> None:
+    # Лише для подій, записаних до того, як токен почали споживати в запиті
+    await delete_reset_token(payload["token"])
+
+
+async def _process_avatar(session: AsyncSession, payload: dict) -> None:
+    path = Path(payload["path"])
+    if not path.is_file():
+        # Файл уже оброблено попередньою спробою
+        return
+    user_id = payload["job"]["user_id"]
+
+    async def store_avatar(avatar_url: str) -> None:
+        email = await update_user_avatar(session, user_id, avatar_url)
+        if email is None:
+            return
+        # URL і подія інвалідації кешу фіксуються разом; пряме очищення після
+        # commit прибирає застарілий профіль, не чекаючи наступного опитування
+        add_outbox_event(session, "cache.invalidate_user", {"email": email})
+        await session.commit()
+        await delete_cached_user(email)
+
+    await run_avatar_job(payload["job"], path.open("rb"), payload["digest"], on_done=store_avatar)
+    await mark_user_write(user_id)
+    path.unlink(missing_ok=True)
+
+
+# Обробники подій за типом
+OUTBOX_HANDLERS: dict[str, OutboxHandler] = {
+    "email.verification": _send_verification_email,
+    "email.password_reset": _send_password_reset_email,
+    "cache.invalidate_user": _invalidate_user,
+    "reset_token.delete": _delete_reset_token,
+    "avatar.process": _process_avatar,
+}
+
+
+# Типи подій, обробники яких не використовують сесію і можуть виконуватися паралельно
+SESSIONLESS_OUTBOX_KINDS = frozenset({
+    "email.verification",
+    "email.password_reset",
+    "cache.invalidate_user",
+    "reset_token.delete",
+})
+
+
+class OutboxRelay:
+    """
+    Ретранслятор подій з таблиці ``outbox``.
+    """
+
+    def __init__(
+            self,
+            batch_size: int,
+            max_attempts: int,
+            retry_backoff: float,
+            poll_interval: float,
+            lease_seconds: float = 300.0,
+    ):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._task: asyncio.Task | None = None
+        self._stats = {"dispatched": 0, "failed": 0, "batches": 0}
+
+    async def dispatch(self, session: AsyncSession) -> int:
+        """
+        Орендує пачку готових подій, виконує їх та фіксує результат.
+
+        Args:
+            session: Сесія без відкритих змін.
+
+        Returns:
+            int: Кількість орендованих подій.
+        """
+        ready = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.available_at <= func.now(), OutboxEvent.attempts < self.max_attempts)
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        claim = (
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(ready.scalar_subquery()))
+            .values(
+                attempts=OutboxEvent.attempts + 1,
+                available_at=func.now() + timedelta(seconds=self.lease_seconds),
+            )
+            .returning(OutboxEvent.id, OutboxEvent.kind, OutboxEvent.payload, OutboxEvent.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        events = sorted((await session.execute(claim)).all(), key=lambda event: event.id)
+        await session.commit()
+        if not events:
+            return 0
+
+        # Листи та Redis стартують одразу й виконуються, поки йдуть обробники із сесією
+        sessionless = [event for event in events if event.kind in SESSIONLESS_OUTBOX_KINDS]
+        in_flight = asyncio.gather(*(self._run_sessionless(session, event) for event in sessionless))
+
+        results = []
+        for event in events:
+            if event.kind in SESSIONLESS_OUTBOX_KINDS:
+                continue
+            try:
+                await OUTBOX_HANDLERS[event.kind](session, event.payload)
+                # Зміни обробника в БД (наприклад, URL аватара) фіксуються одразу
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                results.append((event, self._failure(event, e)))
+            else:
+                results.append((event, None))
+        results.extend(zip(sessionless, await in_flight))
+
+        done = [event.id for event, error in results if error is None]
+        failed = [(event, error) for event, error in results if error is not None]
+
+        if done:
+            await session.execute(
+                delete(OutboxEvent).where(OutboxEvent.id.in_(done)).execution_options(synchronize_session=False)
+            )
+        for event, error in failed:
+            await session.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id == event.id)
+                .values(
+                    last_error=error,
+                    available_at=func.now() + timedelta(seconds=self.retry_backoff * 2 ** event.attempts),
+                )
+                .execution_options(synchronize_session=False)
+            )
+        await session.commit()
+
+        self._stats["dispatched"] += len(done)
+        self._stats["failed"] += len(failed)
+        self._stats["batches"] += 1
+        return len(events)
+
+    async def _run_sessionless(self, session: AsyncSession, event) -> str | None:
+        try:
+            await OUTBOX_HANDLERS[event.kind](session, event.payload)
+        except Exception as e:
+            return self._failure(event, e)
+        return None
+
+    @staticmethod
+    def _failure(event, error: Exception) -> str:
+        logger.warning("Outbox event %s (%s) failed: %s", event.id, event.kind, error)
+        return str(error)[:255]
+
+    def stats(self) -> dict:
+        """
+        Повертає лічильники ретранслятора.
+
+        Returns:
+            dict: Кількість виконаних і невдалих подій та пачок.
+        """
+        return dict(self._stats)
+
+    def start(self, session_factory: async_sessionmaker) -> None:
+        """
+        Запускає фонове опитування таблиці в поточному event loop.
+
+        Args:
+            session_factory: Фабрика сесій основної БД.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self) -> None:
+        """Зупиняє фонове опитування."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self, session_factory: async_sessionmaker) -> None:
+        while True:
+            try:
+                async with session_factory() as session:
+                    dispatched = await self.dispatch(session)
+            except Exception:
+                logger.exception("Outbox relay iteration failed")
+                dispatched = 0
+            # Повна пачка — ймовірно, є ще події; інакше чекаємо наступного опитування
+            if dispatched < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+
+# Ретранслятор застосунку; опитування запускається в lifespan
+outbox_relay = OutboxRelay(
+    batch_size=settings.outbox_batch_size,
+    max_attempts=settings.outbox_max_attempts,
+    retry_backoff=settings.outbox_retry_backoff,
+    poll_interval=settings.outbox_poll_interval,
+    lease_seconds=settings.outbox_lease_seconds,
+)
@@ -0,0 +1,81 @@
+"""
+Модуль курсорної (keyset) пагінації.
+
+Курсор є непрозорим для клієнта рядком: це base64url-кодований JSON
+з полем сортування, значенням ключа сортування та ID останнього
+отриманого запису. Наступна сторінка вибирається умовою
+``(sort_key, id) > (cursor_key, cursor_id)``, тому вартість запиту не
+залежить від того, наскільки далеко клієнт «прогорнув» список.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any
+
+from fastapi import HTTPException, status
+
+# Розмір сторінки за замовчуванням та максимально допустимий
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Тип значення ключа для кожного поля сортування
+SORT_KEY_TYPES: dict[str, type] = {"id": int, "last_name": str}
+
+# Межі колонки Integer (int4) у PostgreSQL
+INT4_MIN = -2 ** 31
+INT4_MAX = 2 ** 31 - 1
+
+
+def _has_type(value: Any, expected: type) -> bool:
+    # bool — підклас int, але як ключ курсору некоректний
+    if isinstance(value, bool) or not isinstance(value, expected):
+        return False
+    # Значення, які БД не прийме як параметр, мають давати 400, а не 500
+    if expected is int:
+        return INT4_MIN <= value <= INT4_MAX
+    return "\x00" not in value
+
+
+def encode_cursor(sort: str, key: Any, item_id: int) -> str:
+    """
+    Кодує позицію в списку у непрозорий курсор.
+
+    Args:
+        sort: Поле сортування.
+        key: Значення поля сортування останнього запису.
+        item_id: ID останнього запису.
+
+    Returns:
+        str: Курсор для передачі клієнту.
+    """
+    raw = json.dumps([sort, key, item_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple[Any, int]:
+    """
+    Декодує курсор та перевіряє, що він створений для того ж сортування,
+    а ключ та ID мають типи відповідних колонок і вміщуються в них.
+
+    Args:
+        cursor: Курсор, отриманий від клієнта.
+        sort: Поле сортування поточного запиту.
+
+    Returns:
+        tuple[Any, int]: Значення ключа сортування та ID останнього запису.
+
+    Raises:
+        HTTPException: Якщо курсор пошкоджений або не відповідає сортуванню.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, key, item_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    key_type = SORT_KEY_TYPES.get(sort)
+    if cursor_sort != sort or key_type is None or not _has_type(key, key_type) or not _has_type(item_id, int):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    return key, item_id
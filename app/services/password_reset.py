@@ -1,6 +1,15 @@
+import logging
 import secrets
+
+from redis.exceptions import RedisError
+
 from app.services.cache import redis_client
-from app.services.email import send_verification_email
+from app.services.email import send_password_reset_email as send_reset_email
+
+logger = logging.getLogger(__name__)
+
+# Час життя токена скидання пароля (секунди)
+RESET_TOKEN_TTL = 3600
 
 
 async def create_reset_token(email: str) -> str:
@@ -17,7 +26,7 @@ async def create_reset_token(email: str) -> str:
     token = secrets.token_urlsafe(32)
 
     # Зберігаємо в Redis на 1 годину
-    await redis_client.setex(f"reset:{token}", 3600, email)
+    await redis_client.setex(f"reset:{token}", RESET_TOKEN_TTL, email)
 
     return token
 
@@ -39,6 +48,43 @@ async def verify_reset_token(token: str) -> str | None:
         return None
 
 
+async def consume_reset_token(token: str) -> str | None:
+    """
+    Атомарно перевіряє та видаляє одноразовий токен (``GETDEL``).
+
+    Повторне використання того самого токена поверне None, навіть якщо
+    запити виконуються паралельно.
+
+    Args:
+        token: Токен скидання пароля
+
+    Returns:
+        str | None: Email користувача або None якщо токен недійсний
+
+    Raises:
+        RedisError: Якщо Redis недоступний — токен не вважається використаним,
+            тож скидання пароля має бути відхилене.
+    """
+    return await redis_client.getdel(f"reset:{token}")
+
+
+async def restore_reset_token(token: str, email: str) -> None:
+    """
+    Повертає спожитий токен, якщо скидання пароля не вдалося завершити.
+
+    Токен відновлюється з повним часом життя і лише якщо його ще немає.
+    Збій Redis логується: викликач уже обробляє власну помилку.
+
+    Args:
+        token: Токен скидання пароля
+        email: Email, до якого був прив'язаний токен
+    """
+    try:
+        await redis_client.set(f"reset:{token}", email, ex=RESET_TOKEN_TTL, nx=True)
+    except RedisError:
+        logger.warning("Could not restore password reset token for %s", email, exc_info=True)
+
+
 async def delete_reset_token(token: str):
     """
     Видаляє токен після використання.
@@ -60,9 +106,4 @@ async def send_password_reset_email(email: str, token: str):
         email: Email користувача
         token: Токен для скидання пароля
     """
-    # Поки що використовуємо ту ж функцію що і для верифікації
-    # В реальному проекті тут має бути окремий шаблон
-    print(f"[DEBUG] Password reset link: http://localhost:8000/auth/reset-password?token={token}")
-
-    # Можна викликати send_verification_email або створити окрему функцію
-    await send_verification_email(email, token)
\ No newline at end of file
+    await send_reset_email(email, token)
@@ -0,0 +1,158 @@
+"""
+Модуль контролю кількості SQL-запитів (query budget) для розробки та тестів.
+
+* ``@query_budget(n)`` оголошує, що тіло ендпоінта виконує не більше ``n``
+  SQL-запитів. У режимі ``warn`` перевищення логуються, у режимі ``strict``
+  піднімається :class:`QueryBudgetExceeded` (тести падають).
+* :class:`QueryLogMiddleware` збирає всі запити HTTP-запиту та логує
+  однакові за формою запити, що повторюються (ознака N+1).
+
+Режим задається ``QUERY_BUDGET_MODE`` (``off`` за замовчуванням) і
+читається під час виклику, тож у продакшені декоратор нічого не рахує.
+"""
+
+import functools
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Ендпоінт виконав більше SQL-запитів, ніж оголошено в ``@query_budget``.
+    """
+
+
+@dataclass
+class QueryLog:
+    """
+    Список SQL-запитів, виконаних у межах :func:`collect_queries`.
+    """
+    statements: list[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """
+        Повертає форми запитів, що виконувались щонайменше ``threshold`` разів.
+        """
+        shapes = Counter(self.statements)
+        return {shape: times for shape, times in shapes.items() if times >= threshold}
+
+
+# Активні журнали запитів (вкладені: middleware + ендпоінт)
+_active_logs: ContextVar[tuple[QueryLog, ...]] = ContextVar("active_query_logs", default=())
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    logs = _active_logs.get()
+    if logs:
+        # Параметри вже винесені в плейсхолдери, тож текст і є формою запиту
+        shape = _WHITESPACE.sub(" ", statement).strip()
+        for log in logs:
+            log.statements.append(shape)
+
+
+def install_query_hooks() -> None:
+    """
+    Підключає запис SQL-запитів до всіх двигунів SQLAlchemy (ідемпотентно).
+    """
+    if not event.contains(Engine, "before_cursor_execute", _record_statement):
+        event.listen(Engine, "before_cursor_execute", _record_statement)
+
+
+@contextmanager
+def collect_queries() -> Iterator[QueryLog]:
+    """
+    Збирає SQL-запити, виконані в поточному контексті.
+
+    Yields:
+        QueryLog: Журнал, що заповнюється під час виконання блоку.
+    """
+    install_query_hooks()
+    log = QueryLog()
+    token = _active_logs.set(_active_logs.get() + (log,))
+    try:
+        yield log
+    finally:
+        _active_logs.reset(token)
+
+
+def query_budget(max_queries: int):
+    """
+    Обмежує кількість SQL-запитів, які виконує тіло ендпоінта.
+
+    Залежності (``get_current_user`` тощо) не враховуються — лише сам ендпоінт.
+
+    Args:
+        max_queries: Максимально допустима кількість запитів.
+
+    Raises:
+        QueryBudgetExceeded: У режимі ``strict``, якщо бюджет перевищено.
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            if settings.query_budget_mode == "off":
+                return await endpoint(*args, **kwargs)
+
+            with collect_queries() as log:
+                result = await endpoint(*args, **kwargs)
+
+            if log.count > max_queries:
+                message = (
+                    f"{endpoint.__name__} executed {log.count} SQL statements, "
+                    f"budget is {max_queries}:\n" + "\n".join(log.statements)
+                )
+                if settings.query_budget_mode == "strict":
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return result
+
+        wrapper.__query_budget__ = max_queries
+        return wrapper
+
+    return decorator
+
+
+class QueryLogMiddleware:
+    """
+    ASGI-middleware, що логує кількість SQL-запитів кожного HTTP-запиту
+    та попереджає про однакові запити, що повторюються (N+1).
+    """
+
+    def __init__(self, app, repeat_threshold: int | None = None):
+        self.app = app
+        self.repeat_threshold = repeat_threshold or settings.query_repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with collect_queries() as log:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = getattr(scope.get("route"), "path", scope["path"])
+                logger.debug("%s %s: %d SQL statements", scope["method"], route, log.count)
+                for shape, times in log.repeated(self.repeat_threshold).items():
+                    logger.warning(
+                        "Possible N+1 in %s %s: statement executed %d times: %s",
+                        scope["method"], route, times, shape,
+                    )
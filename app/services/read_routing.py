@@ -0,0 +1,132 @@
+"""
+Модуль маршрутизації запитів тільки на читання на репліку БД.
+
+Читання йде на репліку, лише якщо:
+
+* репліку налаштовано (``DATABASE_REPLICA_URL``);
+* її відставання не перевищує ``REPLICA_MAX_LAG_SECONDS``
+  (перевіряється не частіше, ніж раз на ``REPLICA_LAG_CHECK_INTERVAL``);
+* користувач нічого не змінював протягом ``READ_YOUR_WRITES_SECONDS``,
+  інакше він міг би не побачити власних змін.
+
+В усіх інших випадках, зокрема при помилках, використовується основна БД.
+"""
+
+import time
+from typing import AsyncGenerator
+
+from fastapi import Depends
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_session, replica_engine, async_replica_session
+from app.models.user import User
+from app.services.auth import get_current_user
+from app.services.cache import redis_client, LocalTTLCache
+
+# Відставання репліки: 0, якщо вона відтворила весь отриманий WAL
+# (інакше простій основної БД виглядав би як зростаюче відставання)
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+# Користувачі, що нещодавно писали через цей воркер
+_recent_writes = LocalTTLCache(max_size=100_000, ttl=settings.read_your_writes_seconds)
+
+_replica_state = {"fresh": False, "checked_at": float("-inf"), "lag_seconds": None}
+
+
+async def replica_is_fresh() -> bool:
+    """
+    Перевіряє, що репліка доступна і її відставання в допустимих межах.
+
+    Результат кешується на ``replica_lag_check_interval`` секунд.
+
+    Returns:
+        bool: True, якщо з репліки можна читати.
+    """
+    if replica_engine is None:
+        return False
+
+    now = time.monotonic()
+    if now - _replica_state["checked_at"] < settings.replica_lag_check_interval:
+        return _replica_state["fresh"]
+
+    # Фіксуємо час до await, щоб паралельні запити не запускали перевірку повторно
+    _replica_state["checked_at"] = now
+    try:
+        async with replica_engine.connect() as conn:
+            lag = float(await conn.scalar(REPLICA_LAG_QUERY))
+        _replica_state["lag_seconds"] = lag
+        _replica_state["fresh"] = lag <= settings.replica_max_lag_seconds
+    except Exception:
+        _replica_state["lag_seconds"] = None
+        _replica_state["fresh"] = False
+
+    return _replica_state["fresh"]
+
+
+async def mark_user_write(user_id: int):
+    """
+    Закріплює читання користувача за основною БД на короткий час після запису.
+
+    Позначка зберігається локально та в Redis, щоб її бачили всі воркери.
+
+    Args:
+        user_id: ID користувача, що виконав запис.
+    """
+    if replica_engine is None:
+        return
+
+    _recent_writes.set(str(user_id), True)
+    try:
+        await redis_client.setex(f"rw:{user_id}", settings.read_your_writes_seconds, 1)
+    except Exception:
+        pass
+
+
+async def is_pinned_to_primary(user_id: int) -> bool:
+    """
+    Перевіряє, чи користувач нещодавно щось змінював.
+
+    Args:
+        user_id: ID користувача.
+
+    Returns:
+        bool: True, якщо читати треба з основної БД.
+    """
+    if _recent_writes.get(str(user_id)):
+        return True
+    try:
+        return bool(await redis_client.exists(f"rw:{user_id}"))
+    except Exception:
+        # Не знаємо напевно — безпечніше читати з основної БД
+        return True
+
+
+async def get_read_session(
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Надає сесію для запитів тільки на читання: репліку або основну БД.
+
+    Args:
+        session: Сесія основної БД (використовується як запасний варіант).
+        current_user: Авторизований користувач.
+
+    Yields:
+        AsyncSession: Сесія репліки або основної БД.
+    """
+    if (
+        async_replica_session is None
+        or not await replica_is_fresh()
+        or await is_pinned_to_primary(current_user.id)
+    ):
+        yield session
+        return
+
+    async with async_replica_session() as replica:
+        yield replica
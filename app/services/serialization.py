@@ -0,0 +1,70 @@
+"""
+Модуль швидкої серіалізації списків контактів.
+
+Дані з БД вже пройшли валідацію при записі, тому для відповідей-списків
+не потрібно повторно запускати ``ContactOut`` (``from_attributes`` та
+перевірку ``EmailStr`` на кожному рядку): словники будуються напряму з
+атрибутів, а JSON кодується через ``orjson``.
+"""
+
+from operator import attrgetter
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from app.schemas.contact import ContactOut
+
+# Поля відповіді у порядку схеми ContactOut
+CONTACT_OUT_FIELDS = tuple(ContactOut.model_fields)
+
+_get_contact_fields = attrgetter(*CONTACT_OUT_FIELDS)
+
+
+def contact_rows(contacts: Iterable[Any]) -> list[dict]:
+    """
+    Перетворює контакти (ORM-об'єкти чи рядки) на словники полів ``ContactOut``.
+
+    Args:
+        contacts: Контакти з атрибутами полів ``ContactOut``.
+
+    Returns:
+        list[dict]: Словники, готові до кодування в JSON.
+    """
+    return [dict(zip(CONTACT_OUT_FIELDS, _get_contact_fields(c))) for c in contacts]
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Кодує значення в JSON (дати — у форматі ISO 8601).
+
+    Args:
+        content: Значення для кодування.
+
+    Returns:
+        bytes: JSON у UTF-8.
+    """
+    return orjson.dumps(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-відповідь, що кодується через :func:`dumps`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def contacts_response(contacts: Iterable[Any], headers: dict[str, str] | None = None) -> FastJSONResponse:
+    """
+    Будує JSON-відповідь зі списком контактів без повторної валідації.
+
+    Args:
+        contacts: Контакти з БД.
+        headers: Додаткові заголовки відповіді.
+
+    Returns:
+        FastJSONResponse: Відповідь у форматі ``list[ContactOut]``.
+    """
+    return FastJSONResponse(contact_rows(contacts), headers=headers)
@@ -0,0 +1,118 @@
+"""
+Модуль сховищ файлів аватарів.
+
+Сховище адресується ключем (``<sha256>_<варіант>``) і має два синхронні
+методи — вони викликаються з пулу потоків :mod:`app.services.avatar`:
+
+* ``url_for(key)`` — URL вже збереженого об'єкта або None;
+* ``save(key, data)`` — зберігає файл (потоком, без читання в пам'ять).
+
+Реалізації: :class:`CloudinaryStorage` та :class:`LocalStorage` (локальна
+файлова система; також слугує заміною S3-сумісного сховища в розробці
+та тестах).
+"""
+
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Protocol
+
+import cloudinary
+import cloudinary.uploader
+
+from app.config import settings
+
+# Налаштування Cloudinary при старті застосунку
+cloudinary.config(
+    cloud_name=settings.cloudinary_name,
+    api_key=settings.cloudinary_api_key,
+    api_secret=settings.cloudinary_api_secret,
+    secure=True
+)
+
+
+class AvatarStorage(Protocol):
+    """Інтерфейс сховища аватарів."""
+
+    def url_for(self, key: str) -> str | None:
+        """Повертає URL об'єкта або None, якщо його немає."""
+
+    def save(self, key: str, data: BinaryIO) -> str:
+        """Зберігає об'єкт та повертає його URL."""
+
+
+class CloudinaryStorage:
+    """
+    Сховище в Cloudinary (тека ``avatars``).
+
+    Наявність об'єкта не перевіряється через Admin API — він має погодинний
+    ліміт запитів. Спільний для воркерів індекс «хеш → URL» веде
+    :mod:`app.services.avatar` у Redis; ``url_for`` шукає ключ лише в
+    обмеженому індексі цього процесу (на випадок недоступного Redis), а
+    ``save`` завантажує з ``overwrite=False``: для вже наявного ``public_id``
+    Cloudinary повертає існуючий ресурс без перезапису.
+    """
+
+    def __init__(self, folder: str = "avatars", index_size: int = 10_000):
+        self.folder = folder
+        self.index_size = index_size
+        # Методи викликаються з пулу потоків
+        self._index: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def url_for(self, key: str) -> str | None:
+        with self._lock:
+            url = self._index.get(key)
+            if url is not None:
+                self._index.move_to_end(key)
+            return url
+
+    def save(self, key: str, data: BinaryIO) -> str:
+        result = cloudinary.uploader.upload(
+            data,
+            folder=self.folder,
+            public_id=key,
+            overwrite=False,
+        )
+        url = result["secure_url"]
+        with self._lock:
+            self._index[key] = url
+            self._index.move_to_end(key)
+            while len(self._index) > self.index_size:
+                self._index.popitem(last=False)
+        return url
+
+
+class LocalStorage:
+    """
+    Сховище в локальній теці; файли роздаються за ``base_url``.
+    """
+
+    def __init__(self, root: str | Path, base_url: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def url_for(self, key: str) -> str | None:
+        return f"{self.base_url}/{key}" if (self.root / key).is_file() else None
+
+    def save(self, key: str, data: BinaryIO) -> str:
+        # Запис у тимчасовий файл та перейменування: читач не побачить неповний файл
+        partial = self.root / f".{key}.partial"
+        with partial.open("wb") as target:
+            shutil.copyfileobj(data, target)
+        partial.replace(self.root / key)
+        return f"{self.base_url}/{key}"
+
+
+def create_storage() -> AvatarStorage:
+    """
+    Створює сховище за ``settings.avatar_storage``.
+
+    Returns:
+        AvatarStorage: Cloudinary або локальне сховище.
+    """
+    if settings.avatar_storage == "local":
+        return LocalStorage(settings.avatar_storage_path, settings.avatar_storage_url)
+    return CloudinaryStorage()
@@ -0,0 +1,64 @@
+"""
+Бенчмарк пропускної здатності створення контактів.
+
+Порівнює покрокове ``create_contact`` (``INSERT ... RETURNING`` + commit на
+кожен рядок) з пакетним ``create_contacts_bulk`` на тестовій БД.
+
+Запуск (потрібна тестова БД з compose.yaml; таблиці буде перестворено):
+
+    python -m tests.benchmarks.bench_bulk_create --rows 100000
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.crud.contact import create_contact, create_contacts_bulk
+from app.models.user import User
+from app.schemas.contact import ContactCreate
+from tests.db import SessionTest, init_test_db
+
+
+def make_items(count: int) -> list[ContactCreate]:
+    return [
+        ContactCreate(
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            email=f"contact{i}@example.com",
+            phone=f"+380{i:09d}",
+        )
+        for i in range(count)
+    ]
+
+
+async def main(rows: int, single_rows: int) -> None:
+    await init_test_db()
+
+    async with SessionTest() as session:
+        user = User(email="bench@example.com", username="bench", password="x")
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+
+    items = make_items(single_rows)
+    async with SessionTest() as session:
+        started = time.perf_counter()
+        for item in items:
+            await create_contact(session, item, user_id=user_id)
+        elapsed = time.perf_counter() - started
+    print(f"create_contact:       {single_rows:>7} rows in {elapsed:7.2f}s -> {single_rows / elapsed:>9.0f} rows/s")
+
+    items = make_items(rows)
+    async with SessionTest() as session:
+        started = time.perf_counter()
+        await create_contacts_bulk(session, items, user_id=user_id)
+        elapsed = time.perf_counter() - started
+    print(f"create_contacts_bulk: {rows:>7} rows in {elapsed:7.2f}s -> {rows / elapsed:>9.0f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--single-rows", type=int, default=2_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.single_rows))
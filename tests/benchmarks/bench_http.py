@@ -0,0 +1,212 @@
+"""
+End-to-end бенчмарк HTTP API.
+
+Викликає ``app.main:app`` в процесі через ``httpx.ASGITransport`` на тестовій
+БД (таблиці буде перестворено) з in-memory заміною Redis. Для кожного
+сценарію вимірює пропускну здатність та p50/p95/p99:
+
+* ``auth/signup``, ``auth/login`` — реєстрація та вхід (bcrypt);
+* ``contacts/{list,search,birthdays,get}@N`` — читання при N контактів у власника;
+* ``contacts/{create,update,delete}`` — запис.
+
+Запуск (потрібна тестова БД з compose.yaml):
+
+    python -m tests.benchmarks.bench_http --output baseline.json
+    python -m tests.benchmarks.bench_http --compare baseline.json --threshold 0.2
+
+У режимі ``--compare`` процес завершується з кодом 1, якщо хоч одна
+метрика погіршилась більше, ніж на ``--threshold``.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+from contextlib import ExitStack
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from sqlalchemy import text
+
+os.environ.setdefault("TESTING", "true")
+# Ліміти запитів вимірює bench_rate_limit; тут вони лише обривали б сценарії
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("OUTBOX_RELAY_ENABLED", "false")
+
+from app.crud.contact import create_contacts_bulk  # noqa: E402
+from app.database import get_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.schemas.contact import ContactCreate  # noqa: E402
+from tests.benchmarks.fake_redis import patch_redis  # noqa: E402
+from tests.benchmarks.harness import compare, load_results, measure, print_table, save_results  # noqa: E402
+from tests.db import SessionTest, engine_test, init_test_db, override_get_session, trigram_available  # noqa: E402
+
+PASSWORD = "secret"
+
+
+def expect(response: httpx.Response, status_code: int) -> httpx.Response:
+    """Перериває бенчмарк, якщо відповідь неочікувана: міряти помилки немає сенсу."""
+    if response.status_code != status_code:
+        raise RuntimeError(f"{response.request.method} {response.request.url}: {response.status_code} {response.text}")
+    return response
+
+
+async def trigram_enabled() -> bool:
+    """
+    Чи є на сервері pg_trgm/btree_gin.
+
+    Якщо так, ``init_test_db`` уже створив розширення та триграмні індекси
+    з визначення моделі ``Contact`` (ті самі, що й у міграції b7e3f91a2c64).
+    """
+    async with engine_test.connect() as conn:
+        return await trigram_available(conn)
+
+
+async def create_owner(client: httpx.AsyncClient, email: str) -> tuple[dict, int]:
+    """Реєструє користувача та повертає заголовки авторизації і його ID."""
+    user = expect(await client.post(
+        "/auth/signup", json={"email": email, "username": email.split("@")[0], "password": PASSWORD},
+    ), 201).json()
+    token = expect(await client.post(
+        "/auth/login", data={"username": email, "password": PASSWORD},
+    ), 200).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}, user["id"]
+
+
+async def seed_contacts(user_id: int, count: int) -> None:
+    """Створює ``count`` контактів з днями народження, рівномірно розподіленими по року."""
+    items = [
+        ContactCreate(
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            email=f"contact{i}@example.com",
+            phone=f"+380{i:09d}",
+            birthday=date(1990, 1, 1) + timedelta(days=i % 365),
+        )
+        for i in range(count)
+    ]
+    async with SessionTest() as session:
+        await create_contacts_bulk(session, items, user_id=user_id)
+    async with engine_test.begin() as conn:
+        await conn.execute(text("ANALYZE contacts"))
+
+
+async def bench_auth(client: httpx.AsyncClient, iterations: int) -> dict:
+    emails = (f"signup{i}@example.com" for i in itertools.count())
+
+    async def signup(_):
+        email = next(emails)
+        expect(await client.post(
+            "/auth/signup", json={"email": email, "username": email.split("@")[0], "password": PASSWORD},
+        ), 201)
+
+    await create_owner(client, "login@example.com")
+
+    async def login(_):
+        expect(await client.post(
+            "/auth/login", data={"username": "login@example.com", "password": PASSWORD},
+        ), 200)
+
+    return {
+        "auth/signup": await measure(signup, iterations, warmup=1),
+        "auth/login": await measure(login, iterations, warmup=1),
+    }
+
+
+async def bench_reads(client: httpx.AsyncClient, size: int, iterations: int, trigram: bool) -> dict:
+    headers, user_id = await create_owner(client, f"owner{size}@example.com")
+    await seed_contacts(user_id, size)
+
+    first_page = expect(await client.get("/contacts/contacts/", params={"limit": 100}, headers=headers), 200)
+    ids = [contact["id"] for contact in first_page.json()]
+    search_params = {"q": "Last42"} if trigram else {"last_name": "Last42"}
+
+    async def list_page(_):
+        expect(await client.get("/contacts/contacts/", params={"limit": 100}, headers=headers), 200)
+
+    async def search(_):
+        expect(await client.get("/contacts/contacts/search", params=search_params, headers=headers), 200)
+
+    async def birthdays(_):
+        expect(await client.get("/contacts/contacts/birthdays", params={"days": 7}, headers=headers), 200)
+
+    async def get_one(i):
+        expect(await client.get(f"/contacts/contacts/{ids[i % len(ids)]}", headers=headers), 200)
+
+    return {
+        f"contacts/list@{size}": await measure(list_page, iterations),
+        f"contacts/search@{size}": await measure(search, iterations),
+        f"contacts/birthdays@{size}": await measure(birthdays, iterations),
+        f"contacts/get@{size}": await measure(get_one, iterations),
+    }
+
+
+async def bench_writes(client: httpx.AsyncClient, iterations: int) -> dict:
+    headers, _ = await create_owner(client, "writer@example.com")
+    created: list[int] = []
+
+    async def create(i):
+        response = expect(await client.post("/contacts/contacts/", json={
+            "first_name": "Bench", "last_name": f"Write{i}", "email": f"w{i}@example.com", "phone": "1",
+        }, headers=headers), 200)
+        created.append(response.json()["id"])
+
+    async def update(i):
+        expect(await client.put(
+            f"/contacts/contacts/{created[i]}", json={"phone": f"{i}"}, headers=headers,
+        ), 200)
+
+    async def delete(i):
+        expect(await client.delete(f"/contacts/contacts/{created[i]}", headers=headers), 204)
+
+    results = {"contacts/create": await measure(create, iterations, warmup=0)}
+    results["contacts/update"] = await measure(update, iterations, warmup=0)
+    results["contacts/delete"] = await measure(delete, iterations, warmup=0)
+    return results
+
+
+async def main(sizes: list[int], iterations: int, auth_iterations: int) -> dict:
+    await init_test_db()
+    trigram = await trigram_enabled()
+    if not trigram:
+        print("pg_trgm/btree_gin are not installed: search falls back to last_name ILIKE", file=sys.stderr)
+
+    app.dependency_overrides[get_session] = override_get_session
+    results: dict = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results.update(await bench_auth(client, auth_iterations))
+        for size in sizes:
+            results.update(await bench_reads(client, size, iterations, trigram))
+        results.update(await bench_writes(client, iterations))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,10000,100000", help="кількість контактів через кому")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--auth-iterations", type=int, default=20, help="bcrypt повільний навмисно")
+    parser.add_argument("--output", help="зберегти результати у JSON")
+    parser.add_argument("--compare", help="JSON з базовою лінією для порівняння")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        stack.enter_context(patch_redis())
+        # Лист лише друкується в консоль — не засмічуємо вивід бенчмарку
+        stack.enter_context(patch("app.services.outbox.send_verification_email", AsyncMock()))
+        sizes = [int(size) for size in args.sizes.split(",")]
+        results = asyncio.run(main(sizes, args.iterations, args.auth_iterations))
+
+    print_table(results)
+    if args.output:
+        save_results(args.output, results, sizes=sizes, iterations=args.iterations)
+
+    if args.compare:
+        regressions = compare(results, load_results(args.compare), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
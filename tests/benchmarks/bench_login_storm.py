@@ -0,0 +1,87 @@
+"""
+Бенчмарк: затримка стороннього ендпоінта під час «шторму» логінів.
+
+Поки ``--concurrency`` клієнтів безперервно викликають ``POST /auth/login``,
+окремий клієнт вимірює затримку ``GET /``. Режим ``--inline`` виконує
+bcrypt прямо в event loop (як до винесення в пул) для порівняння.
+
+Запуск (потрібна тестова БД з compose.yaml; таблиці буде перестворено):
+
+    python -m tests.benchmarks.bench_login_storm --duration 10
+    python -m tests.benchmarks.bench_login_storm --duration 10 --inline
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from unittest.mock import patch
+
+import httpx
+
+from app.database import get_session
+from app.main import app
+from app.services.hashing import password_hasher
+from tests.benchmarks.harness import percentile
+from tests.db import init_test_db, override_get_session
+
+
+async def storm(client: httpx.AsyncClient, deadline: float, counters: dict) -> None:
+    form = {"username": "storm@example.com", "password": "secret"}
+    while time.perf_counter() < deadline:
+        response = await client.post("/auth/login", data=form)
+        counters[response.status_code] = counters.get(response.status_code, 0) + 1
+
+
+async def probe(client: httpx.AsyncClient, deadline: float, latencies: list[float]) -> None:
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/")
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def main(duration: float, concurrency: int) -> None:
+    await init_test_db()
+    app.dependency_overrides[get_session] = override_get_session
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post(
+            "/auth/signup",
+            json={"email": "storm@example.com", "username": "storm", "password": "secret"},
+        )
+
+        latencies: list[float] = []
+        counters: dict[int, int] = {}
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(
+            probe(client, deadline, latencies),
+            *(storm(client, deadline, counters) for _ in range(concurrency)),
+        )
+
+    print(f"logins by status: {counters} ({sum(counters.values()) / duration:.1f} req/s)")
+    print(
+        f"GET / latency ms: p50={statistics.median(latencies):.2f} "
+        f"p95={percentile(latencies, 95):.2f} p99={percentile(latencies, 99):.2f} "
+        f"(n={len(latencies)})"
+    )
+    print(f"hash pool: {password_hasher.stats()}")
+
+
+async def run_inline(fn, *args):
+    return fn(*args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--inline", action="store_true", help="bcrypt в event loop (старий режим)")
+    args = parser.parse_args()
+
+    if args.inline:
+        with patch.object(password_hasher, "run", run_inline):
+            asyncio.run(main(args.duration, args.concurrency))
+    else:
+        asyncio.run(main(args.duration, args.concurrency))
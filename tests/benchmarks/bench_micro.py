@@ -0,0 +1,159 @@
+"""
+Мікробенчмарки функцій, що виконуються на кожному запиті.
+
+* ``create_access_token``;
+* ``verify_token`` — влучання в кеш JWT та промах;
+* гілка влучання в кеш ``get_current_user`` разом зі створенням ``User(...)``;
+* ``get_cached_user`` (читання з Redis + ``json.loads``);
+* валідація ``ContactOut`` для 1k / 10k ORM-об'єктів.
+
+Redis замінено in-memory реалізацією, тож міряється лише код застосунку.
+Результат — JSON (``--output``) з часом однієї операції в мікросекундах:
+найкращий і медіанний серед ``--repeat`` повторів.
+
+Запуск:
+
+    python -m tests.benchmarks.bench_micro --output micro.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import date
+
+from pydantic import TypeAdapter
+
+from app.models.contact import Contact
+from app.models.user import User
+from app.schemas.contact import ContactOut
+from app.services.auth import create_access_token, get_current_user, token_cache, verify_token
+from app.services.cache import cache_user, get_cached_user
+from tests.benchmarks.fake_redis import patch_redis
+from tests.benchmarks.harness import save_results
+
+USER = {
+    "id": 1,
+    "email": "micro@example.com",
+    "username": "micro",
+    "password": "$2b$12$" + "x" * 53,
+    "is_verified": True,
+    "avatar_url": None,
+    "role": "user",
+}
+
+
+def _stats(totals: list[float], number: int) -> dict:
+    per_op = [total / number * 1e6 for total in totals]
+    return {
+        "number": number,
+        "repeat": len(totals),
+        "best_us": round(min(per_op), 3),
+        "median_us": round(statistics.median(per_op), 3),
+        "ops_per_sec": round(1e6 / min(per_op)),
+    }
+
+
+def bench(fn, number: int, repeat: int) -> dict:
+    """Вимірює синхронну функцію без аргументів."""
+    totals = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        totals.append(time.perf_counter() - started)
+    return _stats(totals, number)
+
+
+async def abench(fn, number: int, repeat: int) -> dict:
+    """Вимірює асинхронну функцію без аргументів в одному event loop."""
+    totals = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            await fn()
+        totals.append(time.perf_counter() - started)
+    return _stats(totals, number)
+
+
+def make_contacts(count: int) -> list[Contact]:
+    return [
+        Contact(
+            id=i,
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            email=f"contact{i}@example.com",
+            phone=f"+380{i:09d}",
+            birthday=date(1990, 1, 1),
+            additional_info=None,
+            owner_id=1,
+        )
+        for i in range(count)
+    ]
+
+
+async def run(number: int, repeat: int) -> dict:
+    results = {}
+    token = create_access_token({"sub": USER["email"]})
+
+    results["create_access_token"] = bench(
+        lambda: create_access_token({"sub": USER["email"]}), number, repeat
+    )
+
+    await verify_token(token)
+    results["verify_token/hit"] = await abench(lambda: verify_token(token), number, repeat)
+
+    tokens = [create_access_token({"sub": f"user{i}@example.com"}) for i in range(number)]
+
+    async def verify_miss():
+        # Кеш очищується до кожного повтору, тож кожен токен — промах
+        await verify_token(next(remaining))
+
+    totals = []
+    for _ in range(repeat):
+        token_cache.clear()
+        remaining = iter(tokens)
+        totals.append((await abench(verify_miss, number, 1))["best_us"] * number / 1e6)
+    results["verify_token/miss"] = _stats(totals, number)
+
+    await cache_user(USER["email"], USER)
+    results["get_cached_user"] = await abench(lambda: get_cached_user(USER["email"]), number, repeat)
+    raw = json.dumps(USER)
+    results["get_cached_user/json.loads"] = bench(lambda: json.loads(raw), number, repeat)
+    results["User(...) from cache dict"] = bench(lambda: User(**USER), number, repeat)
+    results["get_current_user/cache_hit"] = await abench(
+        lambda: get_current_user(token=token, session=None), number, repeat
+    )
+
+    adapter = TypeAdapter(list[ContactOut])
+    for size in (1_000, 10_000):
+        rows = make_contacts(size)
+        rounds = max(1, number // size)
+        results[f"ContactOut.model_validate x{size}"] = bench(
+            lambda: [ContactOut.model_validate(row) for row in rows], rounds, repeat
+        )
+        # Так FastAPI валідує response_model=list[ContactOut]
+        results[f"TypeAdapter(list[ContactOut]) x{size}"] = bench(
+            lambda: adapter.validate_python(rows, from_attributes=True), rounds, repeat
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=10_000, help="викликів у повторі")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="зберегти результати у JSON")
+    args = parser.parse_args()
+
+    with patch_redis():
+        results = asyncio.run(run(args.number, args.repeat))
+
+    print(f"{'benchmark':<40} {'best µs':>12} {'median µs':>12} {'ops/s':>10}")
+    for name, r in results.items():
+        print(f"{name:<40} {r['best_us']:>12.2f} {r['median_us']:>12.2f} {r['ops_per_sec']:>10}")
+
+    if args.output:
+        save_results(args.output, results, number=args.number, repeat=args.repeat)
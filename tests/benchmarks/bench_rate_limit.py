@@ -0,0 +1,71 @@
+"""
+Бенчмарк накладних витрат rate limiting на один запит.
+
+Порівнює затримку роуту без ліміту та з ``@limiter.limit`` (ліміт
+недосяжний, тож міряється лише перевірка) для анонімного запиту (ключ
+за IP) та запиту з JWT (ключ за користувачем).
+
+Запуск:
+
+    python -m tests.benchmarks.bench_rate_limit --storage-uri memory://
+    python -m tests.benchmarks.bench_rate_limit --storage-uri redis://localhost:6379
+"""
+
+import argparse
+import asyncio
+
+import httpx
+from fastapi import FastAPI, Request
+from slowapi import Limiter
+from slowapi.middleware import SlowAPIMiddleware
+
+from app.services.auth import create_access_token
+from app.services.limiter import rate_limit_key
+from tests.benchmarks.harness import measure, print_table
+
+
+def build_app(storage_uri: str) -> FastAPI:
+    limiter = Limiter(key_func=rate_limit_key, storage_uri=storage_uri, strategy="moving-window")
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_middleware(SlowAPIMiddleware)
+
+    @app.get("/plain")
+    async def plain():
+        return {}
+
+    @app.get("/limited")
+    @limiter.limit("1000000/minute")
+    async def limited(request: Request):
+        return {}
+
+    return app
+
+
+async def main(storage_uri: str, iterations: int) -> None:
+    transport = httpx.ASGITransport(app=build_app(storage_uri))
+    jwt = {"Authorization": f"Bearer {create_access_token({'sub': 'bench@example.com'})}"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = {}
+        for label, headers in (("anonymous", {}), ("jwt", jwt)):
+            for route in ("plain", "limited"):
+                async def call(_):
+                    await client.get(f"/{route}", headers=headers)
+
+                results[f"{route}/{label}"] = await measure(call, iterations, warmup=50)
+
+    print(f"storage: {storage_uri}")
+    print_table(results)
+    for label in ("anonymous", "jwt"):
+        # Середнє стабільніше за медіану, коли різниця — десятки мікросекунд
+        overhead = results[f"limited/{label}"]["mean_ms"] - results[f"plain/{label}"]["mean_ms"]
+        print(f"mean overhead ({label}): {overhead * 1000:.0f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--storage-uri", default="memory://")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.storage_uri, args.iterations))
@@ -0,0 +1,77 @@
+"""
+Бенчмарк шляху читання: ORM-сутності проти Core-рядків.
+
+Для однієї сторінки з ``--rows`` контактів порівнює:
+
+* ``select(Contact)`` — повні сутності в identity map сесії;
+* ``get_contacts`` — ``select(*CONTACT_OUT_COLUMNS)``, легкі рядки ``Row``.
+
+Вимірюється час запиту разом із серіалізацією відповіді та пік пам'яті
+Python (``tracemalloc``). Запуск (потрібна тестова БД з compose.yaml;
+таблиці буде перестворено):
+
+    python -m tests.benchmarks.bench_read_path --rows 10000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from sqlalchemy import select
+
+from app.crud.contact import get_contacts
+from app.models.contact import Contact
+from app.models.user import User
+from app.services.serialization import contacts_response
+from tests.benchmarks.bench_http import seed_contacts
+from tests.db import SessionTest, init_test_db
+
+
+async def orm_entities(session, user_id: int):
+    result = await session.execute(select(Contact).where(Contact.owner_id == user_id).order_by(Contact.id))
+    return result.scalars().all()
+
+
+async def core_rows(session, user_id: int):
+    return await get_contacts(session, user_id=user_id)
+
+
+async def measure(label: str, fetch, user_id: int, repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        # Нова сесія на кожен повтор — як нова сесія на кожен HTTP-запит
+        async with SessionTest() as session:
+            started = time.perf_counter()
+            contacts_response(await fetch(session, user_id))
+            best = min(best, time.perf_counter() - started)
+
+    async with SessionTest() as session:
+        tracemalloc.start()
+        rows = await fetch(session, user_id)
+        contacts_response(rows)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"{label:<36} {best * 1000:9.2f} ms   peak {peak / 2**20:7.2f} MiB   ({len(rows)} rows)")
+
+
+async def main(rows: int, repeat: int) -> None:
+    await init_test_db()
+    async with SessionTest() as session:
+        user = User(email="reader@example.com", username="reader", password="x")
+        session.add(user)
+        await session.commit()
+        user_id = user.id
+    await seed_contacts(user_id, rows)
+
+    await measure("ORM select(Contact)", orm_entities, user_id, repeat)
+    await measure("Core select(*CONTACT_OUT_COLUMNS)", core_rows, user_id, repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,58 @@
+"""
+Бенчмарк серіалізації списку контактів у JSON.
+
+Порівнює шлях ``response_model=list[ContactOut]`` (валідація
+``from_attributes`` з перевіркою ``EmailStr`` на кожному рядку, потім
+``json.dumps``) зі швидким шляхом ``contacts_response`` без повторної
+валідації.
+
+Запуск:
+
+    python -m tests.benchmarks.bench_serialization --rows 10000
+"""
+
+import argparse
+import json
+import time
+
+from pydantic import TypeAdapter
+
+from app.schemas.contact import ContactOut
+from app.services.serialization import contacts_response
+from tests.benchmarks.bench_micro import make_contacts
+
+adapter = TypeAdapter(list[ContactOut])
+
+
+def response_model_path(rows) -> bytes:
+    content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(rows) -> bytes:
+    return contacts_response(rows).body
+
+
+def measure(label: str, fn, rows, repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<40} {best * 1000:9.2f} ms / {len(rows)} contacts")
+
+
+def main(rows_count: int, repeat: int) -> None:
+    rows = make_contacts(rows_count)
+    assert json.loads(response_model_path(rows)) == json.loads(fast_path(rows))
+
+    measure("response_model=list[ContactOut]", response_model_path, rows, repeat)
+    measure("contacts_response (orjson)", fast_path, rows, repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
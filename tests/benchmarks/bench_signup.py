@@ -0,0 +1,145 @@
+"""
+Бенчмарк реєстрацій за секунду.
+
+Порівнює попередній шлях створення користувача (``SELECT`` за email, потім
+``add`` + ``commit`` + ``refresh``) з ``SELECT id`` за email та ``INSERT ...
+ON CONFLICT (email) DO NOTHING RETURNING`` + ``commit`` — послідовно та з
+``--concurrency`` паралельними сесіями, для нових email та для повторів уже
+зайнятого. Сценарій ``http/signup`` викликає ``POST /auth/signup`` повністю.
+
+bcrypt за замовчуванням замінено готовим хешем, щоб міряти саме роботу з
+БД; ``--bcrypt`` вмикає справжнє хешування (для повторів зайнятого email
+обидва шляхи його пропускають).
+
+Запуск (потрібна тестова БД з compose.yaml; таблиці буде перестворено):
+
+    python -m tests.benchmarks.bench_signup --iterations 2000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import time
+from contextlib import ExitStack
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from sqlalchemy import select
+
+os.environ.setdefault("TESTING", "true")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("OUTBOX_RELAY_ENABLED", "false")
+
+from app.crud import user as user_crud  # noqa: E402
+from app.crud.user import create_user, hash_password  # noqa: E402
+from app.database import get_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.user import UserCreate  # noqa: E402
+from tests.benchmarks.fake_redis import patch_redis  # noqa: E402
+from tests.benchmarks.harness import measure, print_table, save_results, summarize  # noqa: E402
+from tests.db import SessionTest, init_test_db, override_get_session  # noqa: E402
+
+
+async def legacy_create_user(session, user_data: UserCreate) -> User | None:
+    """Попередній шлях: перевірка існування, потім add + commit + refresh."""
+    result = await session.execute(select(User).where(User.email == str(user_data.email)))
+    if result.scalar_one_or_none() is not None:
+        return None
+    password = await user_crud.hash_password_async(user_data.password)
+    user = User(email=str(user_data.email), username=user_data.username, password=password)
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
+    return user
+
+
+async def insert_create_user(session, user_data: UserCreate) -> User | None:
+    user = await create_user(session, user_data)
+    await session.commit()
+    return user
+
+
+async def measure_concurrent(call, iterations: int, concurrency: int) -> dict:
+    """Виконує ``call(i)`` ``iterations`` разів у ``concurrency`` паралельних потоках виконання."""
+    counter = itertools.count()
+    latencies: list[float] = []
+
+    async def worker():
+        while (i := next(counter)) < iterations:
+            started = time.perf_counter()
+            await call(i)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def bench_crud(name: str, create, iterations: int, concurrency: int) -> dict:
+    emails = itertools.count()
+
+    async def unique(_):
+        n = next(emails)
+        async with SessionTest() as session:
+            await create(session, UserCreate(email=f"{name}{n}@example.com", username="bench", password="secret"))
+
+    taken = UserCreate(email=f"{name}-taken@example.com", username="bench", password="secret")
+
+    async def duplicate(_):
+        async with SessionTest() as session:
+            await create(session, taken)
+
+    return {
+        f"crud/{name}": await measure(unique, iterations),
+        f"crud/{name}/duplicate": await measure(duplicate, iterations),
+        f"crud/{name}@{concurrency}": await measure_concurrent(unique, iterations, concurrency),
+    }
+
+
+async def bench_http(iterations: int, concurrency: int) -> dict:
+    app.dependency_overrides[get_session] = override_get_session
+    emails = itertools.count()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def signup(_):
+            email = f"http{next(emails)}@example.com"
+            response = await client.post("/auth/signup", json={"email": email, "username": "bench", "password": "x"})
+            if response.status_code != 201:
+                raise RuntimeError(f"signup: {response.status_code} {response.text}")
+
+        return {
+            "http/signup": await measure(signup, iterations),
+            f"http/signup@{concurrency}": await measure_concurrent(signup, iterations, concurrency),
+        }
+
+
+async def main(iterations: int, concurrency: int) -> dict:
+    await init_test_db()
+    results = {}
+    results.update(await bench_crud("select+insert", legacy_create_user, iterations, concurrency))
+    results.update(await bench_crud("insert_on_conflict", insert_create_user, iterations, concurrency))
+    results.update(await bench_http(iterations, concurrency))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--bcrypt", action="store_true", help="справжнє хешування паролів")
+    parser.add_argument("--output", help="зберегти результати у JSON")
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        stack.enter_context(patch_redis())
+        stack.enter_context(patch("app.services.outbox.send_verification_email", AsyncMock()))
+        if not args.bcrypt:
+            hashed = hash_password("secret")
+            stack.enter_context(patch("app.crud.user.hash_password_async", AsyncMock(return_value=hashed)))
+        results = asyncio.run(main(args.iterations, args.concurrency))
+
+    print_table(results)
+    if args.output:
+        save_results(args.output, results, iterations=args.iterations, concurrency=args.concurrency)
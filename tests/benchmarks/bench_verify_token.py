@@ -0,0 +1,51 @@
+"""
+Мікробенчмарк вартості автентифікації одного запиту.
+
+Порівнює пряме ``jwt.decode`` + ``TokenData`` (як до появи кешу) з
+``decode_token`` для влучання в кеш та промаху.
+
+Запуск:
+
+    python -m tests.benchmarks.bench_verify_token --iterations 20000
+"""
+
+import argparse
+import time
+
+from jose import jwt
+
+from app.schemas.user import TokenData
+from app.services.auth import ALGORITHM, SECRET_KEY, create_access_token, decode_token, token_cache
+
+
+def uncached(token: str) -> TokenData:
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    return TokenData(email=payload["sub"])
+
+
+def measure(label: str, fn, tokens: list[str]) -> None:
+    started = time.perf_counter()
+    for token in tokens:
+        fn(token)
+    per_call = (time.perf_counter() - started) / len(tokens) * 1e6
+    print(f"{label:<28} {per_call:8.2f} µs/request")
+
+
+def main(iterations: int) -> None:
+    distinct = [create_access_token({"sub": f"user{i}@example.com"}) for i in range(iterations)]
+    same = [distinct[0]] * iterations
+
+    measure("jwt.decode (no cache)", uncached, same)
+
+    token_cache.clear()
+    token_cache.max_size = iterations
+    measure("decode_token, cache miss", decode_token, distinct)
+
+    decode_token(same[0])
+    measure("decode_token, cache hit", decode_token, same)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    main(parser.parse_args().iterations)
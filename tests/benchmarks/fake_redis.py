@@ -0,0 +1,83 @@
+"""
+In-process заміна ``redis.asyncio.Redis`` для бенчмарків.
+
+Підтримує лише команди, які використовує застосунок, і зберігає рядки
+(як клієнт з ``decode_responses=True``). Затримка мережі не імітується,
+тож бенчмарки вимірюють саме застосунок.
+"""
+
+import time
+from contextlib import ExitStack
+from unittest.mock import patch
+
+# Модулі, що імпортують redis_client за іменем
+PATCH_TARGETS = (
+    "app.services.avatar.redis_client",
+    "app.services.cache.redis_client",
+    "app.services.password_reset.redis_client",
+    "app.services.read_routing.redis_client",
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self._data: dict[str, tuple[str, float | None]] = {}
+
+    def _live(self, key: str) -> str | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> str | None:
+        return self._live(key)
+
+    async def set(self, key: str, value, ex: int | None = None, nx: bool = False):
+        if nx and self._live(key) is not None:
+            return None
+        expires_at = time.monotonic() + ex if ex else None
+        self._data[key] = (str(value), expires_at)
+        return True
+
+    async def setex(self, key: str, seconds: int, value) -> bool:
+        return await self.set(key, value, ex=seconds)
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    async def exists(self, *keys: str) -> int:
+        return sum(self._live(key) is not None for key in keys)
+
+    async def incr(self, key: str) -> int:
+        entry = self._data.get(key)
+        value = int(self._live(key) or 0) + 1
+        self._data[key] = (str(value), entry[1] if entry else None)
+        return value
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        value = self._live(key)
+        if value is None:
+            return False
+        self._data[key] = (value, time.monotonic() + seconds)
+        return True
+
+    async def publish(self, channel: str, message) -> int:
+        return 0
+
+
+def patch_redis(fake: FakeRedis | None = None) -> ExitStack:
+    """
+    Підміняє ``redis_client`` у всіх модулях застосунку.
+
+    Returns:
+        ExitStack: Контекст, що відновлює справжній клієнт при виході.
+    """
+    fake = fake or FakeRedis()
+    stack = ExitStack()
+    for target in PATCH_TARGETS:
+        stack.enter_context(patch(target, fake))
+    return stack
@@ -0,0 +1,123 @@
+"""
+Спільні інструменти бенчмарків: статистика, JSON-базові лінії та порівняння.
+
+Результат сценарію — словник з кількістю запитів, пропускною здатністю
+та перцентилями затримки в мілісекундах. Файл результатів має вигляд::
+
+    {"meta": {...}, "results": {"<сценарій>": {"n": ..., "rps": ..., "p50_ms": ..., ...}}}
+"""
+
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+# Метрики, зростання яких вважається регресією; для rps регресія — падіння
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Перцентиль методом найближчого рангу."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies_ms: list[float], elapsed: float) -> dict:
+    """
+    Зводить затримки сценарію у статистику.
+
+    Args:
+        latencies_ms: Затримки окремих викликів у мілісекундах.
+        elapsed: Загальний час сценарію в секундах.
+
+    Returns:
+        dict: ``n``, ``rps``, ``mean_ms``, ``p50_ms``, ``p95_ms``, ``p99_ms``.
+    """
+    return {
+        "n": len(latencies_ms),
+        "rps": round(len(latencies_ms) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies_ms), 3),
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "p99_ms": round(percentile(latencies_ms, 99), 3),
+    }
+
+
+async def measure(call: Callable[[int], Awaitable[object]], iterations: int, warmup: int = 5) -> dict:
+    """
+    Виконує ``call(i)`` послідовно ``iterations`` разів і зводить затримки.
+
+    Args:
+        call: Асинхронна функція, що отримує номер ітерації.
+        iterations: Кількість вимірюваних викликів.
+        warmup: Кількість невимірюваних викликів на початку.
+
+    Returns:
+        dict: Результат :func:`summarize`.
+    """
+    for i in range(warmup):
+        await call(-1 - i)
+
+    latencies: list[float] = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        await call(i)
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def save_results(path: str | Path, results: dict, **meta) -> None:
+    """Зберігає результати у JSON разом з відомостями про середовище."""
+    payload = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **meta,
+        },
+        "results": results,
+    }
+    Path(path).write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n")
+
+
+def load_results(path: str | Path) -> dict:
+    """Завантажує результати, збережені :func:`save_results`."""
+    return json.loads(Path(path).read_text())["results"]
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Порівнює результати з базовою лінією.
+
+    Args:
+        current: Поточні результати за сценаріями.
+        baseline: Базові результати за сценаріями.
+        threshold: Допустиме погіршення (0.2 — на 20%).
+
+    Returns:
+        list[str]: Опис регресій; порожній список, якщо їх немає.
+    """
+    regressions = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key in LATENCY_KEYS:
+            if base[key] > 0 and result[key] > base[key] * (1 + threshold):
+                regressions.append(f"{name}: {key} {base[key]} -> {result[key]}")
+        if base["rps"] > 0 and result["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {base['rps']} -> {result['rps']}")
+    return regressions
+
+
+def print_table(results: dict) -> None:
+    """Друкує результати таблицею."""
+    print(f"{'scenario':<32} {'n':>6} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, r in results.items():
+        print(
+            f"{name:<32} {r['n']:>6} {r['rps']:>9.1f} "
+            f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}"
+        )
@@ -4,6 +4,14 @@ import asyncio
 from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock, patch
 
+# Перевищення @query_budget у тестах має валити тест
+os.environ.setdefault("QUERY_BUDGET_MODE", "strict")
+# Ліміти перевіряються окремими тестами; лічильники — у пам'яті, без Redis
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("RATE_LIMIT_STORAGE_URI", "memory://")
+# Події outbox виконуються фоновою задачею запиту на тестовій БД, без опитування
+os.environ.setdefault("OUTBOX_RELAY_ENABLED", "false")
+
 from app.main import app
 from app.database import get_session
 
@@ -5,11 +5,16 @@ from app.crud.contact import (
     get_contacts,
     get_contact_by_id,
     create_contact,
+    create_contacts_bulk,
     update_contact,
     delete_contact,
     search_contacts,
     get_upcoming_birthdays,
+    birthday_window,
 )
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+
 from app.models.contact import Contact
 from app.schemas.contact import ContactCreate, ContactUpdate
 
@@ -21,7 +26,7 @@ async def test_get_contacts(mock_session):
     mock_contact = Contact(id=1, first_name="A", last_name="B", email="x@x.com", phone="123", owner_id=1)
 
     mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = [mock_contact]
+    mock_result.all.return_value = [mock_contact]
     mock_session.execute.return_value = mock_result
 
     contacts = await get_contacts(mock_session, user_id=1)
@@ -31,6 +36,21 @@ async def test_get_contacts(mock_session):
     mock_session.execute.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_get_contacts_keyset_page(mock_session):
+    mock_result = MagicMock()
+    mock_result.all.return_value = []
+    mock_session.execute.return_value = mock_result
+
+    await get_contacts(mock_session, user_id=1, limit=10, after=("Doe", 5), sort="last_name")
+
+    stmt = mock_session.execute.await_args.args[0]
+    sql = str(stmt)
+    assert "ORDER BY contacts.last_name, contacts.id" in sql
+    assert "(contacts.last_name, contacts.id) >" in sql
+    assert "LIMIT" in sql
+
+
 # ------------------ get_contact_by_id ------------------ #
 
 @pytest.mark.asyncio
@@ -49,6 +69,11 @@ async def test_get_contact_by_id(mock_session):
 
 # ------------------ create_contact ------------------ #
 
+def _compiled(mock_session) -> str:
+    sql = str(mock_session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    return " ".join(sql.split()).replace("( ", "(")
+
+
 @pytest.mark.asyncio
 async def test_create_contact(mock_session):
     data = ContactCreate(
@@ -58,52 +83,139 @@ async def test_create_contact(mock_session):
         phone="12345"
     )
 
-    mock_contact = Contact(id=1, **data.model_dump(), owner_id=1)
-
-    # session.refresh должен вернуть mock_contact
-    mock_session.refresh = AsyncMock(return_value=mock_contact)
+    row = MagicMock(id=1, first_name="John", version=1)
+    mock_session.execute.return_value.one = MagicMock(return_value=row)
 
     result = await create_contact(mock_session, data, user_id=1)
 
-    assert isinstance(result, Contact)
-    assert result.first_name == "John"
-    assert mock_session.add.called
-    assert mock_session.commit.called
-    assert mock_session.refresh.called
+    assert result is row
+    sql = _compiled(mock_session)
+    # Версія списку контактів збільшується в тому ж запиті
+    assert sql.startswith("WITH bump_contacts_version AS (UPDATE users SET contacts_version=")
+    assert "INSERT INTO contacts" in sql
+    assert "RETURNING contacts.id" in sql
+    mock_session.execute.assert_awaited_once()
+    mock_session.commit.assert_awaited_once()
+    mock_session.refresh.assert_not_awaited()
+    assert not mock_session.add.called
+
+
+# ------------------ create_contacts_bulk ------------------ #
+
+@pytest.mark.asyncio
+async def test_create_contacts_bulk_chunks(mock_session):
+    items = [
+        ContactCreate(first_name=f"N{i}", last_name="L", email=f"n{i}@example.com", phone="1")
+        for i in range(5)
+    ]
+
+    chunk_ids = iter([[1, 2], [3, 4], [5]])
+
+    def execute(stmt, rows=None):
+        result = MagicMock()
+        if rows is not None:
+            result.scalars.return_value.all.return_value = next(chunk_ids)
+            assert all(row["owner_id"] == 7 for row in rows)
+        return result
+
+    mock_session.execute = AsyncMock(side_effect=execute)
+    mock_session.begin_nested = MagicMock()
+
+    ids = await create_contacts_bulk(mock_session, items, user_id=7, chunk_size=2)
+
+    assert ids == [1, 2, 3, 4, 5]
+    # 3 пачки INSERT + збільшення версії списку контактів власника
+    assert mock_session.execute.await_count == 4
+    assert "UPDATE users SET contacts_version" in str(mock_session.execute.await_args.args[0])
+    mock_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_contacts_bulk_isolates_rows_rejected_by_db(mock_session):
+    items = [
+        ContactCreate(first_name=f"N{i}", last_name="L", email=f"n{i}@example.com", phone="1")
+        for i in range(3)
+    ]
+
+    def execute(stmt, rows=None):
+        if rows is not None and any(row["first_name"] == "N1" for row in rows):
+            raise DBAPIError("INSERT", {}, Exception("rejected"))
+        result = MagicMock()
+        if rows is not None:
+            result.scalars.return_value.all.return_value = [int(row["first_name"][1:]) + 10 for row in rows]
+        return result
+
+    mock_session.execute = AsyncMock(side_effect=execute)
+    mock_session.begin_nested = MagicMock()
+
+    ids = await create_contacts_bulk(mock_session, items, user_id=7)
+
+    # Пачку відхилено — рядки вставлено окремо, відхилено лише невалідний
+    assert ids == [10, None, 12]
+    mock_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_contacts_bulk_empty_is_noop(mock_session):
+    assert await create_contacts_bulk(mock_session, [], user_id=7) == []
+
+    mock_session.execute.assert_not_awaited()
+    mock_session.commit.assert_not_awaited()
 
 
 # ------------------ update_contact ------------------ #
 
 @pytest.mark.asyncio
 async def test_update_contact(mock_session):
-    old = Contact(
-        id=1,
-        first_name="Old",
-        last_name="User",
-        email="old@example.com",
-        phone="123",
-        owner_id=1
-    )
+    row = MagicMock(id=1, first_name="New", version=2)
+    mock_session.execute.return_value.one_or_none = MagicMock(return_value=row)
+
+    result = await update_contact(mock_session, 1, 1, ContactUpdate(first_name="New"))
+
+    assert result is row
+    sql = _compiled(mock_session)
+    assert sql.startswith("WITH bump_contacts_version AS (UPDATE users SET contacts_version=")
+    assert "UPDATE contacts SET first_name=" in sql
+    assert "version=(contacts.version + " in sql
+    assert "WHERE contacts.id = " in sql and "AND contacts.owner_id = " in sql
+    # Без оновлених полів інших колонок у SET немає
+    assert "last_name=" not in sql
+    mock_session.execute.assert_awaited_once()
+    mock_session.commit.assert_awaited_once()
+    mock_session.refresh.assert_not_awaited()
 
-    data = ContactUpdate(first_name="New")
 
-    result = await update_contact(mock_session, old, data)
+@pytest.mark.asyncio
+async def test_update_contact_not_found(mock_session):
+    mock_session.execute.return_value.one_or_none = MagicMock(return_value=None)
 
-    assert result.first_name == "New"
-    assert mock_session.commit.called
-    assert mock_session.refresh.called
+    assert await update_contact(mock_session, 1, 2, ContactUpdate(first_name="New")) is None
+    # Версія списку збільшується лише для власного контакту
+    assert "EXISTS (SELECT contacts.id" in _compiled(mock_session)
 
 
 # ------------------ delete_contact ------------------ #
 
 @pytest.mark.asyncio
 async def test_delete_contact(mock_session):
-    contact = Contact(id=20, first_name="A", last_name="B", email="x", phone="1", owner_id=1)
+    mock_session.execute.return_value.scalar_one_or_none = MagicMock(return_value=20)
 
-    await delete_contact(mock_session, contact)
+    assert await delete_contact(mock_session, 20, 1) is True
 
-    mock_session.delete.assert_awaited_once_with(contact)
+    sql = _compiled(mock_session)
+    assert sql.startswith("WITH bump_contacts_version AS (UPDATE users SET contacts_version=")
+    assert "DELETE FROM contacts WHERE contacts.id = " in sql
+    assert "RETURNING contacts.id" in sql
+    mock_session.execute.assert_awaited_once()
     mock_session.commit.assert_awaited_once()
+    mock_session.delete.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_delete_contact_not_found(mock_session):
+    mock_session.execute.return_value.scalar_one_or_none = MagicMock(return_value=None)
+
+    assert await delete_contact(mock_session, 20, 1) is False
 
 
 # ------------------ search_contacts ------------------ #
@@ -114,7 +226,7 @@ async def test_search_contacts(mock_session):
                 phone="123", owner_id=1)
 
     mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = [c]
+    mock_result.all.return_value = [c]
     mock_session.execute.return_value = mock_result
 
     result = await search_contacts(mock_session, 1, first_name="Jo")
@@ -128,29 +240,73 @@ async def test_search_contacts(mock_session):
 
 @pytest.mark.asyncio
 async def test_get_upcoming_birthdays(mock_session):
-    from datetime import date, timedelta
-
-    today = date.today()
-    near = today + timedelta(days=3)
+    from datetime import date
 
     c1 = Contact(
         id=1, first_name="Bob", last_name="R",
         email="a@a.com", phone="1",
-        birthday=near,
-        owner_id=1
-    )
-    c2 = Contact(
-        id=2, first_name="Tom", last_name="R",
-        email="b@b.com", phone="2",
-        birthday=today - timedelta(days=10),
+        birthday=date(1990, 12, 30),
         owner_id=1
     )
 
     mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = [c1, c2]
+    mock_result.all.return_value = [c1]
     mock_session.execute.return_value = mock_result
 
-    result = await get_upcoming_birthdays(mock_session, 1)
+    result = await get_upcoming_birthdays(mock_session, 1, days=7, today=date(2026, 12, 28))
 
-    assert len(result) == 1
-    assert result[0].id == 1
+    assert result == [c1]
+    mock_session.execute.assert_awaited_once()
+    sql = str(mock_session.execute.await_args.args[0])
+    assert "contacts.birthday_md >=" in sql
+    assert " OR contacts.birthday_md <=" in sql
+
+
+def test_birthday_window_simple():
+    from datetime import date
+
+    assert birthday_window(date(2026, 5, 10), 7) == (510, 517)
+
+
+def test_birthday_window_year_wrap():
+    from datetime import date
+
+    assert birthday_window(date(2026, 12, 28), 7) == (1228, 104)
+
+
+def test_birthday_window_feb_29_in_common_year():
+    from datetime import date
+
+    # 29 лютого святкують 28 лютого, якщо рік невисокосний
+    assert birthday_window(date(2027, 2, 21), 7) == (221, 229)
+    # У високосний рік 28 лютого — звичайний день
+    assert birthday_window(date(2028, 2, 21), 7) == (221, 228)
+
+
+def test_birthday_window_whole_year():
+    from datetime import date
+
+    assert birthday_window(date(2026, 1, 1), 365) is None
+
+
+def test_read_queries_select_only_response_columns():
+    """Функції читання вибирають колонки ContactOut через Core, а не ORM-сутності."""
+    from app.crud.contact import CONTACT_OUT_COLUMNS
+    from app.schemas.contact import ContactOut
+
+    assert {column.key for column in CONTACT_OUT_COLUMNS} == set(ContactOut.model_fields)
+
+
+@pytest.mark.asyncio
+async def test_get_contacts_returns_rows_outside_identity_map(mock_session):
+    """Запит не завантажує сутності Contact, а лише колонки відповіді."""
+    mock_result = MagicMock()
+    mock_result.all.return_value = []
+    mock_session.execute.return_value = mock_result
+
+    await get_contacts(mock_session, user_id=1)
+
+    stmt = mock_session.execute.await_args.args[0]
+    assert [d["entity"] for d in stmt.column_descriptions] == [Contact] * 7
+    assert all(d["expr"] is not Contact for d in stmt.column_descriptions)
+    assert "owner_id," not in str(stmt).split("FROM")[0]
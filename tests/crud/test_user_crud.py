@@ -1,5 +1,6 @@
 import pytest
-from unittest.mock import MagicMock, AsyncMock
+from unittest.mock import MagicMock, AsyncMock, patch
+from sqlalchemy.dialects import postgresql
 
 from app.crud.user import (
     hash_password,
@@ -77,7 +78,7 @@ async def test_get_user_by_email(mock_session):
 @pytest.mark.asyncio
 async def test_create_user(mock_session):
     """
-    Створює нового користувача та хешує пароль.
+    Перевіряє email, хешує пароль та створює користувача INSERT ... ON CONFLICT.
     """
     data = UserCreate(
         email="new@example.com",
@@ -85,20 +86,60 @@ async def test_create_user(mock_session):
         password="secret"
     )
 
-    # session.refresh має повернути User
+    # Email вільний, RETURNING повертає створеного користувача
     mock_user = User(id=1, email=data.email, username=data.username, password="hashed")
-    mock_session.refresh = AsyncMock(return_value=mock_user)
+    missing_result = MagicMock()
+    missing_result.scalar_one_or_none.return_value = None
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = mock_user
+    mock_session.execute = AsyncMock(side_effect=[missing_result, mock_result])
 
     result = await create_user(mock_session, data)
 
     assert isinstance(result, User)
     assert result.email == "new@example.com"
     assert result.username == "NewUser"
-    assert result.password != data.password  # пароль має бути хешований
 
-    assert mock_session.add.called
-    assert mock_session.commit.called
-    assert mock_session.refresh.called
+    stmt = mock_session.execute.call_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (email) DO NOTHING" in sql
+    assert "RETURNING" in sql
+    assert stmt.compile().params["password"] != data.password  # пароль має бути хешований
+
+    assert mock_session.execute.await_count == 2
+    assert not mock_session.commit.called
+    assert not mock_session.refresh.called
+
+
+@pytest.mark.asyncio
+async def test_create_user_returns_none_on_conflict(mock_session):
+    """
+    Якщо email зайнятий між перевіркою та вставкою, повертається None замість IntegrityError.
+    """
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = None
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    data = UserCreate(email="taken@example.com", username="Taken", password="secret")
+
+    assert await create_user(mock_session, data) is None
+    assert mock_session.execute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_create_user_skips_bcrypt_for_taken_email(mock_session):
+    """
+    Для вже зайнятого email пароль не хешується і INSERT не виконується.
+    """
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = 1
+    mock_session.execute = AsyncMock(return_value=mock_result)
+    data = UserCreate(email="taken@example.com", username="Taken", password="secret")
+
+    with patch("app.crud.user.hash_password_async", AsyncMock()) as hasher:
+        assert await create_user(mock_session, data) is None
+    assert mock_session.execute.await_count == 1
+    assert not hasher.called
 
 
 # ------------------ authenticate_user ------------------ #
@@ -165,26 +206,38 @@ async def test_authenticate_user_not_found(mock_session):
 @pytest.mark.asyncio
 async def test_update_user_password(mock_session):
     """
-    Перевіряємо, що update_user_password оновлює пароль користувача.
+    Перевіряємо, що update_user_password оновлює хеш пароля одним UPDATE ... RETURNING без refresh.
     """
-    user = User(
-        id=1,
-        email="user@example.com",
-        username="user",
-        password="old_hashed_password",
-        is_verified=True
-    )
+    user = User(id=1, email="user@example.com", username="user", password="new_hash")
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = user
+    mock_session.execute.return_value = mock_result
+
+    result = await update_user_password(mock_session, "user@example.com", "new_password")
+
+    assert result is user
+    stmt = mock_session.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE users SET password=")
+    assert "WHERE users.email = " in sql
+    assert "RETURNING users.id" in sql
+    assert stmt.compile().params["password"].startswith("$2b$")  # bcrypt hash
+
+    # commit() робить викликач, refresh() не потрібен
+    mock_session.commit.assert_not_awaited()
+    mock_session.refresh.assert_not_awaited()
 
-    result = await update_user_password(mock_session, user, "new_password")
 
-    # Перевіряємо що пароль змінився (хешований)
-    assert result.password != "new_password"  # не plain text
-    assert result.password != "old_hashed_password"  # змінився
-    assert result.password.startswith("$2b$")  # bcrypt hash
+@pytest.mark.asyncio
+async def test_update_user_password_unknown_email(mock_session):
+    """
+    Перевіряємо, що для неіснуючого email повертається None.
+    """
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = None
+    mock_session.execute.return_value = mock_result
 
-    # Перевіряємо виклики сесії
-    mock_session.commit.assert_awaited_once()
-    mock_session.refresh.assert_awaited_once_with(user)
+    assert await update_user_password(mock_session, "nope@example.com", "new_password") is None
 
 
 # ------------------ get_all_users ------------------ #
@@ -231,21 +284,21 @@ async def test_get_all_users_with_pagination(mock_session):
 @pytest.mark.asyncio
 async def test_update_user_role(mock_session):
     """
-    Перевіряємо, що update_user_role змінює роль користувача.
+    Перевіряємо, що update_user_role змінює роль одним UPDATE ... RETURNING без refresh.
     """
-    user = User(
-        id=1,
-        email="user@example.com",
-        username="user",
-        password="hash",
-        role="user"
-    )
+    user = User(id=1, email="user@example.com", username="user", password="hash", role="admin")
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = user
+    mock_session.execute.return_value = mock_result
 
-    result = await update_user_role(mock_session, user, "admin")
+    result = await update_user_role(mock_session, 1, "admin")
 
     assert result.role == "admin"
-    mock_session.commit.assert_awaited_once()
-    mock_session.refresh.assert_awaited_once_with(user)
+    sql = str(mock_session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE users SET role=")
+    assert "RETURNING users.id" in sql
+    mock_session.execute.assert_awaited_once()
+    mock_session.refresh.assert_not_awaited()
 
 
 # ------------------ get_user_by_id ------------------ #
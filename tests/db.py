@@ -1,5 +1,7 @@
 import os
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.schema import CreateTable
 from app.models.base import Base
 
 POSTGRES_TEST_USER = os.getenv("POSTGRES_TEST_USER")
@@ -28,8 +30,50 @@ async def override_get_session():
         yield session
 
 
+# Розширення з міграції b7e3f91a2c64, потрібні триграмним індексам контактів
+SEARCH_EXTENSIONS = ("pg_trgm", "btree_gin")
+
+
+def _is_trigram_index(index) -> bool:
+    return "gin_trgm_ops" in index.dialect_options["postgresql"]["ops"].values()
+
+
+def _create_tables(sync_conn, trigram: bool) -> None:
+    if trigram:
+        Base.metadata.create_all(sync_conn)
+        return
+    # Сервер без contrib-розширень: схема без триграмних індексів,
+    # тести нечіткого пошуку пропускаються (див. trigram_available)
+    for table in Base.metadata.sorted_tables:
+        sync_conn.execute(CreateTable(table))
+        for index in table.indexes:
+            if not _is_trigram_index(index):
+                index.create(sync_conn)
+
+
+async def trigram_available(conn) -> bool:
+    """Чи встановлено на тестовому сервері розширення нечіткого пошуку."""
+    installed = await conn.scalar(
+        text("SELECT count(*) FROM pg_extension WHERE extname = ANY(:names)"),
+        {"names": list(SEARCH_EXTENSIONS)},
+    )
+    return installed == len(SEARCH_EXTENSIONS)
+
+
 async def init_test_db():
     """Инициализация тестовой БД - создание таблиц."""
     async with engine_test.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+
+        available = set(await conn.scalars(
+            text("SELECT name FROM pg_available_extensions WHERE name = ANY(:names)"),
+            {"names": list(SEARCH_EXTENSIONS)},
+        ))
+        for name in SEARCH_EXTENSIONS:
+            if name in available:
+                await conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {name}"))
+        await conn.run_sync(_create_tables, await trigram_available(conn))
+
+    # З'єднання прив'язані до event loop pytest; TestClient працює у власному,
+    # тому закриваємо пул, щоб він відкрив нові з'єднання у своєму loop
+    await engine_test.dispose()
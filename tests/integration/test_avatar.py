@@ -0,0 +1,109 @@
+from unittest.mock import patch
+
+
+def test_avatar_background_job_updates_profile(client, tmp_path):
+    """Фонове завантаження повертає 202, а після виконання задачі оновлює профіль (і кеш користувача)."""
+    from app.services import avatar
+    from tests.benchmarks.fake_redis import patch_redis
+    from tests.conftest import register_and_login
+    from tests.services.test_avatar import StubStorage, make_image
+
+    headers = {"Authorization": f"Bearer {register_and_login(client, email='avatar@example.com')}"}
+    other = {"Authorization": f"Bearer {register_and_login(client, email='avatar2@example.com')}"}
+
+    previous = avatar.set_storage(StubStorage(tmp_path))
+    try:
+        with patch_redis(), patch.object(avatar.settings, "avatar_staging_path", str(tmp_path / "staging")):
+            # Профіль потрапляє до кешу користувача до зміни аватара
+            assert client.get("/users/me", headers=headers).json()["avatar_url"] is None
+            response = client.post(
+                "/users/avatar",
+                params={"background": "true"},
+                files={"file": ("me.png", make_image(), "image/png")},
+                headers=headers,
+            )
+            assert response.status_code == 202
+            job_id = response.json()["id"]
+
+            # TestClient виконує фонову задачу (ретранслятор outbox) до повернення відповіді
+            job = client.get(f"/users/avatar/jobs/{job_id}", headers=headers).json()
+            assert job["status"] == "done"
+            assert job["avatar_url"].startswith("https://stub.local/avatars/")
+            assert client.get("/users/me", headers=headers).json()["avatar_url"] == job["avatar_url"]
+
+            # Чужі задачі не видно
+            assert client.get(f"/users/avatar/jobs/{job_id}", headers=other).status_code == 404
+    finally:
+        avatar.set_storage(previous)
+
+    assert list((tmp_path / "staging").iterdir()) == []
+
+
+def test_avatar_upload_invalidates_cached_profile(client, tmp_path):
+    """Після синхронного завантаження профіль із кешу вже містить новий URL."""
+    from app.services import avatar
+    from tests.benchmarks.fake_redis import patch_redis
+    from tests.conftest import register_and_login
+    from tests.services.test_avatar import StubStorage, make_image
+
+    headers = {"Authorization": f"Bearer {register_and_login(client, email='avatar5@example.com')}"}
+
+    previous = avatar.set_storage(StubStorage(tmp_path))
+    try:
+        with patch_redis():
+            assert client.get("/users/me", headers=headers).json()["avatar_url"] is None
+            response = client.post(
+                "/users/avatar", files={"file": ("me.png", make_image(), "image/png")}, headers=headers,
+            )
+            assert response.status_code == 200
+            assert client.get("/users/me", headers=headers).json()["avatar_url"] == response.json()["avatar_url"]
+    finally:
+        avatar.set_storage(previous)
+
+
+def test_avatar_upload_over_limit_is_rejected_before_storage(client, tmp_path):
+    """Файл понад ліміт отримує 413 і не потрапляє до сховища."""
+    from app.services import avatar
+    from tests.conftest import register_and_login
+    from tests.services.test_avatar import StubStorage
+
+    headers = {"Authorization": f"Bearer {register_and_login(client, email='avatar3@example.com')}"}
+
+    storage = StubStorage(tmp_path)
+    previous = avatar.set_storage(storage)
+    try:
+        with patch.object(avatar.settings, "avatar_max_bytes", 1024):
+            response = client.post(
+                "/users/avatar",
+                files={"file": ("big.png", b"x" * 64 * 1024, "image/png")},
+                headers=headers,
+            )
+    finally:
+        avatar.set_storage(previous)
+
+    assert response.status_code == 413
+    assert storage.saved == []
+
+
+def test_avatar_upload_of_oversized_image_returns_400(client, tmp_path):
+    """Невеликий файл із завеликим зображенням відхиляється з 400, а не 500."""
+    from app.services import avatar
+    from tests.conftest import register_and_login
+    from tests.services.test_avatar import StubStorage, make_image
+
+    headers = {"Authorization": f"Bearer {register_and_login(client, email='avatar4@example.com')}"}
+
+    storage = StubStorage(tmp_path)
+    previous = avatar.set_storage(storage)
+    try:
+        with patch.object(avatar.Image, "MAX_IMAGE_PIXELS", 100 * 100):
+            response = client.post(
+                "/users/avatar",
+                files={"file": ("bomb.png", make_image(size=(300, 300)), "image/png")},
+                headers=headers,
+            )
+    finally:
+        avatar.set_storage(previous)
+
+    assert response.status_code == 400
+    assert storage.saved == []
@@ -1,5 +1,11 @@
 from unittest.mock import patch, AsyncMock
 
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from tests.db import TEST_DATABASE_URL, trigram_available
+
 
 def test_contacts_endpoint_simple(client):
     """Простий тест endpoints контактів."""
@@ -14,4 +20,332 @@ def test_create_contact_simple(client):
 
     # Тест без даних - має бути валідаційна помилка
     response = client.post("/contacts/contacts/")
-    assert response.status_code in [401, 422]  # unauthorized або validation error
\ No newline at end of file
+    assert response.status_code in [401, 422]  # unauthorized або validation error
+
+def test_list_contacts_cursor_pagination(client):
+    """Контакти віддаються сторінками, курсор веде на наступну сторінку."""
+    from tests.conftest import register_and_login
+
+    token = register_and_login(client, email="pager@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for i in range(5):
+        client.post(
+            "/contacts/contacts/",
+            json={
+                "first_name": f"Name{i}",
+                "last_name": f"Last{i}",
+                "email": f"pager{i}@example.com",
+                "phone": "123",
+            },
+            headers=headers,
+        )
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/contacts/contacts/", params=params, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen.extend(c["id"] for c in page)
+
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        assert 'rel="next"' in response.headers["Link"]
+        params = {"limit": 2, "cursor": next_cursor}
+
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+    response = client.get("/contacts/contacts/", params={"cursor": "broken"}, headers=headers)
+    assert response.status_code == 400
+
+    # Ключ поза межами int4 не доходить до asyncpg
+    from app.services.pagination import encode_cursor
+    out_of_range = encode_cursor("id", 99999999999999999999, 1)
+    response = client.get("/contacts/contacts/", params={"cursor": out_of_range}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_export_contacts_streams_all_formats(client):
+    """Експорт віддає всі контакти користувача у NDJSON та CSV."""
+    import json
+    from tests.conftest import register_and_login
+
+    token = register_and_login(client, email="exporter@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for i in range(3):
+        client.post(
+            "/contacts/contacts/",
+            json={
+                "first_name": f"Name{i}",
+                "last_name": f"Last{i}",
+                "email": f"export{i}@example.com",
+                "phone": "123",
+            },
+            headers=headers,
+        )
+
+    response = client.get("/contacts/contacts/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["email"] for r in rows] == [f"export{i}@example.com" for i in range(3)]
+
+    response = client.get("/contacts/contacts/export", params={"format": "csv"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert len(response.text.splitlines()) == 4
+
+
+def test_create_contacts_bulk_reports_per_row(client):
+    """Пакетне створення: валідні рядки створюються, невалідні — у звіті."""
+    from tests.conftest import register_and_login
+
+    token = register_and_login(client, email="bulk@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    items = [
+        {"first_name": "A", "last_name": "One", "email": "a@example.com", "phone": "1"},
+        {"first_name": "B", "last_name": "Two", "email": "not-an-email", "phone": "2"},
+        {"first_name": "C", "last_name": "Three", "email": "c@example.com", "phone": "3"},
+    ]
+    response = client.post("/contacts/contacts/bulk", json=items, headers=headers)
+    assert response.status_code == 200
+
+    report = response.json()
+    assert report["created"] == 2
+    assert report["failed"] == 1
+    assert [r["index"] for r in report["results"]] == [0, 1, 2]
+    assert report["results"][1]["id"] is None
+    assert report["results"][1]["errors"][0]["loc"] == ["email"]
+
+    created_id = report["results"][2]["id"]
+    response = client.get(f"/contacts/contacts/{created_id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "c@example.com"
+
+
+def test_create_contacts_bulk_reports_too_long_fields(client):
+    """Поле довше за колонку БД — помилка рядка у звіті, а не 500 для всього запиту."""
+    from tests.conftest import register_and_login
+
+    token = register_and_login(client, email="bulk-long@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    items = [
+        {"first_name": "X" * 101, "last_name": "Long", "email": "long@example.com", "phone": "1"},
+        {"first_name": "Ok", "last_name": "Short", "email": "short@example.com", "phone": "2"},
+    ]
+    response = client.post("/contacts/contacts/bulk", json=items, headers=headers)
+    assert response.status_code == 200
+
+    report = response.json()
+    assert (report["created"], report["failed"]) == (1, 1)
+    assert report["results"][0]["errors"][0]["loc"] == ["first_name"]
+    assert report["results"][1]["id"] is not None
+
+
+def test_create_contacts_bulk_reports_rows_rejected_by_db(client):
+    """Рядок, який пройшов валідацію, але його відхилила БД (NUL у тексті), не скасовує решту."""
+    from tests.conftest import register_and_login
+
+    token = register_and_login(client, email="bulk-db@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    items = [
+        {"first_name": "A", "last_name": "One", "email": "a1@example.com", "phone": "1"},
+        {"first_name": "B", "last_name": "Two", "email": "b2@example.com", "phone": "2\u0000"},
+        {"first_name": "C", "last_name": "Three", "email": "c3@example.com", "phone": "3"},
+    ]
+    response = client.post("/contacts/contacts/bulk", json=items, headers=headers)
+    assert response.status_code == 200
+
+    report = response.json()
+    assert (report["created"], report["failed"]) == (2, 1)
+    assert report["results"][1]["errors"][0]["type"] == "database_error"
+    listed = client.get("/contacts/contacts/", headers=headers).json()
+    assert [c["email"] for c in listed] == ["a1@example.com", "c3@example.com"]
+
+
+def test_search_contacts_route(client):
+    """/search не перекривається маршрутом /{contact_id}."""
+    from tests.conftest import register_and_login
+
+    token = register_and_login(client, email="searcher@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.post(
+        "/contacts/contacts/",
+        json={"first_name": "Taras", "last_name": "Shevchenko", "email": "taras@example.com", "phone": "1"},
+        headers=headers,
+    )
+
+    response = client.get("/contacts/contacts/search", params={"last_name": "shev"}, headers=headers)
+    assert response.status_code == 200
+    assert [c["email"] for c in response.json()] == ["taras@example.com"]
+
+
+@pytest.fixture
+async def trigram():
+    """Пропускає тест, якщо на тестовому сервері немає pg_trgm/btree_gin."""
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    async with engine.connect() as conn:
+        available = await trigram_available(conn)
+    await engine.dispose()
+    if not available:
+        pytest.skip("pg_trgm/btree_gin are not installed on the test PostgreSQL server")
+
+
+def test_fuzzy_search_tolerates_typos_and_ranks_by_similarity(client, trigram):
+    """``q`` знаходить контакти з опечаткою і впорядковує їх за схожістю."""
+    from tests.conftest import register_and_login
+
+    token = register_and_login(client, email="fuzzy@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for first_name, last_name, email in [
+        ("Jonathon", "Doe", "jonathon@example.com"),
+        ("Johnathan", "Smith", "johnathan@example.com"),
+        ("Mary", "Brown", "mary@example.com"),
+    ]:
+        client.post(
+            "/contacts/contacts/",
+            json={"first_name": first_name, "last_name": last_name, "email": email, "phone": "1"},
+            headers=headers,
+        )
+
+    # Жоден контакт не містить "Jonathan" як підрядок: similarity 0.58 та 0.5
+    response = client.get("/contacts/contacts/search", params={"q": "Jonathan"}, headers=headers)
+    assert response.status_code == 200
+    assert [c["email"] for c in response.json()] == ["johnathan@example.com", "jonathon@example.com"]
+
+    # Переставлені літери в прізвищі (similarity 0.33 при порозі 0.3)
+    response = client.get("/contacts/contacts/search", params={"q": "Smiht"}, headers=headers)
+    assert [c["email"] for c in response.json()] == ["johnathan@example.com"]
+
+
+def test_birthdays_route_window(client):
+    """/birthdays повертає лише контакти з днем народження у вікні ``days``."""
+    from datetime import date, timedelta
+    from tests.conftest import register_and_login
+
+    token = register_and_login(client, email="birthdays@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    today = date.today()
+    for i, delta in enumerate((2, 20)):
+        # 2000 — високосний рік, тож replace() не впаде на 29 лютого
+        birthday = (today + timedelta(days=delta)).replace(year=2000)
+        client.post(
+            "/contacts/contacts/",
+            json={
+                "first_name": f"B{i}",
+                "last_name": "Day",
+                "email": f"bday{i}@example.com",
+                "phone": "1",
+                "birthday": birthday.isoformat(),
+            },
+            headers=headers,
+        )
+
+    response = client.get("/contacts/contacts/birthdays", headers=headers)
+    assert response.status_code == 200
+    assert [c["email"] for c in response.json()] == ["bday0@example.com"]
+
+    response = client.get("/contacts/contacts/birthdays", params={"days": 30}, headers=headers)
+    assert [c["email"] for c in response.json()] == ["bday0@example.com", "bday1@example.com"]
+
+
+def test_update_and_delete_contact_stay_within_query_budget(client):
+    """Оновлення та видалення контакту не перевищують оголошений @query_budget."""
+    from tests.conftest import register_and_login
+
+    token = register_and_login(client, email="budget@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    created = client.post(
+        "/contacts/contacts/",
+        json={"first_name": "Bud", "last_name": "Get", "email": "bud@example.com", "phone": "1"},
+        headers=headers,
+    ).json()
+
+    response = client.put(
+        f"/contacts/contacts/{created['id']}", json={"phone": "2"}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["phone"] == "2"
+
+    response = client.delete(f"/contacts/contacts/{created['id']}", headers=headers)
+    assert response.status_code == 204
+    assert client.get(f"/contacts/contacts/{created['id']}", headers=headers).status_code == 404
+
+
+def test_conditional_get_returns_304_until_contacts_change(client):
+    """ETag списку та контакту змінюються лише після запису."""
+    from tests.conftest import register_and_login
+
+    token = register_and_login(client, email="etag@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    created = client.post(
+        "/contacts/contacts/",
+        json={"first_name": "E", "last_name": "Tag", "email": "etag1@example.com", "phone": "1"},
+        headers=headers,
+    ).json()
+
+    listing = client.get("/contacts/contacts/", headers=headers)
+    list_etag = listing.headers["ETag"]
+    response = client.get("/contacts/contacts/", headers={**headers, "If-None-Match": list_etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    item = client.get(f"/contacts/contacts/{created['id']}", headers=headers)
+    item_etag = item.headers["ETag"]
+    response = client.get(
+        f"/contacts/contacts/{created['id']}", headers={**headers, "If-None-Match": item_etag}
+    )
+    assert response.status_code == 304
+
+    updated = client.put(f"/contacts/contacts/{created['id']}", json={"phone": "2"}, headers=headers)
+    assert updated.headers["ETag"] != item_etag
+    assert updated.headers["Cache-Control"] == item.headers["Cache-Control"]
+
+    response = client.get("/contacts/contacts/", headers={**headers, "If-None-Match": list_etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != list_etag
+    response = client.get(
+        f"/contacts/contacts/{created['id']}", headers={**headers, "If-None-Match": item_etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["phone"] == "2"
+    assert response.headers["ETag"] == updated.headers["ETag"]
+
+
+def test_contacts_response_cache_serves_hits_and_invalidates_on_write(client):
+    """Повторний список віддається з кешу, а після запису — оновлений."""
+    from app.services import cache
+    from tests.benchmarks.fake_redis import patch_redis
+    from tests.conftest import register_and_login
+
+    token = register_and_login(client, email="respcache@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    contact = {"first_name": "R", "last_name": "C", "email": "rc@example.com", "phone": "1"}
+
+    with patch_redis(), patch.object(cache.settings, "contacts_response_cache_enabled", True):
+        client.post("/contacts/contacts/", json=contact, headers=headers)
+
+        hits = cache.response_cache_stats["hits"]
+        first = client.get("/contacts/contacts/", headers=headers)
+        second = client.get("/contacts/contacts/", headers=headers)
+        assert cache.response_cache_stats["hits"] == hits + 1
+        assert second.json() == first.json()
+        assert second.headers["ETag"] == first.headers["ETag"]
+
+        client.post("/contacts/contacts/", json={**contact, "email": "rc2@example.com"}, headers=headers)
+        third = client.get("/contacts/contacts/", headers=headers)
+        assert len(third.json()) == len(first.json()) + 1
+        assert cache.response_cache_stats["hits"] == hits + 1
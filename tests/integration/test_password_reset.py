@@ -0,0 +1,55 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+
+def test_reset_token_cannot_be_reused(client):
+    """Токен споживається в запиті: повторне скидання тим самим токеном — 400."""
+    payload = {"email": "reset-once@example.com", "username": "reset", "password": "old"}
+    assert client.post("/auth/signup", json=payload).status_code == 201
+
+    getdel = AsyncMock(side_effect=[payload["email"], None])
+    with patch("app.services.password_reset.redis_client.getdel", getdel):
+        first = client.post("/auth/reset-password", json={"token": "t", "new_password": "new-secret"})
+        second = client.post("/auth/reset-password", json={"token": "t", "new_password": "other-secret"})
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    login = client.post("/auth/login", data={"username": payload["email"], "password": "new-secret"})
+    assert login.status_code == 200
+
+
+def test_reset_password_fails_when_token_store_is_down(client):
+    """Без Redis токен не можна спожити — пароль не змінюється."""
+    getdel = AsyncMock(side_effect=RedisConnectionError("down"))
+    with patch("app.services.password_reset.redis_client.getdel", getdel):
+        response = client.post("/auth/reset-password", json={"token": "t", "new_password": "new-secret"})
+
+    assert response.status_code == 503
+
+
+def test_busy_hash_pool_does_not_consume_token(client):
+    """503 від пулу bcrypt повертається до споживання токена."""
+    busy = AsyncMock(side_effect=HTTPException(status_code=503, detail="Server is busy, please retry later"))
+    getdel = AsyncMock(return_value="busy@example.com")
+    with patch("app.api.auth.hash_password_async", busy), \
+            patch("app.services.password_reset.redis_client.getdel", getdel):
+        response = client.post("/auth/reset-password", json={"token": "t", "new_password": "new-secret"})
+
+    assert response.status_code == 503
+    getdel.assert_not_awaited()
+
+
+def test_failed_update_restores_token(client):
+    """Якщо пароль не вдалося записати, спожитий токен повертається в Redis."""
+    getdel = AsyncMock(return_value="restore@example.com")
+    restore = AsyncMock()
+    with patch("app.services.password_reset.redis_client.getdel", getdel), \
+            patch("app.services.password_reset.redis_client.set", restore), \
+            patch("app.api.auth.update_user_password_hash", AsyncMock(side_effect=RuntimeError("db down"))):
+        with pytest.raises(RuntimeError):
+            client.post("/auth/reset-password", json={"token": "t", "new_password": "new-secret"})
+
+    restore.assert_awaited_once_with("reset:t", "restore@example.com", ex=3600, nx=True)
@@ -0,0 +1,22 @@
+from unittest.mock import patch
+
+
+def test_rate_limit_is_per_user_behind_shared_ip(client):
+    """Користувачі за одним IP мають окремі ліміти; перевищення дає 429 з Retry-After."""
+    from app.services.limiter import limiter
+    from tests.conftest import register_and_login
+
+    first = {"Authorization": f"Bearer {register_and_login(client, email='rl1@example.com')}"}
+    second = {"Authorization": f"Bearer {register_and_login(client, email='rl2@example.com')}"}
+
+    limiter.reset()
+    with patch.object(limiter, "enabled", True):
+        for _ in range(5):
+            assert client.get("/users/me", headers=first).status_code == 200
+
+        response = client.get("/users/me", headers=first)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+        assert client.get("/users/me", headers=second).status_code == 200
+    limiter.reset()
@@ -0,0 +1,46 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.crud.user import create_user
+from app.models.user import User
+from app.schemas.user import UserCreate
+from tests.db import TEST_DATABASE_URL
+
+
+@pytest.mark.asyncio
+async def test_concurrent_signups_for_same_email_create_one_user():
+    """Паралельні реєстрації з одним email: один користувач, решта — None без IntegrityError."""
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    data = UserCreate(email="race@example.com", username="race", password="secret")
+
+    async def signup():
+        async with sessions() as session:
+            user = await create_user(session, data)
+            await session.commit()
+            return user
+
+    results = await asyncio.gather(*(signup() for _ in range(10)))
+
+    assert sum(user is not None for user in results) == 1
+    async with sessions() as session:
+        count = await session.scalar(select(func.count()).where(User.email == data.email))
+    assert count == 1
+
+
+def test_duplicate_signup_returns_409(client):
+    """Повторна реєстрація дає 409 і не запускає bcrypt."""
+    payload = {"email": "dup@example.com", "username": "dup", "password": "secret"}
+
+    first = client.post("/auth/signup", json=payload)
+    assert first.status_code == 201
+    assert first.json()["is_verified"] is True
+
+    with patch("app.crud.user.hash_password_async", AsyncMock()) as hasher:
+        assert client.post("/auth/signup", json=payload).status_code == 409
+    assert not hasher.called
@@ -0,0 +1,86 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.crud.contact import create_contact, delete_contact, update_contact
+from app.crud.user import create_user, update_user_password, update_user_role, verify_password
+from app.models.contact import Contact
+from app.models.user import User
+from app.schemas.contact import ContactCreate, ContactUpdate
+from app.schemas.user import UserCreate
+from app.services.query_budget import collect_queries
+from tests.db import TEST_DATABASE_URL
+
+
+@pytest.fixture
+def sessions():
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def _contacts_version(sessions, user_id: int) -> int:
+    async with sessions() as session:
+        return await session.scalar(select(User.contacts_version).where(User.id == user_id))
+
+
+@pytest.mark.asyncio
+async def test_contact_writes_issue_one_statement(sessions):
+    """Створення, оновлення та видалення контакту — один запит плюс commit, версія списку росте разом із ним."""
+    async with sessions() as session:
+        owner = await create_user(session, UserCreate(email="writes@example.com", username="w", password="x"))
+        other = await create_user(session, UserCreate(email="other-writes@example.com", username="o", password="x"))
+        await session.commit()
+    version = await _contacts_version(sessions, owner.id)
+
+    async with sessions() as session:
+        with collect_queries() as log:
+            created = await create_contact(
+                session,
+                ContactCreate(first_name="One", last_name="Query", email="one@example.com", phone="1"),
+                user_id=owner.id,
+            )
+        assert log.count == 1
+        assert (created.first_name, created.version) == ("One", 1)
+        assert await _contacts_version(sessions, owner.id) == version + 1
+
+        with collect_queries() as log:
+            updated = await update_contact(session, created.id, owner.id, ContactUpdate(phone="2"))
+        assert log.count == 1
+        assert (updated.phone, updated.last_name, updated.version) == ("2", "Query", 2)
+        assert await _contacts_version(sessions, owner.id) == version + 2
+
+        # Чужий контакт не змінюється, версія списку не росте
+        assert await update_contact(session, created.id, other.id, ContactUpdate(phone="3")) is None
+        assert await delete_contact(session, created.id, other.id) is False
+        assert await _contacts_version(sessions, owner.id) == version + 2
+        assert await _contacts_version(sessions, other.id) == 0
+
+        with collect_queries() as log:
+            assert await delete_contact(session, created.id, owner.id) is True
+        assert log.count == 1
+        assert await _contacts_version(sessions, owner.id) == version + 3
+        assert await session.get(Contact, created.id) is None
+
+
+@pytest.mark.asyncio
+async def test_user_writes_issue_one_statement(sessions):
+    """Зміна пароля та ролі — один UPDATE ... RETURNING без refresh."""
+    async with sessions() as session:
+        user = await create_user(session, UserCreate(email="pw@example.com", username="pw", password="old"))
+        await session.commit()
+
+        with collect_queries() as log:
+            updated = await update_user_password(session, "pw@example.com", "new")
+            await session.commit()
+        assert log.count == 1
+        assert verify_password("new", updated.password)
+
+        with collect_queries() as log:
+            updated = await update_user_role(session, user.id, "admin")
+            await session.commit()
+        assert log.count == 1
+        assert updated.role == "admin"
+
+        assert await update_user_password(session, "missing@example.com", "new") is None
+        assert await update_user_role(session, 10 ** 9, "admin") is None
@@ -73,3 +73,35 @@ async def test_get_current_user_not_found():
         with patch("app.services.auth.get_user_by_email", AsyncMock(return_value=None)):
             with pytest.raises(Exception):
                 await get_current_user("fake.jwt.token")
+
+
+def test_decode_token_cached_until_exp():
+    """Повторне пред'явлення токена не викликає jwt.decode."""
+    from app.services import auth
+
+    token = create_access_token({"sub": "cached@example.com"}, expires_delta=timedelta(minutes=5))
+    auth.token_cache.clear()
+
+    with patch("app.services.auth.jwt.decode", wraps=auth.jwt.decode) as mock_decode:
+        first = auth.decode_token(token)
+        second = auth.decode_token(token)
+
+    assert first.email == second.email == "cached@example.com"
+    assert mock_decode.call_count == 1
+
+    # Запис живе не довше, ніж сам токен
+    _, expires_at = next(iter(auth.token_cache._data.values()))
+    import time
+    assert expires_at - time.monotonic() <= 5 * 60
+
+
+def test_decode_token_invalid_not_cached():
+    """Недійсний токен не потрапляє в кеш."""
+    from jose import JWTError
+    from app.services import auth
+
+    auth.token_cache.clear()
+    with pytest.raises(JWTError):
+        auth.decode_token("invalid.token.value")
+
+    assert len(auth.token_cache) == 0
@@ -1,21 +1,211 @@
+import io
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import pytest
-from unittest.mock import patch, MagicMock
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+
+from app.services import avatar
+from app.services.avatar import (
+    create_avatar_job,
+    get_avatar_job,
+    read_upload,
+    render_variants,
+    run_avatar_job,
+    set_storage,
+    upload_avatar,
+)
+from app.services.storage import CloudinaryStorage, LocalStorage
+from tests.benchmarks.fake_redis import FakeRedis
+
+
+class StubStorage(LocalStorage):
+    """Локальна заміна Cloudinary, що рахує збереження."""
+
+    def __init__(self, root, fail: bool = False):
+        super().__init__(root, "https://stub.local/avatars")
+        self.fail = fail
+        self.saved: list[str] = []
+
+    def save(self, key, data):
+        if self.fail:
+            raise RuntimeError("storage is down")
+        self.saved.append(key)
+        return super().save(key, data)
+
+
+@pytest.fixture
+def url_index():
+    """Окремий індекс «хеш → URL» для кожного тесту."""
+    fake = FakeRedis()
+    with patch.object(avatar, "redis_client", fake):
+        yield fake
 
-from app.services.avatar import upload_avatar
+
+@pytest.fixture
+def stub_storage(tmp_path, url_index):
+    stub = StubStorage(tmp_path)
+    previous = set_storage(stub)
+    yield stub
+    set_storage(previous)
+
+
+def make_image(size=(800, 600), color=(200, 30, 30)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_cloudinary_storage_save_returns_secure_url(mock_cloudinary_upload):
+    """
+    Перевіряємо, що сховище Cloudinary повертає URL завантаженого файлу.
+    """
+    url = CloudinaryStorage().save("abc_256", io.BytesIO(b"fake-bytes"))
+
+    assert url == "https://example.com/avatar.png"
+    assert mock_cloudinary_upload.call_args.kwargs["public_id"] == "abc_256"
+    # Наявний public_id не перезаписується — Cloudinary поверне існуючий ресурс
+    assert mock_cloudinary_upload.call_args.kwargs["overwrite"] is False
+
+
+def test_cloudinary_storage_deduplicates_without_admin_api(mock_cloudinary_upload):
+    """Наявність перевіряється за локальним індексом, без cloudinary.api.resource."""
+    storage = CloudinaryStorage(index_size=2)
+
+    with patch("cloudinary.api.resource") as resource:
+        assert storage.url_for("a_256") is None
+        storage.save("a_256", io.BytesIO(b"a"))
+        assert storage.url_for("a_256") == "https://example.com/avatar.png"
+
+        storage.save("b_256", io.BytesIO(b"b"))
+        storage.save("c_256", io.BytesIO(b"c"))
+        # Індекс обмежений: найдавніший ключ витіснено
+        assert storage.url_for("a_256") is None
+
+    resource.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_upload_avatar_success(mock_cloudinary_upload):
+async def test_upload_avatar_success(stub_storage):
     """
-    Перевіряємо, що upload_avatar повертає URL.
+    Варіанти зберігаються під ключами з хешем вмісту; URL — найбільшого.
     """
+    url = await upload_avatar(UploadFile(io.BytesIO(make_image())))
 
-    fake_file = MagicMock()
-    fake_file.file = b"fake-bytes"
+    assert url.startswith("https://stub.local/avatars/")
+    assert url.endswith("_256")
+    # Основний варіант зберігається останнім
+    assert [key.rsplit("_", 1)[1] for key in stub_storage.saved] == ["64", "128", "256"]
 
-    url = await upload_avatar(fake_file)
 
-    assert isinstance(url, str)
-    assert url.startswith("https://")
-    assert url == "https://example.com/avatar.png"
-    assert mock_cloudinary_upload.called
+@pytest.mark.asyncio
+async def test_upload_avatar_deduplicates_by_content(stub_storage):
+    image = make_image()
+    first = await upload_avatar(UploadFile(io.BytesIO(image)))
+    second = await upload_avatar(UploadFile(io.BytesIO(image)))
+
+    assert first == second
+    assert len(stub_storage.saved) == 3
+
+
+@pytest.mark.asyncio
+async def test_url_index_is_shared_between_workers(tmp_path, url_index):
+    """Інший воркер (зі своїм сховищем і порожнім локальним станом) бере URL з індексу в Redis."""
+    image = make_image()
+    first_worker, second_worker = StubStorage(tmp_path / "a"), StubStorage(tmp_path / "b")
+
+    previous = set_storage(first_worker)
+    try:
+        first = await upload_avatar(UploadFile(io.BytesIO(image)))
+        set_storage(second_worker)
+        second = await upload_avatar(UploadFile(io.BytesIO(image)))
+    finally:
+        set_storage(previous)
+
+    assert first == second
+    assert len(first_worker.saved) == 3
+    assert second_worker.saved == []
+
+
+@pytest.mark.asyncio
+async def test_upload_avatar_without_url_index(stub_storage):
+    """Недоступний Redis не заважає завантаженню — дедуплікація переходить до сховища."""
+    broken = MagicMock()
+    broken.get = AsyncMock(side_effect=ConnectionError("redis down"))
+    broken.set = AsyncMock(side_effect=ConnectionError("redis down"))
+    with patch.object(avatar, "redis_client", broken):
+        url = await upload_avatar(UploadFile(io.BytesIO(make_image())))
+
+    assert url.endswith("_256")
+    assert len(stub_storage.saved) == 3
+
+
+@pytest.mark.asyncio
+async def test_read_upload_rejects_large_files():
+    with patch.object(avatar.settings, "avatar_max_bytes", 100_000):
+        with pytest.raises(HTTPException) as error:
+            await read_upload(UploadFile(io.BytesIO(b"x" * 100_001)))
+
+    assert error.value.status_code == 413
+
+
+def test_render_variants_resizes_to_configured_sizes():
+    variants = render_variants(io.BytesIO(make_image()))
+
+    assert list(variants) == ["256", "128", "64"]
+    for name, data in variants.items():
+        with Image.open(data) as image:
+            assert image.format == "WEBP"
+            assert image.size == (int(name), int(name))
+
+
+def test_render_variants_rejects_non_images():
+    with pytest.raises(ValueError):
+        render_variants(io.BytesIO(b"not an image"))
+
+
+def test_render_variants_rejects_images_over_pixel_limit():
+    """Розмір перевіряється за заголовком, до декодування пікселів."""
+    image = make_image(size=(300, 300))
+    with patch.object(avatar.settings, "avatar_max_pixels", 200 * 200):
+        with pytest.raises(ValueError, match="too large"):
+            render_variants(io.BytesIO(image))
+
+
+def test_render_variants_maps_decompression_bombs_to_value_error():
+    """Понад подвоєний ліміт Pillow сам відмовляє відкривати файл — це теж ValueError."""
+    image = make_image(size=(300, 300))
+    with patch.object(Image, "MAX_IMAGE_PIXELS", 100 * 100):
+        with pytest.raises(ValueError, match="too large"):
+            render_variants(io.BytesIO(image))
+
+
+@pytest.mark.asyncio
+async def test_avatar_job_done(stub_storage):
+    saved = []
+
+    async def on_done(url):
+        saved.append(url)
+
+    job = await create_avatar_job(user_id=1)
+    assert (await get_avatar_job(job["id"]))["status"] == "pending"
+
+    await run_avatar_job(job, *await read_upload(UploadFile(io.BytesIO(make_image()))), on_done)
+
+    result = await get_avatar_job(job["id"])
+    assert result["status"] == "done"
+    assert result["avatar_url"] == saved[0]
+
+
+@pytest.mark.asyncio
+async def test_avatar_job_failed(tmp_path, url_index):
+    previous = set_storage(StubStorage(tmp_path, fail=True))
+    try:
+        job = await create_avatar_job(user_id=1)
+        await run_avatar_job(job, *await read_upload(UploadFile(io.BytesIO(make_image()))), on_done=None)
+    finally:
+        set_storage(previous)
+
+    result = await get_avatar_job(job["id"])
+    assert result["status"] == "failed"
+    assert result["error"] == "storage is down"
@@ -0,0 +1,257 @@
+"""
+Тести для дворівневого кешу користувачів.
+"""
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import cache
+from app.services.cache import InvalidationEpochs, LocalTTLCache
+
+
+def test_local_cache_lru_eviction():
+    """Понад max_size витісняється найдавніше використаний ключ."""
+    local = LocalTTLCache(max_size=2, ttl=60)
+    local.set("a", 1)
+    local.set("b", 2)
+    local.get("a")
+    local.set("c", 3)
+
+    assert local.get("a") == 1
+    assert local.get("b") is None
+    assert local.get("c") == 3
+
+
+def test_local_cache_ttl_expiry():
+    """Запис з минулим TTL не повертається."""
+    local = LocalTTLCache(max_size=10, ttl=60)
+    local.set("a", 1, ttl=0)
+
+    assert local.get("a") is None
+    assert len(local) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_cached_user_served_from_l1():
+    """Коли підписка активна, повторний запит обслуговується з L1 без Redis."""
+    user = {"id": 1, "email": "l1@example.com"}
+    with patch.object(cache, "_invalidation_live", True), \
+            patch.object(cache, "redis_client") as mock_redis:
+        mock_redis.get = AsyncMock(return_value=json.dumps(user))
+        cache.user_l1_cache.clear()
+
+        assert await cache.get_cached_user("l1@example.com") == user
+        assert await cache.get_cached_user("l1@example.com") == user
+
+        mock_redis.get.assert_awaited_once_with("user:l1@example.com")
+        cache.user_l1_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_cached_user_skips_l1_without_subscription():
+    """Без активної підписки L1 не використовується."""
+    with patch.object(cache, "_invalidation_live", False), \
+            patch.object(cache, "redis_client") as mock_redis:
+        mock_redis.get = AsyncMock(return_value=None)
+        cache.user_l1_cache.set("stale@example.com", {"id": 1})
+
+        assert await cache.get_cached_user("stale@example.com") is None
+        cache.user_l1_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_delete_cached_user_publishes_invalidation():
+    """Видалення очищає L1, Redis і розсилає повідомлення іншим воркерам."""
+    with patch.object(cache, "redis_client") as mock_redis:
+        mock_redis.delete = AsyncMock()
+        mock_redis.publish = AsyncMock()
+        cache.user_l1_cache.set("gone@example.com", {"id": 1})
+
+        await cache.delete_cached_user("gone@example.com")
+
+        assert cache.user_l1_cache.get("gone@example.com") is None
+        mock_redis.delete.assert_awaited_once_with("user:gone@example.com")
+        mock_redis.publish.assert_awaited_once_with(cache.USER_INVALIDATION_CHANNEL, "gone@example.com")
+
+
+@pytest.mark.asyncio
+async def test_listener_evicts_on_message():
+    """Повідомлення з каналу видаляє користувача з L1 цього воркера."""
+    received = asyncio.Event()
+
+    async def listen():
+        yield {"type": "subscribe", "data": 1}
+        cache.user_l1_cache.set("evict@example.com", {"id": 1})
+        yield {"type": "message", "data": "evict@example.com"}
+        received.set()
+        await asyncio.Event().wait()
+
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.aclose = AsyncMock()
+    pubsub.listen = listen
+
+    with patch.object(cache, "redis_client", new=MagicMock()) as mock_redis:
+        mock_redis.pubsub.return_value = pubsub
+        task = asyncio.create_task(cache.listen_for_user_invalidations())
+        await asyncio.wait_for(received.wait(), timeout=1)
+
+        assert cache.get_cache_stats()["l1_enabled"] is True
+        assert cache.user_l1_cache.get("evict@example.com") is None
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert cache.get_cache_stats()["l1_enabled"] is False
+    pubsub.aclose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_listener_logs_failure_and_disables_l1(caplog):
+    """Помилка підписки логується, L1 вимикається до повторного підключення."""
+    resubscribed = asyncio.Event()
+
+    async def listen():
+        resubscribed.set()
+        await asyncio.Event().wait()
+        yield  # pragma: no cover
+
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock(side_effect=[ConnectionError("redis down"), None])
+    pubsub.aclose = AsyncMock()
+    pubsub.listen = listen
+    cache.user_l1_cache.set("stale@example.com", {"id": 1})
+
+    with patch.object(cache, "redis_client", new=MagicMock()) as mock_redis, \
+            caplog.at_level("ERROR", logger=cache.__name__):
+        mock_redis.pubsub.return_value = pubsub
+        task = asyncio.create_task(cache.listen_for_user_invalidations(reconnect_delay=0.01))
+        await asyncio.sleep(0)
+
+        assert cache.get_cache_stats()["l1_enabled"] is False
+        assert cache.user_l1_cache.get("stale@example.com") is None
+
+        await asyncio.wait_for(resubscribed.wait(), timeout=1)
+        assert cache.get_cache_stats()["l1_enabled"] is True
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert "User invalidation listener failed" in caplog.text
+    assert "redis down" in caplog.text
+    assert pubsub.aclose.await_count == 2
+
+
+def test_invalidation_epochs_change_on_bump_and_eviction():
+    """Епоха змінюється після інвалідації ключа, навіть якщо його потім витіснено."""
+    epochs = InvalidationEpochs(max_size=2)
+    before = epochs.current("a")
+
+    epochs.bump("a")
+    assert epochs.current("a") != before
+    unchanged = epochs.current("b")
+
+    epochs.bump("c")
+    epochs.bump("a")
+    epochs.bump("d")  # "c" витіснено, нижня межа піднялася
+    assert epochs.current("c") != before
+    assert epochs.current("b") != unchanged  # консервативно: зайвий промах L1, а не застарілі дані
+
+    untouched = epochs.current("z")
+    epochs.bump_all()
+    assert epochs.current("z") != untouched
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_redis_get_keeps_stale_user_out_of_l1():
+    """Якщо delete_cached_user виконався під час GET, прочитане значення не потрапляє в L1."""
+    cache.user_l1_cache.clear()
+
+    async def slow_get(key):
+        # Інвалідація (зміна ролі) приходить, поки GET ще в дорозі
+        await cache.delete_cached_user("race@example.com")
+        return json.dumps({"id": 1, "role": "user"})
+
+    with patch.object(cache, "redis_client", new=MagicMock()) as mock_redis, \
+            patch.object(cache, "_invalidation_live", True):
+        mock_redis.get = AsyncMock(side_effect=slow_get)
+        mock_redis.delete = AsyncMock()
+        mock_redis.publish = AsyncMock()
+
+        assert await cache.get_cached_user("race@example.com") == {"id": 1, "role": "user"}
+        assert cache.user_l1_cache.get("race@example.com") is None
+
+        # Без гонки L1 заповнюється як зазвичай
+        mock_redis.get = AsyncMock(return_value=json.dumps({"id": 1, "role": "admin"}))
+        await cache.get_cached_user("race@example.com")
+        assert cache.user_l1_cache.get("race@example.com") == {"id": 1, "role": "admin"}
+
+
+@pytest.mark.asyncio
+async def test_cache_user_skips_data_invalidated_after_db_read():
+    """Користувач, інвалідований після читання з БД, не кешується ні в L1, ні в Redis."""
+    cache.user_l1_cache.clear()
+    with patch.object(cache, "redis_client", new=MagicMock()) as mock_redis, \
+            patch.object(cache, "_invalidation_live", True):
+        mock_redis.setex = AsyncMock()
+        mock_redis.delete = AsyncMock()
+        mock_redis.publish = AsyncMock()
+
+        epoch = cache.user_cache_epoch("db@example.com")
+        await cache.delete_cached_user("db@example.com")
+        await cache.cache_user("db@example.com", {"id": 1}, epoch=epoch)
+
+        assert cache.user_l1_cache.get("db@example.com") is None
+        mock_redis.setex.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_response_cache_invalidated_by_generation_bump():
+    """Після збільшення покоління власника збережена відповідь більше не читається."""
+    from fastapi import Response
+    from tests.benchmarks.fake_redis import FakeRedis
+
+    fake = FakeRedis()
+    with patch.object(cache, "redis_client", fake), \
+            patch.object(cache.settings, "contacts_response_cache_enabled", True):
+        key, cached = await cache.get_cached_response(1, "list", {"limit": 10})
+        assert cached is None
+
+        await cache.cache_response(
+            key, Response(content=b'[{"id":1}]', media_type="application/json", headers={"ETag": 'W/"v1"'})
+        )
+        _, cached = await cache.get_cached_response(1, "list", {"limit": 10})
+        assert cached.body == b'[{"id":1}]'
+        assert cached.headers["etag"] == 'W/"v1"'
+
+        # Інший власник чи інші параметри — інший ключ
+        assert (await cache.get_cached_response(2, "list", {"limit": 10}))[1] is None
+        assert (await cache.get_cached_response(1, "list", {"limit": 20}))[1] is None
+
+        await cache.bump_contacts_generation(1)
+        assert (await cache.get_cached_response(1, "list", {"limit": 10}))[1] is None
+
+
+@pytest.mark.asyncio
+async def test_response_cache_skips_large_bodies_and_disabled_mode():
+    """Завеликі відповіді не кешуються; вимкнений кеш не звертається до Redis."""
+    from fastapi import Response
+    from tests.benchmarks.fake_redis import FakeRedis
+
+    fake = FakeRedis()
+    with patch.object(cache, "redis_client", fake), \
+            patch.object(cache.settings, "contacts_response_cache_enabled", True), \
+            patch.object(cache.settings, "contacts_response_cache_max_bytes", 4):
+        key, _ = await cache.get_cached_response(1, "search", {"q": "x"})
+        await cache.cache_response(key, Response(content=b"[1,2,3]"))
+        assert (await cache.get_cached_response(1, "search", {"q": "x"}))[1] is None
+
+    redis = MagicMock()
+    with patch.object(cache, "redis_client", redis):
+        assert await cache.get_cached_response(1, "search", {"q": "x"}) == (None, None)
+        await cache.bump_contacts_generation(1)
+    assert not redis.method_calls
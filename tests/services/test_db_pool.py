@@ -0,0 +1,57 @@
+"""
+Тести для інструментування пулу з'єднань.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.services.db_pool import InstrumentedAsyncQueuePool, instrument_pool, get_pool_stats
+from tests.db import TEST_DATABASE_URL
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_track_checkouts_and_overflow():
+    """Метрики фіксують видачі з'єднань, overflow та вік з'єднань."""
+    engine = create_async_engine(
+        TEST_DATABASE_URL,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=1,
+    )
+    instrument_pool(engine)
+
+    try:
+        async with engine.connect() as first, engine.connect() as second:
+            await first.execute(text("SELECT 1"))
+            await second.execute(text("SELECT 1"))
+
+            stats = get_pool_stats(engine)
+            assert stats["checked_out"] == 2
+            assert stats["overflow"] == 1
+
+        await asyncio.sleep(0.01)
+        async with engine.connect() as again:
+            await again.execute(text("SELECT 1"))
+
+        stats = get_pool_stats(engine)
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 3
+        assert stats["connections_opened"] == 2
+        assert stats["checkout_wait_seconds_total"] > 0
+        assert stats["connection_age_seconds_max"] > 0
+        assert stats["connection_age_at_checkout_seconds_max"] > 0
+    finally:
+        await engine.dispose()
+
+
+def test_app_engine_is_instrumented():
+    """Двигун застосунку створено з інструментованим пулом і налаштуваннями."""
+    from app.config import settings
+    from app.database import engine
+
+    pool = engine.sync_engine.pool
+    assert isinstance(pool, InstrumentedAsyncQueuePool)
+    assert pool.size() == settings.db_pool_size
+    assert pool.metrics is not None
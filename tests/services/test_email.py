@@ -1,5 +1,11 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import aiosmtplib
 import pytest
-from app.services.email import send_verification_email
+from app.config import settings
+from app.services.email import MailOutbox, MailQueueFull, build_message, mail_outbox, send_verification_email
+from tests.smtp import LocalSMTPServer
 
 
 @pytest.mark.asyncio
@@ -17,3 +23,111 @@ async def test_send_verification_email_prints_link(capfd):
 
     assert "[DEBUG] Verification link:" in output
     assert "auth/verify?token=abc123" in output
+
+
+async def _drain(outbox: MailOutbox) -> None:
+    await asyncio.wait_for(outbox._queue.join(), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_mail_outbox_sends_batch_over_one_connection():
+    """
+    Листи з черги надсилаються пачкою через одне SMTP-з'єднання.
+    """
+    async with LocalSMTPServer() as server:
+        outbox = MailOutbox("127.0.0.1", server.port, batch_size=10)
+        outbox.start()
+        for i in range(5):
+            outbox.enqueue(build_message(f"user{i}@example.com", "Hi", "body"))
+        await _drain(outbox)
+        await outbox.stop()
+
+    assert [m["To"] for m in server.messages] == [f"user{i}@example.com" for i in range(5)]
+    assert server.connections == 1
+    assert outbox.stats()["sent"] == 5
+    assert outbox.stats()["batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_mail_outbox_retries_with_backoff():
+    async with LocalSMTPServer(fail_first=2) as server:
+        outbox = MailOutbox("127.0.0.1", server.port, max_retries=3, retry_backoff=0.01)
+        outbox.start()
+        outbox.enqueue(build_message("retry@example.com", "Hi", "body"))
+        await _drain(outbox)
+        await outbox.stop()
+
+    assert len(server.messages) == 1
+    assert outbox.stats()["retries"] == 2
+    assert outbox.stats()["failed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_mail_outbox_gives_up_after_max_retries():
+    async with LocalSMTPServer(fail_first=10) as server:
+        outbox = MailOutbox("127.0.0.1", server.port, max_retries=1, retry_backoff=0.01)
+        outbox.start()
+        outbox.enqueue(build_message("lost@example.com", "Hi", "body"))
+        await _drain(outbox)
+        await outbox.stop()
+
+    assert server.messages == []
+    assert outbox.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_mail_outbox_send_waits_for_result():
+    """send() повертається після надсилання та піднімає помилку, якщо всі спроби невдалі."""
+    async with LocalSMTPServer(fail_first=2) as server:
+        outbox = MailOutbox("127.0.0.1", server.port, max_retries=1, retry_backoff=0.01)
+        outbox.start()
+        with pytest.raises(aiosmtplib.SMTPException):
+            await outbox.send(build_message("lost@example.com", "Hi", "body"))
+        await outbox.send(build_message("sent@example.com", "Hi", "body"))
+        await outbox.stop()
+
+    assert [m["To"] for m in server.messages] == ["sent@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_mail_outbox_stop_fails_pending_senders():
+    outbox = MailOutbox("127.0.0.1", 25)
+    outbox._queue = asyncio.Queue()
+    outbox._worker = asyncio.create_task(asyncio.sleep(3600))
+    pending = asyncio.create_task(outbox.send(build_message("a@example.com", "Hi", "body")))
+    await asyncio.sleep(0)
+
+    await outbox.stop(timeout=0.01)
+
+    with pytest.raises(MailQueueFull):
+        await pending
+
+
+def test_mail_outbox_rejects_when_full():
+    outbox = MailOutbox("127.0.0.1", 25, max_queue=1)
+    outbox._queue = asyncio.Queue(maxsize=1)
+
+    outbox.enqueue(build_message("a@example.com", "Hi", "body"))
+    with pytest.raises(MailQueueFull):
+        outbox.enqueue(build_message("b@example.com", "Hi", "body"))
+    assert outbox.stats()["queued"] == 1
+    assert outbox.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_send_verification_email_raises_when_outbox_not_running():
+    """Лист не губиться мовчки: викликач дізнається, що його не прийнято."""
+    with patch.object(settings, "mail_delivery_enabled", True):
+        with pytest.raises(MailQueueFull):
+            await send_verification_email("user@example.com", "abc123")
+
+
+@pytest.mark.asyncio
+async def test_send_verification_email_waits_for_delivery_when_enabled():
+    with patch.object(settings, "mail_delivery_enabled", True), \
+            patch.object(mail_outbox, "send", AsyncMock()) as send:
+        await send_verification_email("user@example.com", "abc123")
+
+    message = send.await_args.args[0]
+    assert message["To"] == "user@example.com"
+    assert "auth/verify?token=abc123" in message.get_content()
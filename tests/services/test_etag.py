@@ -0,0 +1,31 @@
+"""
+Тести для умовних GET-запитів.
+"""
+from app.services.etag import etag_matches, make_etag, not_modified
+
+
+def test_make_etag_is_weak():
+    """ETag будується як слабкий з частин."""
+    assert make_etag("contacts", 1, 5) == 'W/"contacts-1-5"'
+
+
+def test_etag_matches_weak_comparison_and_lists():
+    """Слабке порівняння, списки тегів та «*»."""
+    etag = make_etag("contact", 3, 2)
+
+    assert etag_matches(etag, etag)
+    assert etag_matches('"contact-3-2"', etag)
+    assert etag_matches('W/"other", W/"contact-3-2"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('W/"contact-3-1"', etag)
+
+
+def test_not_modified_has_no_body():
+    """304 без тіла, з ETag та Cache-Control."""
+    response = not_modified('W/"x"')
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["ETag"] == 'W/"x"'
+    assert response.headers["Cache-Control"] == "private, no-cache"
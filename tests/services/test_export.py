@@ -0,0 +1,40 @@
+"""
+Тести для форматування потокового експорту контактів.
+"""
+import json
+
+import pytest
+
+from app.models.contact import Contact
+from app.services.export import csv_chunks, ndjson_chunks
+
+
+async def _batches():
+    yield [
+        Contact(id=1, first_name="John", last_name="Doe", email="jd@example.com", phone="1"),
+        Contact(id=2, first_name="Jane", last_name="Roe", email="jr@example.com", phone="2"),
+    ]
+    yield [Contact(id=3, first_name="Bob", last_name="Poe", email="bp@example.com", phone="3")]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_chunks_one_chunk_per_batch():
+    """Кожна пачка → один фрагмент, кожен контакт → окремий JSON-рядок."""
+    chunks = [chunk async for chunk in ndjson_chunks(_batches())]
+
+    assert len(chunks) == 2
+    rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+    assert [r["id"] for r in rows] == [1, 2, 3]
+    assert rows[0]["email"] == "jd@example.com"
+
+
+@pytest.mark.asyncio
+async def test_csv_chunks_header_and_rows():
+    """Спочатку заголовок, далі по фрагменту на пачку."""
+    chunks = [chunk async for chunk in csv_chunks(_batches())]
+
+    assert len(chunks) == 3
+    lines = "".join(chunks).splitlines()
+    assert lines[0].startswith("first_name,last_name,email")
+    assert len(lines) == 4
+    assert lines[3].startswith("Bob,Poe,bp@example.com")
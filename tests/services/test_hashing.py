@@ -0,0 +1,45 @@
+"""
+Тести для обмеженого пулу хешування паролів.
+"""
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.hashing import BoundedExecutor
+
+
+@pytest.mark.asyncio
+async def test_bounded_executor_runs_off_loop():
+    """Функція виконується в окремому потоці та повертає результат."""
+    pool = BoundedExecutor(workers=1, max_queue=0, name="test")
+
+    thread_name = await pool.run(lambda: threading.current_thread().name)
+
+    assert thread_name.startswith("test")
+    assert pool.stats()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_bounded_executor_sheds_load_with_503():
+    """Коли потоки зайняті й черга повна — одразу 503 з Retry-After."""
+    pool = BoundedExecutor(workers=1, max_queue=1, name="test")
+    release = threading.Event()
+
+    running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    assert pool.stats()["in_flight"] == 1
+    assert pool.stats()["queued"] == 1
+
+    with pytest.raises(HTTPException) as exc:
+        await pool.run(release.wait)
+
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == "1"
+    assert pool.stats()["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(*running)
+    assert pool.stats()["queued"] == 0
@@ -1,13 +1,33 @@
-from slowapi.util import get_remote_address
-from app.services.limiter import limiter
+from starlette.requests import Request
+
+from app.services.auth import create_access_token
+from app.services.limiter import limiter, rate_limit_key
+
+
+def _request(headers: dict[str, str] | None = None) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": ("10.0.0.1", 1234),
+    })
 
 
 def test_limiter_is_configured():
     """
-    Перевіряємо, що лімітер створено і використовує _key_func (внутрішнє поле SlowAPI).
+    Перевіряємо, що лімітер створено з ключем за користувачем/IP і стратегією moving-window.
     """
     assert limiter is not None
     # SlowAPI зберігає key_func у приватному полі _key_func
-    assert callable(limiter._key_func)
-    assert limiter._key_func == get_remote_address
+    assert limiter._key_func == rate_limit_key
+    assert limiter._strategy == "moving-window"
+
+
+def test_rate_limit_key_prefers_jwt_user():
+    """Запити з дійсним JWT рахуються за користувачем, решта — за IP."""
+    token = create_access_token({"sub": "limited@example.com"})
 
+    assert rate_limit_key(_request({"Authorization": f"Bearer {token}"})) == "user:limited@example.com"
+    assert rate_limit_key(_request({"Authorization": "Bearer broken"})) == "ip:10.0.0.1"
+    assert rate_limit_key(_request()) == "ip:10.0.0.1"
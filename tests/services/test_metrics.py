@@ -0,0 +1,111 @@
+"""
+Тести для метрик у форматі Prometheus.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.services.metrics import (
+    Counter,
+    Histogram,
+    MetricsMiddleware,
+    Registry,
+    RequestDbStats,
+    http_request_duration,
+    http_requests_total,
+    install_sql_hooks,
+    request_db_stats,
+)
+from tests.db import TEST_DATABASE_URL
+
+
+def test_registry_renders_counters_histograms_and_collectors():
+    """Реєстр віддає лічильники, кумулятивні бакети та значення колбеків з їхнім типом."""
+    registry = Registry()
+    counter = registry.register(Counter("demo_total", "Demo.", ("kind",)))
+    histogram = registry.register(Histogram("demo_seconds", "Demo.", buckets=(0.1, 1.0)))
+    registry.register_collector(
+        "demo_pool", lambda: {"size": 5, "live": True, "name": "x", "completed": 7}, counters=("completed",),
+    )
+
+    counter.inc('a"b')
+    counter.inc('a"b', amount=2)
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    body = registry.render()
+    assert 'demo_total{kind="a\\"b"} 3' in body
+    assert 'demo_seconds_bucket{le="0.1"} 1' in body
+    assert 'demo_seconds_bucket{le="1.0"} 2' in body
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in body
+    assert "demo_seconds_count 3" in body
+    assert "demo_pool_size 5" in body
+    assert "# TYPE demo_pool_size gauge" in body
+    assert "# TYPE demo_pool_completed counter" in body
+    assert "demo_pool_completed 7" in body
+    assert "demo_pool_live 1" in body
+    assert "demo_pool_name" not in body
+
+
+def test_middleware_labels_by_route_template():
+    """Middleware використовує шаблон маршруту, а не конкретний шлях."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"id": item_id}
+
+    before = http_requests_total.value("GET", "/items/{item_id}", "200")
+    with TestClient(app) as client:
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/missing")
+
+    assert http_requests_total.value("GET", "/items/{item_id}", "200") == before + 2
+    assert http_requests_total.value("GET", "unmatched", "404") >= 1
+    assert http_request_duration.count("GET", "/items/{item_id}") >= 2
+
+
+@pytest.mark.asyncio
+async def test_sql_hooks_count_queries_per_request():
+    """Хуки SQLAlchemy рахують запити в межах поточного контексту."""
+    install_sql_hooks()
+    engine = create_async_engine(TEST_DATABASE_URL)
+    stats = RequestDbStats()
+    token = request_db_stats.set(stats)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+    finally:
+        request_db_stats.reset(token)
+        await engine.dispose()
+
+    assert stats.queries == 2
+    assert stats.seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_sql_hooks_survive_failed_statements():
+    """Запит, що впав, не лишає відміток часу на з'єднанні й не зсуває наступні виміри."""
+    install_sql_hooks()
+    engine = create_async_engine(TEST_DATABASE_URL)
+    stats = RequestDbStats()
+    token = request_db_stats.set(stats)
+    try:
+        async with engine.connect() as conn:
+            with pytest.raises(ProgrammingError):
+                await conn.execute(text("SELECT * FROM missing_metrics_table"))
+            await conn.rollback()
+            await conn.execute(text("SELECT 1"))
+            assert "query_started_at" not in conn.sync_connection.info
+    finally:
+        request_db_stats.reset(token)
+        await engine.dispose()
+
+    assert stats.queries == 1
@@ -0,0 +1,178 @@
+"""
+Тести транзакційного outbox.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.models.outbox import OutboxEvent
+from app.services import outbox
+from app.services.outbox import OutboxRelay, add_outbox_event
+from tests.db import TEST_DATABASE_URL
+
+
+@pytest.fixture
+def sessions():
+    # Без пулу: з'єднання не переходять між event loop тестів
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+@pytest.fixture
+def handled():
+    """Тестовий тип подій, що запам'ятовує виконані payload."""
+    calls = []
+
+    async def record(session, payload):
+        if payload.get("fail"):
+            raise RuntimeError("boom")
+        await asyncio.sleep(0.01)
+        calls.append(payload["n"])
+
+    with patch.dict(outbox.OUTBOX_HANDLERS, {"test.record": record}):
+        yield calls
+
+
+async def _add(factory, payloads):
+    async with factory() as session:
+        await session.execute(delete(OutboxEvent))
+        for payload in payloads:
+            add_outbox_event(session, "test.record", payload)
+        await session.commit()
+
+
+async def _pending(factory):
+    async with factory() as session:
+        return (await session.execute(select(OutboxEvent))).scalars().all()
+
+
+def test_add_outbox_event_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        add_outbox_event(None, "unknown.kind", {})
+
+
+@pytest.mark.asyncio
+async def test_event_is_written_only_with_commit(sessions, handled):
+    """Подія з відкоченої транзакції не з'являється в outbox."""
+    await _add(sessions, [])
+    async with sessions() as session:
+        add_outbox_event(session, "test.record", {"n": 1})
+        await session.flush()
+        await session.rollback()
+
+    assert await _pending(sessions) == []
+
+
+@pytest.mark.asyncio
+async def test_dispatch_deletes_done_and_backs_off_failed(sessions, handled):
+    await _add(sessions, [{"n": 1}, {"n": 2, "fail": True}, {"n": 3}])
+    relay = OutboxRelay(batch_size=10, max_attempts=3, retry_backoff=60, poll_interval=1)
+
+    async with sessions() as session:
+        assert await relay.dispatch(session) == 3
+
+    assert handled == [1, 3]
+    [failed] = await _pending(sessions)
+    assert failed.attempts == 1
+    assert failed.last_error == "boom"
+
+    # Подія відкладена на retry_backoff * 2 секунд — наступна пачка її не бере
+    assert failed.available_at > datetime.now(timezone.utc) + timedelta(seconds=60)
+    async with sessions() as session:
+        assert await relay.dispatch(session) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_relays_do_not_dispatch_same_event(sessions, handled):
+    """FOR UPDATE SKIP LOCKED: паралельні ретранслятори ділять події без повторів."""
+    await _add(sessions, [{"n": n} for n in range(20)])
+    relay = OutboxRelay(batch_size=5, max_attempts=3, retry_backoff=1, poll_interval=1)
+
+    async def drain():
+        while True:
+            async with sessions() as session:
+                if not await relay.dispatch(session):
+                    return
+
+    await asyncio.gather(drain(), drain(), drain())
+
+    assert sorted(handled) == list(range(20))
+    assert await _pending(sessions) == []
+
+
+@pytest.mark.asyncio
+async def test_side_effects_run_on_a_leased_batch_without_row_locks(sessions):
+    """Обробник виконується після commit оренди: рядок не заблоковано, інші ретранслятори його не беруть."""
+    relay = OutboxRelay(batch_size=10, max_attempts=3, retry_backoff=1, poll_interval=1, lease_seconds=600)
+    seen = {}
+
+    async def inspect(session, payload):
+        async with sessions() as other:
+            # NOWAIT впав би, якби ретранслятор тримав блокування рядка
+            row = (await other.execute(select(OutboxEvent).with_for_update(nowait=True))).scalar_one()
+            seen["attempts"] = row.attempts
+            seen["leased_until"] = row.available_at
+            seen["claimed_again"] = await relay.dispatch(other)
+
+    with patch.dict(outbox.OUTBOX_HANDLERS, {"test.record": inspect}):
+        await _add(sessions, [{"n": 1}])
+        async with sessions() as session:
+            assert await relay.dispatch(session) == 1
+
+    assert seen["attempts"] == 1
+    assert seen["leased_until"] > datetime.now(timezone.utc) + timedelta(seconds=500)
+    assert seen["claimed_again"] == 0
+    assert await _pending(sessions) == []
+
+
+@pytest.mark.asyncio
+async def test_undelivered_mail_goes_back_to_backoff(sessions):
+    """Лист, не прийнятий чергою, не видаляється з outbox."""
+    async with sessions() as session:
+        await session.execute(delete(OutboxEvent))
+        add_outbox_event(session, "email.verification", {"email": "u@example.com", "token": "t"})
+        await session.commit()
+    relay = OutboxRelay(batch_size=10, max_attempts=3, retry_backoff=60, poll_interval=1)
+
+    with patch.object(outbox.settings, "mail_delivery_enabled", True):
+        async with sessions() as session:
+            assert await relay.dispatch(session) == 1
+
+    [event] = await _pending(sessions)
+    assert event.attempts == 1
+    assert event.last_error == "Mail outbox is not running"
+
+
+@pytest.mark.asyncio
+async def test_mail_events_are_sent_concurrently(sessions):
+    """Листи пачки віддаються відправнику одночасно; збій одного не затримує інші."""
+    async with sessions() as session:
+        await session.execute(delete(OutboxEvent))
+        for n in range(3):
+            add_outbox_event(session, "email.verification", {"email": f"u{n}@example.com", "token": "t"})
+        await session.commit()
+    relay = OutboxRelay(batch_size=10, max_attempts=3, retry_backoff=60, poll_interval=1)
+    started = []
+    all_started = asyncio.Event()
+
+    async def send(email, token):
+        started.append(email)
+        if len(started) == 3:
+            all_started.set()
+        # Послідовний ретранслятор ніколи не дочекався б інших листів
+        await asyncio.wait_for(all_started.wait(), timeout=1)
+        if email == "u1@example.com":
+            raise RuntimeError("SMTP down")
+
+    with patch.object(outbox, "send_verification_email", AsyncMock(side_effect=send)):
+        async with sessions() as session:
+            assert await relay.dispatch(session) == 3
+
+    [event] = await _pending(sessions)
+    assert event.payload["email"] == "u1@example.com"
+    assert event.last_error == "SMTP down"
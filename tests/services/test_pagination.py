@@ -0,0 +1,64 @@
+"""
+Тести для курсорної пагінації.
+"""
+import pytest
+from fastapi import HTTPException
+
+from app.services.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_roundtrip():
+    """Курсор декодується у ті ж значення, з яких був створений."""
+    cursor = encode_cursor("last_name", "Шевченко", 42)
+
+    assert decode_cursor(cursor, "last_name") == ("Шевченко", 42)
+
+
+def test_cursor_is_url_safe():
+    """Курсор можна передавати у query string без екранування."""
+    cursor = encode_cursor("id", 10**9, 10**9)
+
+    assert "=" not in cursor
+    assert "+" not in cursor
+    assert "/" not in cursor
+
+
+def test_decode_cursor_garbage():
+    """Пошкоджений курсор → HTTPException 400."""
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor("not-a-cursor", "id")
+
+    assert exc.value.status_code == 400
+
+
+def test_decode_cursor_sort_mismatch():
+    """Курсор для іншого сортування → HTTPException 400."""
+    cursor = encode_cursor("last_name", "Doe", 1)
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, "id")
+
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "sort, key, item_id",
+    [
+        ("last_name", 5, 1),
+        ("id", "Doe", 1),
+        ("id", 5, "1"),
+        ("id", True, 1),
+        ("unknown", 5, 1),
+        ("id", 2 ** 31, 1),
+        ("id", -2 ** 31 - 1, 1),
+        ("id", 5, 99999999999999999999),
+        ("last_name", "Doe", 2 ** 31),
+        ("last_name", "Do\x00e", 1),
+    ],
+)
+def test_decode_cursor_rejects_key_of_wrong_type(sort, key, item_id):
+    """Ключ іншого типу, ніж колонка сортування, або поза її межами — 400, а не помилка БД."""
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(encode_cursor(sort, key, item_id), sort)
+
+    assert error.value.status_code == 400
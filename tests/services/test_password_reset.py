@@ -3,10 +3,14 @@
 """
 import pytest
 from unittest.mock import AsyncMock, patch
+from redis.exceptions import ConnectionError as RedisConnectionError
+
 from app.services.password_reset import (
+    consume_reset_token,
     create_reset_token,
     verify_reset_token,
     delete_reset_token,
+    restore_reset_token,
     send_password_reset_email
 )
 
@@ -61,10 +65,43 @@ async def test_delete_reset_token():
 @pytest.mark.asyncio
 async def test_send_password_reset_email():
     """Тест надсилання email для скидання пароля."""
-    with patch('app.services.password_reset.send_verification_email') as mock_send:
-        mock_send.return_value = AsyncMock()
-
+    with patch('app.services.password_reset.send_reset_email', AsyncMock()) as mock_send:
         await send_password_reset_email("test@example.com", "reset_token")
 
-        # Перевіряємо що функція викликалась (хоча б один раз)
-        assert mock_send.called
\ No newline at end of file
+        # Лист скидання пароля, а не верифікації
+        mock_send.assert_awaited_once_with("test@example.com", "reset_token")
+
+@pytest.mark.asyncio
+async def test_consume_reset_token_is_single_use():
+    """Токен читається та видаляється однією командою GETDEL."""
+    with patch('app.services.password_reset.redis_client') as mock_redis:
+        mock_redis.getdel = AsyncMock(side_effect=["test@example.com", None])
+
+        assert await consume_reset_token("token") == "test@example.com"
+        assert await consume_reset_token("token") is None
+
+        mock_redis.getdel.assert_awaited_with("reset:token")
+
+
+@pytest.mark.asyncio
+async def test_consume_reset_token_propagates_redis_errors():
+    """Збій Redis не маскується під недійсний токен."""
+    with patch('app.services.password_reset.redis_client') as mock_redis:
+        mock_redis.getdel = AsyncMock(side_effect=RedisConnectionError("down"))
+
+        with pytest.raises(RedisConnectionError):
+            await consume_reset_token("token")
+
+
+@pytest.mark.asyncio
+async def test_restore_reset_token_keeps_newer_value_and_swallows_redis_errors():
+    """Токен відновлюється лише якщо його немає; збій Redis не перекриває вихідну помилку."""
+    with patch('app.services.password_reset.redis_client') as mock_redis:
+        mock_redis.set = AsyncMock()
+
+        await restore_reset_token("token", "test@example.com")
+
+        mock_redis.set.assert_awaited_once_with("reset:token", "test@example.com", ex=3600, nx=True)
+
+        mock_redis.set = AsyncMock(side_effect=RedisConnectionError("down"))
+        await restore_reset_token("token", "test@example.com")
@@ -0,0 +1,76 @@
+"""
+Тести для контролю кількості SQL-запитів.
+"""
+import logging
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.api.contacts import update_contact_api
+from app.services import query_budget as qb
+from tests.db import TEST_DATABASE_URL
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    yield engine
+    await engine.dispose()
+
+
+def _budgeted(engine, statements: int, budget: int):
+    @qb.query_budget(budget)
+    async def endpoint():
+        async with engine.connect() as conn:
+            for i in range(statements):
+                await conn.execute(text("SELECT CAST(:i AS integer)"), {"i": i})
+        return "ok"
+
+    return endpoint
+
+
+@pytest.mark.asyncio
+async def test_collect_queries_groups_repeated_shapes(engine):
+    """Однакові за формою запити з різними параметрами вважаються повтором."""
+    with qb.collect_queries() as outer:
+        async with engine.connect() as conn:
+            with qb.collect_queries() as inner:
+                for i in range(3):
+                    await conn.execute(text("SELECT CAST(:i AS integer)"), {"i": i})
+            await conn.execute(text("SELECT 1"))
+
+    assert inner.count == 3
+    assert outer.count == 4
+    assert list(outer.repeated(3).values()) == [3]
+    assert outer.repeated(4) == {}
+
+
+@pytest.mark.asyncio
+async def test_strict_mode_raises_over_budget(engine):
+    """У режимі strict перевищення бюджету піднімає виняток."""
+    with patch.object(qb.settings, "query_budget_mode", "strict"):
+        assert await _budgeted(engine, statements=2, budget=2)() == "ok"
+        with pytest.raises(qb.QueryBudgetExceeded, match="executed 3 SQL statements, budget is 2"):
+            await _budgeted(engine, statements=3, budget=2)()
+
+
+@pytest.mark.asyncio
+async def test_warn_and_off_modes_do_not_raise(engine, caplog):
+    """У режимі warn перевищення логуються, у режимі off нічого не рахується."""
+    endpoint = _budgeted(engine, statements=3, budget=1)
+
+    with patch.object(qb.settings, "query_budget_mode", "warn"), caplog.at_level(logging.WARNING):
+        assert await endpoint() == "ok"
+    assert "budget is 1" in caplog.text
+
+    caplog.clear()
+    with patch.object(qb.settings, "query_budget_mode", "off"):
+        assert await endpoint() == "ok"
+    assert caplog.text == ""
+
+
+def test_routes_declare_budget():
+    """Бюджет оголошено на ендпоінті та видно через атрибут."""
+    assert update_contact_api.__query_budget__ == 1
@@ -0,0 +1,103 @@
+"""
+Тести для маршрутизації читання на репліку.
+"""
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.models.user import User
+from app.services import read_routing
+from app.services.read_routing import get_read_session
+
+
+USER = User(id=7, email="reader@example.com", username="reader", password="x")
+
+
+async def _resolve(primary):
+    gen = get_read_session(session=primary, current_user=USER)
+    session = await gen.__anext__()
+    await gen.aclose()
+    return session
+
+
+def _replica_factory(replica):
+    @asynccontextmanager
+    async def factory():
+        yield replica
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_read_session_uses_primary_without_replica():
+    """Без налаштованої репліки читання йде в основну БД."""
+    primary = MagicMock()
+
+    with patch.object(read_routing, "async_replica_session", None):
+        assert await _resolve(primary) is primary
+
+
+@pytest.mark.asyncio
+async def test_read_session_routes_to_fresh_replica():
+    """Свіжа репліка і відсутність нещодавніх записів → репліка."""
+    primary, replica = MagicMock(), MagicMock()
+
+    with patch.object(read_routing, "async_replica_session", _replica_factory(replica)), \
+            patch.object(read_routing, "replica_is_fresh", AsyncMock(return_value=True)), \
+            patch.object(read_routing, "redis_client") as mock_redis:
+        mock_redis.exists = AsyncMock(return_value=0)
+        read_routing._recent_writes.clear()
+
+        assert await _resolve(primary) is replica
+
+
+@pytest.mark.asyncio
+async def test_read_session_pinned_after_write():
+    """Після запису користувач читає з основної БД (read-your-writes)."""
+    primary, replica = MagicMock(), MagicMock()
+
+    with patch.object(read_routing, "async_replica_session", _replica_factory(replica)), \
+            patch.object(read_routing, "replica_engine", MagicMock()), \
+            patch.object(read_routing, "replica_is_fresh", AsyncMock(return_value=True)), \
+            patch.object(read_routing, "redis_client") as mock_redis:
+        mock_redis.setex = AsyncMock()
+        mock_redis.exists = AsyncMock(return_value=0)
+
+        await read_routing.mark_user_write(USER.id)
+
+        assert await _resolve(primary) is primary
+        mock_redis.setex.assert_awaited_once()
+        read_routing._recent_writes.clear()
+
+
+@pytest.mark.asyncio
+async def test_read_session_falls_back_when_replica_lags():
+    """Відстаюча репліка → основна БД."""
+    primary, replica = MagicMock(), MagicMock()
+
+    with patch.object(read_routing, "async_replica_session", _replica_factory(replica)), \
+            patch.object(read_routing, "replica_is_fresh", AsyncMock(return_value=False)):
+        assert await _resolve(primary) is primary
+
+
+@pytest.mark.asyncio
+async def test_replica_is_fresh_checks_lag_and_caches():
+    """Відставання перевіряється не частіше за інтервал і порівнюється з лімітом."""
+    conn = MagicMock()
+    conn.scalar = AsyncMock(return_value=1.5)
+
+    @asynccontextmanager
+    async def connect():
+        yield conn
+
+    engine = MagicMock()
+    engine.connect = connect
+
+    with patch.object(read_routing, "replica_engine", engine), \
+            patch.dict(read_routing._replica_state, {"checked_at": float("-inf")}):
+        assert await read_routing.replica_is_fresh() is True
+        assert await read_routing.replica_is_fresh() is True
+        assert conn.scalar.await_count == 1
+
+        conn.scalar = AsyncMock(return_value=60.0)
+        read_routing._replica_state["checked_at"] = float("-inf")
+        assert await read_routing.replica_is_fresh() is False
@@ -0,0 +1,45 @@
+"""
+Тести для швидкої серіалізації контактів.
+"""
+import json
+from datetime import date
+
+from app.models.contact import Contact
+from app.schemas.contact import ContactOut
+from app.services.serialization import contact_rows, contacts_response
+
+
+def _contact(**overrides) -> Contact:
+    data = dict(
+        id=1,
+        first_name="Тарас",
+        last_name="Шевченко",
+        email="taras@example.com",
+        phone="+380501234567",
+        birthday=date(1814, 3, 9),
+        additional_info=None,
+        owner_id=7,
+    )
+    data.update(overrides)
+    return Contact(**data)
+
+
+def test_contact_rows_match_contact_out():
+    """Словники збігаються з результатом валідації ContactOut."""
+    contacts = [_contact(), _contact(id=2, birthday=None, additional_info="x")]
+
+    expected = [ContactOut.model_validate(c).model_dump() for c in contacts]
+    assert contact_rows(contacts) == expected
+    assert "owner_id" not in contact_rows(contacts)[0]
+
+
+def test_contacts_response_encodes_same_json_as_pydantic():
+    """Тіло відповіді збігається з JSON-серіалізацією ContactOut."""
+    contacts = [_contact(), _contact(id=2, birthday=None)]
+    expected = [ContactOut.model_validate(c).model_dump(mode="json") for c in contacts]
+
+    response = contacts_response(contacts, headers={"X-Next-Cursor": "abc"})
+    assert json.loads(response.body) == expected
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert response.media_type == "application/json"
+    assert "Тарас".encode() in response.body
@@ -0,0 +1,62 @@
+"""
+Мінімальний SMTP-сервер на asyncio для тестів черги листів.
+
+Замінює ``aiosmtpd``: приймає листи без автентифікації та TLS і зберігає
+їх у ``messages``. ``fail_first`` перших команд ``DATA`` отримують
+тимчасову помилку ``451`` — для перевірки повторних спроб.
+"""
+
+import asyncio
+from email import message_from_bytes
+
+
+class LocalSMTPServer:
+    def __init__(self, fail_first: int = 0):
+        self.fail_first = fail_first
+        self.messages = []
+        self.connections = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+
+        async def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        await reply("220 localhost ESMTP test")
+        while line := await reader.readline():
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                await reply("250 localhost")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                await reply("250 OK")
+            elif command == "DATA":
+                if self.fail_first > 0:
+                    self.fail_first -= 1
+                    await reply("451 Try again later")
+                    continue
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while (chunk := await reader.readline()) != b".\r\n":
+                    data += chunk
+                self.messages.append(message_from_bytes(data))
+                await reply("250 Queued")
+            elif command == "QUIT":
+                await reply("221 Bye")
+                break
+            else:
+                await reply("502 Command not implemented")
+        writer.close()